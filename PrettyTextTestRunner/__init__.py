@@ -1,9 +1,14 @@
+import sys
 from sys import stdout as SYS_STDOUT
 import time
+import heapq
 import warnings
 import traceback
+from io import StringIO
+from contextlib import nullcontext
 from unittest import TextTestRunner, TestResult
-from unittest.result import failfast
+from unittest.case import _SubTest
+from unittest.result import failfast, STDOUT_LINE, STDERR_LINE
 from unittest.util import strclass
 from unittest.signals import registerResult
 
@@ -32,6 +37,42 @@ runner.run(suite)
 
 
 from .textTable import TextTable
+from .parallel import iterTests, runParallel
+from .records import TestRecord, FailureText
+from .grouping import FailureGroups, failureFingerprint
+from .subtests import SubTestSummary
+from .timing import FixtureTimer, instrumentTest, restoreTest, TEST_PHASES
+from .threaded import ThreadLocalStream, runThreaded
+
+# Optional features are only imported once used, keeping `import
+# PrettyTextTestRunner` close to the cost of importing unittest
+_LAZY_EXPORTS = {
+    "DurationHistory": "history",
+    "shardSuite": "sharding",
+    "failureFirstSuite": "sharding",
+    "FingerprintCache": "selection",
+    "ResultWriter": "writers",
+    "JUnitXMLWriter": "writers",
+    "JSONLinesWriter": "writers",
+    "ResultFileWriter": "writers",
+    "mergeResultFiles": "merge",
+    "readResultFile": "merge",
+    "ConcurrentAsyncSuite": "asyncSuite",
+    "groupAsyncClasses": "asyncSuite",
+    "TestProfiler": "profiling",
+    "MemoryTracker": "memory",
+    "DiscoveryIndex": "discovery",
+    "BoundedCapture": "capture",
+    "Coordinator": "distributed",
+    "runWorker": "distributed",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+        return getattr(import_module("." + _LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
 START = "\x1b["
 END = ""
@@ -61,12 +102,27 @@ class PrettyTestResult(TestResult):
         'E': "ERROR",
         'S': "SKIP",
         '?': "SUCCESS?",
-        'X': "EXPECTED"
+        'X': "EXPECTED",
+        'C': "CACHED",
+        'T': "TIMEOUT"
+    }
+    # Statuses failing a run
+    FAILED = ('F', 'E', '?', 'T')
+    # Tally key each status counts towards
+    TALLY = {
+        '.': "success",
+        'F': "failed",
+        'E': "error",
+        'S': "skipped",
+        '?': "unexpectedSuccess",
+        'X': "expectedFail",
+        'C': "cached",
+        'T': "timeout"
     }
 
     def __init__(self, stream, descriptions, verbosity):
         self.timing = False
-        self.results = {}
+        self.results = {}  # {clsName: [TestRecord, ...]}
         self.tally = {}
         self.success_count = 0
         self.err_count = 0
@@ -74,7 +130,42 @@ class PrettyTestResult(TestResult):
         self.skip_count = 0
         self.unexpectedSuccess_count = 0
         self.expectedFailure_count = 0
-        self.execTimes = {}
+        self._testStart = None
+        self._testStop = None
+        self._testRecords = []
+        # Per-phase timing, see `PrettyTextTestRunner.phaseTiming`
+        self.phaseTiming = False
+        self.slowestCount = 10
+        self.slowest = []  # min-heap of (totalNs, testId, setUpNs, bodyNs, tearDownNs)
+        self.classPhaseTotals = {}  # {clsName: setUp + tearDown ns}
+        self.fixtureTimes = {"class": {}, "module": {}}
+        self._phases = {}
+        self._patched = []
+        # DurationHistory receiving every test duration, if enabled
+        self.history = None
+        # ResultWriter instances streaming each finished test
+        self.writers = []
+        # TestProfiler wrapped around each test, if enabled
+        self.profiler = None
+        self._profiled = []
+        # MemoryTracker measuring each test, if enabled
+        self.memory = None
+        self.memoryLeaks = []  # [(testId, retainedBytes, peakBytes, [site, ...])]
+        # Watchdog enforcing test and class timeouts, if enabled
+        self.watchdog = None
+        # Failures grouped by fingerprint
+        self.failureGroups = FailureGroups()
+        # Subtests of the running test, see `SubTestSummary`
+        self.subTestParams = 10
+        self.subTestTally = {}  # {clsName: {"run": int, "failed": int}}
+        self._subTests = None
+        self._subTestMark = None
+        # BoundedCapture (limit, directory, headLines, tailLines), None keeps
+        # all buffered output in memory
+        self.capture = None
+        # Streaming report support, see `expectClasses`
+        self.classPending = {}
+        self.classCompleteHook = None
         super(PrettyTestResult, self).__init__(stream, descriptions, verbosity)
 
     def testName(self, test):
@@ -83,6 +174,17 @@ class PrettyTestResult(TestResult):
     def testClsName(self, test):
         return ".".join(test.id().rsplit('.')[0:2])
 
+    @property
+    def execTimes(self) -> dict:
+        """ @abstract Start/stop times keyed by test id, built from the
+                result records.
+            @returns [dict] {testId: {"start": float, "stop": float}} in
+                perf_counter seconds
+        """
+        return {_rec.testId: {"start": _rec.start / 1e9, "stop": _rec.stop / 1e9}
+                for _rows in self.results.values() for _rec in _rows
+                if _rec.start is not None}
+
     def getClassTally(self, clsName):
         _fieldOrder = [
             "success", "failed", "error", "skipped",
@@ -111,39 +213,259 @@ class PrettyTestResult(TestResult):
             str(_total_expectF)
         ]
 
-    def startTest(self, test):
-        _clsName = self.testClsName(test)
-        if _clsName not in self.results:
-            self.results[_clsName] = []
+    def expectClasses(self, tests, hook):
+        """ @abstract Register the tests about to run so `hook` is called with
+                the class name as soon as the last test of each class stops.
+            @params tests [iterable] TestCase instances in run order
+            @params hook [callable] Called as hook(clsName)
+        """
+        for _test in tests:
+            _clsName = self.testClsName(_test)
+            self.classPending[_clsName] = self.classPending.get(_clsName, 0) + 1
+        self.classCompleteHook = hook
 
-        if _clsName not in self.tally:
-            self.tally[_clsName] = {
+    def completeClass(self, clsName):
+        """ @abstract Mark a class as finished and hand it to the hook. """
+        self.classPending.pop(clsName, None)
+        if self.classCompleteHook is not None:
+            self.classCompleteHook(clsName)
+
+    def startTestRun(self):
+        super(PrettyTestResult, self).startTestRun()
+        for _writer in self.writers:
+            _writer.startTestRun()
+
+    def stopTestRun(self):
+        """ @abstract Flush classes which never ran all their tests, for
+                example after failfast or a setUpClass error, and close the
+                result writers.
+        """
+        super(PrettyTestResult, self).stopTestRun()
+        for _clsName in list(self.classPending):
+            if _clsName in self.results:
+                self.completeClass(_clsName)
+        self.classPending.clear()
+        for _writer in self.writers:
+            _writer.stopTestRun()
+
+    def _addClass(self, clsName):
+        if clsName not in self.results:
+            self.results[clsName] = []
+
+        if clsName not in self.tally:
+            self.tally[clsName] = {
                 'success': 0,
                 "error": 0,
                 "failed": 0,
                 "skipped": 0,
                 "unexpectedSuccess": 0,
-                "expectedFail": 0
+                "expectedFail": 0,
+                "cached": 0,
+                "timeout": 0
             }
 
+    def addCached(self, test):
+        """ @abstract Report a test which was not run because its class
+                passed last time and its sources are unchanged.
+        """
+        _clsName = self.testClsName(test)
+        self._addClass(_clsName)
+        self.tally[_clsName]["cached"] += 1
+        _rec = TestRecord(test.id(), self.testName(test), 'C')
+        self.results[_clsName].append(_rec)
+        self.emitRecord(_clsName, _rec)
+
+    def emitRecord(self, clsName, record):
+        """ @abstract Hand a finished record to every result writer """
+        for _writer in self.writers:
+            _writer.writeRecord(clsName, record, self.STATUS[record.status])
+
+    def getClassCached(self, clsName) -> list:
+        return [str(self.tally[clsName]["cached"])]
+
+    def getCachedTally(self) -> list:
+        return [str(sum(_tally["cached"] for _tally in self.tally.values()))]
+
+    def getClassTimeouts(self, clsName) -> list:
+        return [str(self.tally[clsName]["timeout"])]
+
+    def getTimeoutTally(self) -> list:
+        return [str(sum(_tally["timeout"] for _tally in self.tally.values()))]
+
+    def getClassSubTests(self, clsName) -> list:
+        _tally = self.subTestTally.get(clsName, {"run": 0, "failed": 0})
+        return [str(_tally["run"]), str(_tally["failed"])]
+
+    def getSubTestTally(self) -> list:
+        return [str(sum(_tally["run"] for _tally in self.subTestTally.values())),
+                str(sum(_tally["failed"] for _tally in self.subTestTally.values()))]
+
+    def classPassed(self, clsName) -> bool:
+        """ @abstract True when a class ran without failures or errors """
+        _tally = self.tally[clsName]
+        return _tally["failed"] + _tally["error"] + _tally["unexpectedSuccess"] \
+            + _tally["timeout"] == 0
+
+    def startTest(self, test):
+        _clsName = self.testClsName(test)
+        self._addClass(_clsName)
+
+        self._testRecords = []
+        self._subTests = None
+        if self.phaseTiming:
+            self._phases = {}
+            self._patched = instrumentTest(test, self._phases)
         if self.timing:
-            testKey = test.id()
-            start = time.time()
-            self.execTimes.update({testKey: {'start': start}})
+            self._testStart = self._subTestMark = time.perf_counter_ns()
         super(PrettyTestResult, self).startTest(test)
+        if self.capture is not None and self.buffer:
+            self._stdout_buffer.label = test.id() + ".stdout"
+            self._stderr_buffer.label = test.id() + ".stderr"
+        if self.profiler is not None:
+            self.profiler.start()
+            self._profiled = self.profiler.instrument(test)
+        if self.memory is not None:
+            self.memory.start()
+        if self.watchdog is not None:
+            self.watchdog.start(test, _clsName)
+
+    def setTestTimes(self, startNs: int, stopNs: int, phases: dict=None):
+        """ @abstract Use times measured by the caller for the current test,
+                for tests which ran before being reported, see
+                `ConcurrentAsyncSuite`. Call between startTest and stopTest.
+            @params startNs [int] perf_counter_ns at start
+            @params stopNs [int] perf_counter_ns at stop
+            @params phases [dict] Optional {"setUp", "body", "tearDown"} in ns
+        """
+        self._testStart = startNs
+        self._testStop = stopNs
+        if phases is not None and self.phaseTiming:
+            self._phases = dict(phases)
 
     def stopTest(self, test):
+        if self.watchdog is not None:
+            self.watchdog.stop(test)
+        if self._subTests is not None:
+            self._closeSubTests(test)
+        if self.memory is not None:
+            self._recordMemory(test, *self.memory.stop())
+        if self.profiler is not None:
+            self.profiler.restore(test, self._profiled)
+            self.profiler.stop(test.id(), self.testClsName(test))
         super(PrettyTestResult, self).stopTest(test)
+        _stopNs, self._testStop = self._testStop, None
         if self.timing:
-            testKey = test.id()
-            stop = time.time()
-            self.execTimes[testKey].update({'stop': stop})
+            stop = _stopNs if _stopNs is not None else time.perf_counter_ns()
+            for _rec in self._testRecords:
+                _rec.start = self._testStart
+                _rec.stop = stop
+            if self.history is not None and self._testRecords:
+                self.history.add(test.id(), stop - self._testStart,
+                                 any(_rec.status in self.FAILED for _rec in self._testRecords))
+        if self.phaseTiming:
+            restoreTest(test, self._patched)
+            self._patched = []
+            self._recordPhases(test)
+
+        _clsName = self.testClsName(test)
+        for _rec in self._testRecords:
+            self.emitRecord(_clsName, _rec)
+        self._testRecords = []
+
+        if _clsName in self.classPending:
+            self.classPending[_clsName] -= 1
+            if self.classPending[_clsName] <= 0:
+                self.completeClass(_clsName)
+
+    def _closeSubTests(self, test):
+        """ @abstract Attach the subtest summary to the record of the test
+                which just stopped and count its subtests. unittest reports
+                nothing for a test whose subtests failed or skipped, it is
+                recorded here with the outcome of its subtests.
+        """
+        _summary, self._subTests = self._subTests, None
+        _clsName = self.testClsName(test)
+        _tally = self.subTestTally.setdefault(_clsName, {"run": 0, "failed": 0})
+        _tally["run"] += _summary.total
+        _tally["failed"] += _summary.failed
+        if not self._testRecords:
+            if _summary.counts["failed"]:
+                _status = 'F'
+            elif _summary.counts["error"]:
+                _status = 'E'
+            else:
+                _status = '.' if _summary.counts["success"] else 'S'
+            self.tally[_clsName][self.TALLY[_status]] += 1
+            self._record(test, _status, self._capturedOutput())
+        for _rec in self._testRecords:
+            _rec.subTests = _summary
+
+    def _recordMemory(self, test, peak: int, retained: int, sites: list):
+        """ @abstract Store the memory use of the test which just stopped and
+                flag it when it retained more than the leak threshold.
+        """
+        for _rec in self._testRecords:
+            _rec.peakBytes, _rec.retainedBytes = peak, retained
+        _threshold = self.memory.leakThreshold
+        if _threshold is not None and retained is not None and retained > _threshold:
+            self.memoryLeaks.append((test.id(), retained, peak, sites or []))
+
+    def _recordPhases(self, test):
+        """ @abstract Store the phase durations of the test which just
+                stopped and keep it if it is among the slowest.
+        """
+        _setUp, _body, _tearDown = [self._phases.get(_phase, 0)
+                                    for _phase in TEST_PHASES]
+        for _rec in self._testRecords:
+            _rec.setUpNs, _rec.bodyNs, _rec.tearDownNs = _setUp, _body, _tearDown
+
+        _clsName = self.testClsName(test)
+        self.classPhaseTotals[_clsName] = \
+            self.classPhaseTotals.get(_clsName, 0) + _setUp + _tearDown
+        self.noteSlow((_setUp + _body + _tearDown, test.id(),
+                       _setUp, _body, _tearDown))
+
+    def noteSlow(self, entry: tuple):
+        """ @abstract Offer an entry to the bounded slowest tests heap
+            @params entry [tuple] (totalNs, testId, setUpNs, bodyNs, tearDownNs)
+        """
+        if len(self.slowest) < self.slowestCount:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def getClassFixtureTimes(self, clsName) -> list:
+        """ @abstract Class fixture and per-test setUp/tearDown overhead of a
+                class, in seconds.
+            @returns [list] [str, str] for the summary table
+        """
+        _fixture = self.fixtureTimes["class"].get(clsName, {})
+        _classNs = _fixture.get("setUp", 0) + _fixture.get("tearDown", 0)
+        return [str(round(_classNs / 1e9, 3)),
+                str(round(self.classPhaseTotals.get(clsName, 0) / 1e9, 3))]
+
+    def getFixtureTally(self) -> list:
+        """ @abstract Totals of `getClassFixtureTimes`, module fixtures are
+                counted with the class fixtures.
+            @returns [list] [str, str] for the summary table
+        """
+        _fixtureNs = sum(_times["setUp"] + _times["tearDown"]
+                         for _kind in ("class", "module")
+                         for _times in self.fixtureTimes[_kind].values())
+        return [str(round(_fixtureNs / 1e9, 3)),
+                str(round(sum(self.classPhaseTotals.values()) / 1e9, 3))]
+
+    def _record(self, test, status: str, output: str=""):
+        """ @abstract Append a compact result row for `test` to its class. """
+        _rec = TestRecord(test.id(), self.testName(test), status, output)
+        self.results[self.testClsName(test)].append(_rec)
+        self._testRecords.append(_rec)
+        return _rec
 
     def addSuccess(self, test):
         _clsName = self.testClsName(test)
         self.tally[_clsName]["success"] += 1
-        self.results[_clsName].append((self.testName(test), test, '.', 
-                                       self._exc_info_to_string((None,0,None), test)))
+        self._record(test, '.', self._capturedOutput())
         super(PrettyTestResult, self).addSuccess(test)
 
     @failfast
@@ -151,11 +473,14 @@ class PrettyTestResult(TestResult):
         """Called when an error has occurred. 'err' is a tuple of values as
         returned by sys.exc_info().
         """
+        _timeout = self.watchdog.expired(err) if self.watchdog is not None else None
+        if _timeout is not None:
+            return self.addTimeout(test, self._timeoutText(*_timeout))
         _clsName = self.testClsName(test)
         self.tally[_clsName]["error"] += 1
-        self.results[_clsName].append((self.testName(test), test, 'E', 
-                                       self._exc_info_to_string(err, test)))
-        self.errors.append((test, self._exc_info_to_string(err, test)))
+        _text = self._captureFailure(err, test)
+        self._record(test, 'E', _text).group = self.failureGroups.add(_text, test.id())
+        self.errors.append((test, _text))
         self._mirrorOutput = False
 
     @failfast
@@ -164,51 +489,184 @@ class PrettyTestResult(TestResult):
         returned by sys.exc_info()."""
         _clsName = self.testClsName(test)
         self.tally[_clsName]["failed"] += 1
-        self.results[_clsName].append((self.testName(test), test, 'F', 
-                                       self._exc_info_to_string(err, test)))
-        self.failures.append((test, self._exc_info_to_string(err, test)))
+        _text = self._captureFailure(err, test)
+        self._record(test, 'F', _text).group = self.failureGroups.add(_text, test.id())
+        self.failures.append((test, _text))
         self._mirrorOutput = False
 
+    def addTimeout(self, test, text: str):
+        """ @abstract Record `test` as interrupted by the watchdog, or lost
+                with a worker killed for overrunning.
+        """
+        _clsName = self.testClsName(test)
+        self._addClass(_clsName)
+        self.tally[_clsName]["timeout"] += 1
+        self._record(test, 'T', text)
+        self.errors.append((test, text))
+        self._mirrorOutput = False
+
+    def _timeoutText(self, kind: str, limit: float, stacks: str) -> str:
+        _text = "TIMEOUT: {} timeout of {}s ".format(kind, limit)
+        if stacks is None:
+            _text += "ran out before the test started\n"
+        else:
+            _text += "exceeded, thread stacks:\n" + stacks
+        return _text + self._capturedOutput()
+
     def addSubTest(self, test, subtest, err):
         """Called at the end of a subtest.
         'err' is None if the subtest ended successfully, otherwise it's a
         tuple of values as returned by sys.exc_info().
         """
-        # By default, we don't do anything with successful subtests, but
-        # more sophisticated test results might want to record them.
-        if err is not None:
-            if getattr(self, 'failfast', False):
-                self.stop()
-            if issubclass(err[0], test.failureException):
-                errors = self.failures
-            else:
-                errors = self.errors
-            errors.append((subtest, self._exc_info_to_string(err, test)))
-            self._mirrorOutput = False
+        _summary, _params = self._subTest(test, subtest)
+        if err is None:
+            _summary.add("success")
+            return
+        if getattr(self, 'failfast', False):
+            self.stop()
+        _timeout = self.watchdog.expired(err) if self.watchdog is not None else None
+        if _timeout is not None:
+            return self.addTimeout(test, self._timeoutText(*_timeout))
+        if issubclass(err[0], test.failureException):
+            _status, errors = 'F', self.failures
+        else:
+            _status, errors = 'E', self.errors
+        # Subtests failing the same way share the first one's failure text,
+        # each keeps its own message next to its parameters
+        _tbException = self._tracebackException(err, test)
+        _traceKey = failureFingerprint(err[0], err[1], _tbException)
+        _group = _summary.groups.get(_traceKey)
+        _text = _group.failure if _group is not None \
+            else self._captureFailure(err, test, _tbException)
+        _message = "".join(traceback.format_exception_only(err[0], err[1])).strip()
+        _summary.addFailure(_status, _traceKey, "{}: {}".format(_params, _message), _text)
+        self.failureGroups.add(_text, subtest.id())
+        errors.append((subtest, _text))
+        self._mirrorOutput = False
+
+    def _subTest(self, test, subtest) -> tuple:
+        """ @abstract Summary of the running test's subtests and the
+                parameters of `subtest`, timing it from the previous one.
+            @returns [tuple] (SubTestSummary, str)
+        """
+        if self._subTests is None:
+            self._subTests = SubTestSummary(self.subTestParams)
+        _params = subtest.id()[len(test.id()):].strip()
+        if self.timing and self._subTestMark is not None:
+            _now = time.perf_counter_ns()
+            self._subTests.addTime(_now - self._subTestMark, _params)
+            self._subTestMark = _now
+        return self._subTests, _params
 
     def addSkip(self, test, reason):
+        if isinstance(test, _SubTest):
+            self._subTest(test.test_case, test)[0].add("skipped")
+            return super(PrettyTestResult, self).addSkip(test, reason)
         _clsName = self.testClsName(test)
         self.tally[_clsName]["skipped"] += 1
-        self.results[_clsName].append((self.testName(test), test, 'S', 
-                                       self._exc_info_to_string(err, test)))
+        self._record(test, 'S', reason)
         super(PrettyTestResult, self).addSkip(test, reason)
 
     def addExpectedFailure(self, test, err):
         _clsName = self.testClsName(test)
         self.tally[_clsName]["expectedFail"] += 1
-        self.results[_clsName].append((self.testName(test), test, 'X', 
-                                       self._exc_info_to_string(err, test)))
+        self._record(test, 'X', self._captureFailure(err, test))
         super(PrettyTestResult, self).addExpectedFailure(test, err)
 
     def addUnexpectedSuccess(self, test):
         _clsName = self.testClsName(test)
         self.tally[_clsName]["unexpectedSuccess"] += 1
-        self.results[_clsName].append((self.testName(test), test, '?', 
-                                       self._exc_info_to_string((None,0,None), test)))
+        self._record(test, '?', self._capturedOutput())
         super(PrettyTestResult, self).addUnexpectedSuccess(test)
 
-    def _exc_info_to_string(self, err, test):
-        """Converts a sys.exc_info()-style tuple of values into a string."""
+    def _count_relevant_tb_levels(self, tb):
+        """ @abstract Count the frames before the first unittest frame, this
+                helper was dropped from TestResult in Python 3.11.
+        """
+        length = 0
+        while tb and not self._is_relevant_tb_level(tb):
+            length += 1
+            tb = tb.tb_next
+        return length
+
+    def _setupStdout(self):
+        """ @abstract Buffer output, only for the current thread when the
+                streams are `ThreadLocalStream` proxies.
+        """
+        if self.buffer and self._stderr_buffer is None:
+            self._stderr_buffer = self._newBuffer()
+            self._stdout_buffer = self._newBuffer()
+        if not (self.buffer and isinstance(sys.stdout, ThreadLocalStream)):
+            return super(PrettyTestResult, self)._setupStdout()
+        sys.stdout.redirectThread(self._stdout_buffer)
+        sys.stderr.redirectThread(self._stderr_buffer)
+
+    def _newBuffer(self):
+        """ @abstract Output buffer, bounded when `capture` is set """
+        if self.capture is None:
+            return StringIO()
+        from .capture import BoundedCapture
+        return BoundedCapture(*self.capture)
+
+    def _restoreStdout(self):
+        if not (self.buffer and isinstance(sys.stdout, ThreadLocalStream)):
+            return super(PrettyTestResult, self)._restoreStdout()
+        sys.stdout.redirectThread(None)
+        sys.stderr.redirectThread(None)
+        if self._mirrorOutput:
+            output = self._stdout_buffer.getvalue()
+            error = self._stderr_buffer.getvalue()
+            if output:
+                if not output.endswith('\n'):
+                    output += '\n'
+                sys.stdout.write(STDOUT_LINE % output)
+            if error:
+                if not error.endswith('\n'):
+                    error += '\n'
+                sys.stderr.write(STDERR_LINE % error)
+        for _buffer in (self._stdout_buffer, self._stderr_buffer):
+            _buffer.seek(0)
+            _buffer.truncate()
+
+    def _capturedOutput(self) -> str:
+        """ @abstract Return the buffered stdout/stderr of the current test,
+                an empty string when buffering is off or nothing was written.
+        """
+        if not self.buffer:
+            return ""
+        msgLines = []
+        output = sys.stdout.getvalue()
+        error = sys.stderr.getvalue()
+        if output:
+            if not output.endswith('\n'):
+                output += '\n'
+            msgLines.append(STDOUT_LINE % output)
+        if error:
+            if not error.endswith('\n'):
+                error += '\n'
+            msgLines.append(STDERR_LINE % error)
+        return ''.join(msgLines)
+
+    def _captureFailure(self, err, test, tbException=None) -> FailureText:
+        """ @abstract Snapshot a sys.exc_info()-style tuple once, without
+                formatting it. Source lines are only read and the text built
+                when the report asks for it.
+            @params tbException [TracebackException] Snapshot already taken
+                by `_tracebackException`, if any
+            @returns [FailureText] Lazily formatted traceback and output
+        """
+        exctype, value, tb = err
+        tb_e = tbException if tbException is not None \
+            else self._tracebackException(err, test)
+        _module = sys.modules.get(test.__class__.__module__)
+        _fingerprint = failureFingerprint(exctype, value, tb_e,
+                                          getattr(_module, "__file__", None))
+        return FailureText(tb_e, self._capturedOutput(), _fingerprint)
+
+    def _tracebackException(self, err, test):
+        """ @abstract Trimmed, unformatted traceback of `err`, None when
+                there is no traceback
+        """
         exctype, value, tb = err
         # Skip test runner traceback levels
         while tb and self._is_relevant_tb_level(tb):
@@ -220,25 +678,16 @@ class PrettyTestResult(TestResult):
         else:
             length = None
 
-        msgLines = []
+        tb_e = None
         if tb is not None:
             tb_e = traceback.TracebackException(
-                exctype, value, tb, limit=length, capture_locals=self.tb_locals)
-            msgLines = list(tb_e.format())
+                exctype, value, tb, limit=length,
+                capture_locals=self.tb_locals, lookup_lines=False)
+        return tb_e
 
-        if self.buffer:
-            output = sys.stdout.getvalue()
-            error = sys.stderr.getvalue()
-            if output:
-                if not output.endswith('\n'):
-                    output += '\n'
-                msgLines.append(STDOUT_LINE % output)
-            if error:
-                if not error.endswith('\n'):
-                    error += '\n'
-                msgLines.append(STDERR_LINE % error)
-
-        return ''.join(msgLines)
+    def _exc_info_to_string(self, err, test):
+        """Converts a sys.exc_info()-style tuple of values into a string."""
+        return str(self._captureFailure(err, test))
 
 
 class PrettyTextTestRunner(TextTestRunner):
@@ -248,6 +697,92 @@ class PrettyTextTestRunner(TextTestRunner):
         @methods run, setProps
         @props mode [str] "full-report" or "simple", defaults to full
         @props timing [bool] Display timing stats for tests
+        @props workers [int] Number of processes to run test classes in,
+            defaults to 1 (serial)
+        @props threads [int] Number of threads to run test classes in, with
+            per-thread output buffering, defaults to 1 (serial). Ignored when
+            `workers` is above 1. `testTimeout` and `classTimeout` only
+            interrupt a test in a thread once it returns from a blocking
+            call, a RuntimeWarning says so
+        @props streaming [bool] Write each class report as soon as the class
+            finishes and free its rows, summary is written last
+        @props phaseTiming [bool] Time setUp, test body and tearDown of each
+            test plus class and module fixtures, adding fixture columns to the
+            summary and a slowest tests report
+        @props slowest [int] Number of tests in the slowest tests report
+        @props historyFile [str] SQLite file to keep test durations in, enables
+            the performance regressions report
+        @props historyWindow [int] Previous runs each test is compared with
+        @props regressionRatio [float] Slow down against the rolling mean
+            needed to flag a test
+        @props regressionSigma [float] Standard deviations above the rolling
+            mean needed to flag a test, None to only use the ratio
+        @props shard [tuple] (index, total) to only run the zero based shard
+            `index` of `total`. Classes are balanced by test count, or by the
+            durations in `shardDurations` when set
+        @props shardDurations [str] History file, see `historyFile`, to
+            balance shards by. Every node must read the same file, or the
+            nodes compute different partitions and classes are skipped or
+            run twice. A node's own `historyFile` is not used for this
+        @props failureFirst [bool] Run the classes of tests which failed last
+            time first, then the other classes fastest first. Outcomes and
+            durations are kept in `historyFile`, which this needs
+        @props fingerprintFile [str] JSON file of source fingerprints, when set
+            classes which passed last time and whose sources are unchanged
+            are not run and reported as cached
+        @props writers [list] ResultWriter instances, such as JUnitXMLWriter or
+            JSONLinesWriter, streaming each test as it finishes
+        @props profile [bool] Profile each test and add hot functions and
+            slowest tests top frames reports, serial runs only
+        @props profileMode [str] "deterministic" (cProfile) or "sampling"
+        @props profileTop [int] Number of functions in the hot functions report
+        @props profileDir [str] Directory to write one `<class>.pstats` file
+            per class to, deterministic mode only
+        @props memory [bool] Record each test's peak and retained memory,
+            adding a memory column to the test reports. Not with `threads`
+        @props memoryMode [str] "tracemalloc" or "rss"
+        @props leakThreshold [int] Retained bytes above which a test is listed
+            in the memory leaks report, with its top allocation sites
+        @props asyncConcurrency [int] When above 0, tests of classes setting
+            `concurrentAsync = True` (IsolatedAsyncioTestCase) run concurrently
+            on one event loop, at most this many at a time
+        @props testTimeout [float] Seconds a test may run before the watchdog
+            dumps every thread's stack and interrupts it, reporting it as
+            TIMEOUT with its own summary column. None for no limit
+        @props classTimeout [float] Seconds the tests of a class may run
+            together, later tests of the class are reported as TIMEOUT
+            without running. With `workers`, a worker not responding to its
+            watchdog is killed and replaced, its class reported as TIMEOUT
+        @props captureLimit [int] Characters of each test's stdout and stderr
+            kept in memory, output past it spills to a log file and the report
+            shows only its head and tail lines with the log path. None, the
+            default, keeps all output in memory
+        @props captureDir [str] Directory for spilled logs, defaults to the
+            system temp directory. Logs are kept after the run, the report
+            points at them
+        @props captureHeadLines [int] Lines shown from the start of a spilled log
+        @props captureTailLines [int] Lines shown from the end of a spilled log
+        @props progress [bool] Draw a live progress line with counts, rate and
+            ETA on the stream while the run goes, redrawn at most
+            `progressInterval` seconds apart. Plain lines are written every
+            10 seconds instead when the stream is not a terminal. Not with
+            streaming simple reports
+        @props progressInterval [float] Seconds between progress redraws
+        @props groupFailures [bool] Group failures sharing an exception type
+            and code under test frames, list each group once with its count
+            in a failure groups report and have test rows refer to the group
+            instead of repeating the traceback. Off by default
+        @props coordinator [str] "host:port" or Unix socket path to serve the
+            suite's test classes on, run by workers started with
+            `python -m PrettyTextTestRunner worker ADDRESS`. Takes precedence
+            over `workers` and `threads`
+        @props localWorkers [int] Worker processes the coordinator starts on
+            this host
+        @props authkey [str] Key shared by the coordinator and its workers,
+            defaults to $PRETTYTEST_AUTHKEY. Only local workers may go without
+        @props subTestParams [int] Failing parameter sets listed per row of
+            subtests failing the same way. Subtests are counted per test and
+            each distinct failure gets one row, however large the sweep
     """
     _summary_props = {
         "titles": [
@@ -262,6 +797,96 @@ class PrettyTextTestRunner(TextTestRunner):
         "border": "solid"
     }
 
+    _timeout_props = {
+        "titles": ["Timeout"],
+        "colWidths": [9],
+        "colJustify": ["center"],
+    }
+
+    _fixture_props = {
+        "titles": ["Class Fixture", "Test Fixture"],
+        "colWidths": [9, 9],
+        "colJustify": ["center", "center"],
+    }
+
+    _cached_props = {
+        "titles": ["Cached"],
+        "colWidths": [8],
+        "colJustify": ["center"],
+    }
+
+    _subtest_props = {
+        "titles": ["Subtests", "Sub Fails"],
+        "colWidths": [10, 9],
+        "colJustify": ["center", "center"],
+    }
+
+    _slowest_props = {
+        "titles": ["Slowest Tests", "setUp", "Test", "tearDown", "Total"],
+        "colWidths": [50, 10, 10, 10, 10],
+        "colJustify": ["left", "right", "right", "right", "right"],
+        "padding": 1,
+        "indent": 0,
+        "margins": {"top":0, "bottom": 0, "left": 0, "right": 0},
+        "border": "solid"
+    }
+
+    _regression_props = {
+        "titles": ["Performance Regressions", "Duration", "Mean", "StdDev", "Ratio"],
+        "colWidths": [50, 10, 10, 10, 8],
+        "colJustify": ["left", "right", "right", "right", "right"],
+        "padding": 1,
+        "indent": 0,
+        "margins": {"top":0, "bottom": 0, "left": 0, "right": 0},
+        "border": "solid"
+    }
+
+    _hot_props = {
+        "titles": ["Hot Functions", "Calls", "Own", "Cumulative"],
+        "colWidths": [58, 9, 10, 12],
+        "colJustify": ["left", "right", "right", "right"],
+        "padding": 1,
+        "indent": 0,
+        "margins": {"top":0, "bottom": 0, "left": 0, "right": 0},
+        "border": "solid"
+    }
+
+    _profile_props = {
+        "titles": ["Slowest Tests", "Duration", "Top Frames (own time)"],
+        "colWidths": [40, 10, 50],
+        "colJustify": ["left", "right", "left"],
+        "padding": 1,
+        "indent": 0,
+        "margins": {"top":0, "bottom": 0, "left": 0, "right": 0},
+        "border": "solid"
+    }
+
+    _memory_props = {
+        "titles": ["Memory"],
+        "colWidths": [18],
+        "colJustify": ["right"],
+    }
+
+    _leak_props = {
+        "titles": ["Memory Leaks", "Retained", "Peak", "Top Allocation Sites"],
+        "colWidths": [40, 10, 10, 40],
+        "colJustify": ["left", "right", "right", "left"],
+        "padding": 1,
+        "indent": 0,
+        "margins": {"top":0, "bottom": 0, "left": 0, "right": 0},
+        "border": "solid"
+    }
+
+    _group_props = {
+        "titles": ["Failure Groups", "Count", "Representative Failure"],
+        "colWidths": [40, 7, 51],
+        "colJustify": ["left", "right", "left"],
+        "padding": 1,
+        "indent": 0,
+        "margins": {"top":0, "bottom": 0, "left": 0, "right": 0},
+        "border": "solid"
+    }
+
     _test_props = {
         "titles": ["Test Name", "Output", "Status"],
         "colWidths": [30, 50, 18],
@@ -273,13 +898,50 @@ class PrettyTextTestRunner(TextTestRunner):
     }
 
     def __init__(self, stream=SYS_STDOUT, descriptions=1, verbosity=0):
-        self.buffer = True
         self.timing = True
         self.mode = "full-report"  # set to `simple` for micro report
+        self.workers = 1
+        self.threads = 1
+        self.streaming = False
+        self.phaseTiming = False
+        self.slowest = 10
+        self.historyFile = None
+        self.historyWindow = 20
+        self.regressionRatio = 1.5
+        self.regressionSigma = 3.0
+        self.shard = None
+        self.shardDurations = None
+        self.failureFirst = False
+        self.fingerprintFile = None
+        self.writers = []
+        self.asyncConcurrency = 0
+        self.profile = False
+        self.profileMode = "deterministic"
+        self.profileTop = 15
+        self.profileDir = None
+        self.memory = False
+        self.memoryMode = "tracemalloc"
+        self.leakThreshold = None
+        self.testTimeout = None
+        self.classTimeout = None
+        self.captureLimit = None
+        self.captureDir = None
+        self.captureHeadLines = 20
+        self.captureTailLines = 20
+        self.groupFailures = False
+        self.subTestParams = 10
+        self.coordinator = None
+        self.localWorkers = 0
+        self.authkey = None
+        self.progress = False
+        self.progressInterval = 0.1
+        self._progress = None
         super(PrettyTextTestRunner, self).__init__(stream,
                                                    descriptions,
                                                    verbosity,
                                                    resultclass=PrettyTestResult)
+        # TextTestRunner resets `buffer`, force it back on
+        self.buffer = True
 
     def setProps(self, summary: dict, testReport: dict):
         """ @abstract Change report formatting
@@ -292,6 +954,259 @@ class PrettyTextTestRunner(TextTestRunner):
         self._summary_props = summary
         self._test_props = testReport
 
+    def _statusText(self, result, record: TestRecord) -> str:
+        """ @abstract Format the status cell of a test report row """
+        if self.timing and record.duration is not None:
+            _runTime = round(record.duration, 3)
+            return "({}s) {}".format(_runTime, result.STATUS[record.status])
+        return "{}".format(result.STATUS[record.status])
+
+    def _summaryReport(self, result) -> TextTable:
+        """ @abstract Build the summary table from the result tally
+            @params result [PrettyTestResult] Finished result
+            @returns [TextTable] Summary table
+        """
+        # Optional column sets as (props, per class cells, totals cells)
+        _extras = []
+        if self.fingerprintFile is not None:
+            _extras.append((self._cached_props, result.getClassCached,
+                            result.getCachedTally))
+        if self.testTimeout is not None or self.classTimeout is not None:
+            _extras.append((self._timeout_props, result.getClassTimeouts,
+                            result.getTimeoutTally))
+        if result.subTestTally:
+            _extras.append((self._subtest_props, result.getClassSubTests,
+                            result.getSubTestTally))
+        if self.phaseTiming:
+            _extras.append((self._fixture_props, result.getClassFixtureTimes,
+                            result.getFixtureTally))
+
+        _props = self._summary_props
+        if _extras:
+            _props = dict(_props)
+            for _key in ("titles", "colWidths", "colJustify"):
+                _props[_key] = list(_props[_key])
+                for _extraProps, _, _ in _extras:
+                    _props[_key] += _extraProps[_key]
+
+        _summary_table = TextTable(_props)
+        for _clsName in result.tally.keys():
+            # "Count", "Pass", "Fail", "Error", "Skip", "UnexpS", "ExpectF"],
+            _test_count = sum(result.tally[_clsName].values())
+            _row = [_clsName, str(_test_count), *result.getClassTally(_clsName)]
+            for _, _classCells, _ in _extras:
+                _row.extend(_classCells(_clsName))
+            _summary_table.appendRow(_row)
+        _totals = ["Totals", *result.getResultTally()]
+        for _, _, _totalCells in _extras:
+            _totals.extend(_totalCells())
+        _summary_table.appendRow(_totals)
+        return _summary_table
+
+    def _slowestReport(self, result) -> TextTable:
+        """ @abstract Build the slowest tests table, class and module fixtures
+                are listed alongside the tests.
+            @params result [PrettyTestResult] Finished result
+            @returns [TextTable] Slowest tests table
+        """
+        _entries = list(result.slowest)
+        for _kind in ("class", "module"):
+            for _name, _times in result.fixtureTimes[_kind].items():
+                _total = _times["setUp"] + _times["tearDown"]
+                if _total:
+                    _entries.append((_total, "{} ({} fixtures)".format(_name, _kind),
+                                     _times["setUp"], None, _times["tearDown"]))
+        _entries.sort(key=lambda _entry: _entry[0], reverse=True)
+
+        _seconds = lambda _ns: "" if _ns is None else "{}s".format(round(_ns / 1e9, 3))
+        _report = TextTable(self._slowest_props)
+        for _total, _name, _setUp, _body, _tearDown in _entries[:self.slowest]:
+            _report.appendRow([_name, _seconds(_setUp), _seconds(_body),
+                               _seconds(_tearDown), _seconds(_total)])
+        return _report
+
+    @property
+    def _summaryHeading(self) -> str:
+        if self.shard is None:
+            return "Summary"
+        return "Summary (shard {}/{})".format(self.shard[0] + 1, self.shard[1])
+
+    def _regressionReport(self, regressions: list) -> TextTable:
+        """ @abstract Build the performance regressions table
+            @params regressions [list] As returned by
+                `DurationHistory.regressions`
+            @returns [TextTable] Regressions table
+        """
+        _seconds = lambda _ns: "{}s".format(round(_ns / 1e9, 3))
+        _report = TextTable(self._regression_props)
+        for _testId, _duration, _mean, _stdDev in regressions:
+            _report.appendRow([_testId, _seconds(_duration), _seconds(_mean),
+                               _seconds(_stdDev),
+                               "{}x".format(round(_duration / _mean, 1))])
+        return _report
+
+    def _profileReports(self, result) -> list:
+        """ @abstract Build the hot functions and slowest tests top frames
+                tables, writing the per class pstats files if requested.
+            @params result [PrettyTestResult] Finished result
+            @returns [list] of (heading, TextTable), empty when not profiling
+        """
+        _profiler = result.profiler
+        if _profiler is None:
+            return []
+        from .profiling import funcLabel
+        _profiler.close()
+        if self.profileDir is not None and _profiler.mode == "deterministic":
+            _profiler.dumpClassStats(self.profileDir)
+
+        _seconds = lambda _s: "{}s".format(round(_s, 3))
+        _hot = TextTable(self._hot_props)
+        for _func, _calls, _own, _cum in _profiler.hotFunctions(self.profileTop):
+            _hot.appendRow([funcLabel(_func), "" if _calls is None else str(_calls),
+                            _seconds(_own), _seconds(_cum)])
+
+        _slow = TextTable(self._profile_props)
+        for _duration, _testId, _frames in _profiler.slowTests():
+            _slow.appendRow([_testId, _seconds(_duration),
+                             "; ".join("{} {}".format(funcLabel(_func), _seconds(_own))
+                                       for _func, _own in _frames)])
+        return [("Hot functions", _hot), ("Profiled slowest tests", _slow)]
+
+    def _closeHistory(self, result) -> list:
+        """ @abstract Check the finished run against its history and close it
+            @returns [list] Regressions, empty when history is disabled
+        """
+        if result.history is None:
+            return []
+        try:
+            return result.history.regressions(self.regressionRatio,
+                                              self.regressionSigma)
+        finally:
+            result.history.close()
+            result.history = None
+
+    def _classReport(self, result, clsName: str) -> TextTable:
+        """ @abstract Build the test report table of a single class
+            @params result [PrettyTestResult] Result holding the class rows
+            @params clsName [str] Class name as given by `testClsName`
+            @returns [TextTable] Class report table
+        """
+        _clsSet = result.results[clsName]
+        _props = self._test_props
+        if self.memory:
+            _props = dict(_props)
+            for _key in ("titles", "colWidths", "colJustify"):
+                _props[_key] = list(_props[_key]) + self._memory_props[_key]
+        _rows = []
+        for _rec in _clsSet:
+            _cells = [_rec.name, self._outputText(result, _rec),
+                      self._statusText(result, _rec)]
+            if self.memory:
+                _cells.append(self._memoryText(_rec))
+            _rows.append(_cells)
+            if _rec.subTests is not None:
+                _rows.extend(self._subTestRows(result, _rec))
+        _report = TextTable(_props)
+        _single = len(_rows) == 1
+        for _cells in _rows:
+            _report.appendRow(cells=_cells, single=_single)
+        return _report
+
+    def _subTestRows(self, result, record: TestRecord) -> list:
+        """ @abstract One report row per way the subtests of `record`
+                failed, listing the failing parameter sets.
+        """
+        _rows = []
+        for _group in record.subTests.groups.values():
+            _params = "\n".join(_group.params)
+            if _group.count > len(_group.params):
+                _params += "\nand {} more".format(_group.count - len(_group.params))
+            _cells = ["{} [{} subtests]".format(record.name, _group.count),
+                      "Failing for\n{}\n{}".format(_params, _group.failure.tracebackText),
+                      result.STATUS[_group.status]]
+            if self.memory:
+                _cells.append("")
+            _rows.append(_cells)
+        return _rows
+
+    def _outputText(self, result, record: TestRecord) -> str:
+        """ @abstract Format the output cell of a test report row, a reference
+                to the failure group when the failure is repeated. Streamed
+                reports show the first failure of a group in full.
+        """
+        _group = result.failureGroups.get(record.group) \
+            if self.groupFailures and record.group is not None else None
+        if record.subTests is not None:
+            return "{}\n{}".format(record.subTests.text(), record.output)
+        if _group is None or _group.count < 2 \
+                or (self.streaming and record.testId == _group.firstTest):
+            return str(record.output)
+        # Keep where and how this test failed, the group has the traceback
+        _lines = getattr(record.output, "tracebackText", "").strip().splitlines()
+        _where = next((_line.strip() for _line in _lines
+                       if _line.lstrip().startswith("File ")), None)
+        _summary = _lines[-1] if _lines else _group.summary
+        return "Failure group {} ({} tests): {}{} {}".format(
+            _group.fingerprint, _group.count,
+            _where + ": " if _where is not None else "", _summary,
+            getattr(record.output, "extra", ""))
+
+    def _groupReport(self, result) -> TextTable:
+        """ @abstract Build the failure groups table, largest first
+            @params result [PrettyTestResult] Finished result
+            @returns [TextTable] Failure groups table, None without repeats
+        """
+        _groups = result.failureGroups.repeated()
+        if not _groups:
+            return None
+        _report = TextTable(self._group_props)
+        for _group in _groups:
+            _report.appendRow(["{} first in {}".format(_group.fingerprint,
+                                                       _group.firstTest),
+                               str(_group.count), _group.failure.tracebackText])
+        return _report
+
+    def _memoryText(self, record: TestRecord) -> str:
+        """ @abstract Format the memory cell of a test report row """
+        if record.retainedBytes is None:
+            return ""
+        from .memory import formatBytes
+        return "{} {}".format(formatBytes(record.peakBytes) or "-",
+                              formatBytes(record.retainedBytes, signed=True))
+
+    def _leakReport(self, result) -> TextTable:
+        """ @abstract Build the memory leaks table, largest first
+            @params result [PrettyTestResult] Finished result
+            @returns [TextTable] Memory leaks table
+        """
+        from .memory import formatBytes
+        _report = TextTable(self._leak_props)
+        for _testId, _retained, _peak, _sites in sorted(
+                result.memoryLeaks, key=lambda _leak: _leak[1], reverse=True):
+            _report.appendRow([_testId, formatBytes(_retained, signed=True),
+                               formatBytes(_peak), "; ".join(_sites)])
+        return _report
+
+    def _streamClass(self, result, clsName: str):
+        """ @abstract Write a finished class to the stream and drop its rows,
+                keeping only the tally for the summary.
+            @params result [PrettyTestResult] Running result
+            @params clsName [str] Class name as given by `testClsName`
+        """
+        if clsName not in result.results:
+            return
+        if self._progress is not None:
+            self._progress.clear()
+        if self.mode == "full-report":
+            self.stream.write(clsName + "\n")
+            self._classReport(result, clsName).write(self.stream)
+        else:
+            self.stream.write("".join(_rec.status for _rec in result.results[clsName]))
+        self.stream.flush()
+
+        del result.results[clsName]
+        self._streamed = True
+
     def run(self, test: object) -> TestResult: 
         """ @abstract Run the test suite or case and display the report
             @params test [TestSuite|TestCase] Test suite or case object to run
@@ -304,6 +1219,76 @@ class PrettyTextTestRunner(TextTestRunner):
         result.failfast = self.failfast
         result.buffer = self.buffer
         result.tb_locals = self.tb_locals
+        result.phaseTiming = self.phaseTiming
+        result.slowestCount = self.slowest
+        result.subTestParams = self.subTestParams
+        result.writers = self.writers
+        if self.captureLimit is not None:
+            result.capture = (self.captureLimit, self.captureDir,
+                              self.captureHeadLines, self.captureTailLines)
+        if self.memory and self.threads <= 1:
+            from .memory import MemoryTracker
+            result.memory = MemoryTracker(self.memoryMode, self.leakThreshold)
+        if (self.testTimeout is not None or self.classTimeout is not None) \
+                and self.workers <= 1 and self.coordinator is None:
+            from .watchdog import Watchdog
+            result.watchdog = Watchdog(self.testTimeout, self.classTimeout)
+        if self.profile and self.workers <= 1 and self.threads <= 1 \
+                and self.coordinator is None:
+            from .profiling import TestProfiler
+            result.profiler = TestProfiler(self.profileMode, slowest=self.slowest)
+        if self.historyFile is not None and self.timing:
+            from .history import DurationHistory
+            result.history = DurationHistory(self.historyFile, self.historyWindow)
+        if self.shard is not None:
+            _durations = None
+            if self.shardDurations is not None:
+                from .history import DurationHistory
+                _shared = DurationHistory(self.shardDurations, self.historyWindow)
+                _durations = _shared.meanDurations()
+                _shared.close()
+            from .sharding import shardSuite
+            test = shardSuite(test, *self.shard, _durations)
+        if result.history is not None:
+            result.history.startRun()
+        self._streamed = False
+
+        _fingerprints = _cached = None
+        if self.fingerprintFile is not None:
+            from .selection import FingerprintCache
+            _fingerprints = FingerprintCache(self.fingerprintFile)
+            test, _cached = _fingerprints.select(test, result.testClsName)
+            for _test in _cached:
+                result.addCached(_test)
+            # Classes are needed after the run, the suite drops its tests
+            _ranClasses = {}
+            for _test in iterTests(test):
+                _ranClasses.setdefault(result.testClsName(_test), set()).add(_test.__class__)
+
+        if self.failureFirst and result.history is not None:
+            from .sharding import failureFirstSuite
+            test = failureFirstSuite(test, result.testClsName,
+                                     result.history.failedTests(),
+                                     result.history.meanDurations())
+
+        self._progress = None
+        if self.progress and not (self.streaming and self.mode != "full-report"):
+            from .progress import ProgressLine
+            self._progress = ProgressLine(self.stream, test.countTestCases(),
+                                          self.progressInterval,
+                                          color=SETTING_USE_COLOR)
+            result.writers = list(self.writers) + [self._progress]
+
+        if self.streaming:
+            for _cls in list(result.results):
+                self._streamClass(result, _cls)
+            result.expectClasses(iterTests(test),
+                                 lambda _cls: self._streamClass(result, _cls))
+
+        if self.asyncConcurrency > 0 and self.workers <= 1 and self.threads <= 1 \
+                and self.coordinator is None:
+            from .asyncSuite import groupAsyncClasses
+            test = groupAsyncClasses(iterTests(test), self.asyncConcurrency)
 
         timetaken = 0
         with warnings.catch_warnings():
@@ -328,57 +1313,72 @@ class PrettyTextTestRunner(TextTestRunner):
                 startTestRun()
 
             try:
-                test(result)
+                if self.coordinator is not None:
+                    from .distributed import runDistributed
+                    runDistributed(self, test, result)
+                elif self.workers > 1:
+                    runParallel(self, test, result)
+                elif self.threads > 1:
+                    # Fixture hooks are patched once, for every thread
+                    _timer = FixtureTimer(iterTests(test), result.fixtureTimes,
+                                          result.testClsName) \
+                        if self.phaseTiming else nullcontext()
+                    with _timer:
+                        runThreaded(self, test, result)
+                elif self.phaseTiming:
+                    with FixtureTimer(iterTests(test), result.fixtureTimes,
+                                      result.testClsName):
+                        test(result)
+                else:
+                    test(result)
             finally:
                 stopTestRun = getattr(result, 'stopTestRun', None)
                 if stopTestRun is not None:
                     stopTestRun()
+                if result.watchdog is not None:
+                    result.watchdog.close()
 
             stopTime = time.time()
             timeTaken = stopTime - startTime
 
-        # We need to start building the report to display
-        _reportOrder = result.tally.keys()
-        if self.mode == "full-report":
-            _summary_table = TextTable(self._summary_props)
-            _total_count = _total_success = _total_fail = _total_err = 0
-            _total_skip = _total_unexpS = _total_expectF = 0
+        _regressions = self._closeHistory(result)
+        _profileReports = self._profileReports(result)
+        if result.memory is not None:
+            result.memory.close()
+        if result.memoryLeaks:
+            _profileReports.append(("Memory leaks", self._leakReport(result)))
+        _groupReport = self._groupReport(result) if self.groupFailures else None
+        if _groupReport is not None:
+            _profileReports.insert(0, ("Failure groups", _groupReport))
+        if _fingerprints is not None:
+            _fingerprints.update(_ranClasses,
+                                 {_cls: result.classPassed(_cls)
+                                  for _cls in _ranClasses if _cls in result.tally})
+            _fingerprints.save()
 
-            for _clsName in _reportOrder:
-                # "Count", "Pass", "Fail", "Error", "Skip", "UnexpS", "ExpectF"],
-                _test_count = sum(result.tally[_clsName].values())
-                _summary_table.appendRow([_clsName, str(_test_count),
-                                          *result.getClassTally(_clsName)])
+        if self.streaming:
+            self._streamSummary(result, timeTaken, _regressions, _profileReports)
+            return result
 
+        # We need to start building the report to display
+        _reportOrder = result.tally.keys()
         _resultTotals = result.getResultTally()
         _stats = ""
 
         if self.mode == "full-report":
-            _summary_table.appendRow(["Totals", *_resultTotals])
-
-            _reports = [("Summary", _summary_table)]
+            _reports = [(self._summaryHeading, self._summaryReport(result))]
+            if self.phaseTiming:
+                _reports.append(("Slowest", self._slowestReport(result)))
+            if _regressions:
+                _reports.append(("Performance regressions",
+                                 self._regressionReport(_regressions)))
+            _reports.extend(_profileReports)
 
         for _cls in _reportOrder:
-            _clsSet = result.results[_cls]
-            if self.mode == "full-report":
-                _report = TextTable(self._test_props)
-
-            _single = len(_clsSet) == 1
-            for _name, _test, _status, _output in _clsSet:
-                if self.mode == "full-report":
-                    if self.timing:
-                        _execTimes = result.execTimes[_test.id()]
-                        _runTime = round(_execTimes["stop"] - _execTimes["start"], 3)
-                        _statStr = "({}s) {}".format(_runTime, result.STATUS[_status])
-                    else:
-                        _statStr = "{}".format(result.STATUS[_status])
-
-                    _report.appendRow(cells=[_name, _output, _statStr], single=_single)
-                else:
-                    _stats += _status
-
             if self.mode == "full-report":
-                _reports.append((_cls, _report))
+                _reports.append((_cls, self._classReport(result, _cls)))
+            else:
+                _stats += "".join(_rec.status for _rec in result.results[_cls])
 
         if self.mode == "full-report":
             for _heading, _report in _reports:
@@ -395,3 +1395,33 @@ class PrettyTextTestRunner(TextTestRunner):
                                       _resultTotals[2], round(timeTaken, 3)))
         return result
 
+    def _streamSummary(self, result, timeTaken: float, regressions: list,
+                       profileReports: list=()):
+        """ @abstract Write the closing summary of a streamed run. Class
+                reports have already been written as they finished.
+            @params result [PrettyTestResult] Finished result
+            @params timeTaken [float] Overall runtime in seconds
+            @params regressions [list] Flagged tests, see `_closeHistory`
+            @params profileReports [list] See `_profileReports`
+        """
+        _resultTotals = result.getResultTally()
+        if self.mode == "full-report":
+            self.stream.write(self._summaryHeading + "\n")
+            self._summaryReport(result).write(self.stream)
+            if self.phaseTiming:
+                self.stream.write("Slowest\n")
+                self._slowestReport(result).write(self.stream)
+            if regressions:
+                self.stream.write("Performance regressions\n")
+                self._regressionReport(regressions).write(self.stream)
+            for _heading, _report in profileReports:
+                self.stream.write(_heading + "\n")
+                _report.write(self.stream)
+            if self.timing:
+                self.stream.write("runtime: {}s\n".format(round(timeTaken, 3)))
+        else:
+            simplereport = "{}pass: {}, failed: {}, errors: {}, runtime: {}s\n"
+            self.stream.write(simplereport.format(" " if self._streamed else "",
+                                                  _resultTotals[1], _resultTotals[3],
+                                                  _resultTotals[2], round(timeTaken, 3)))
+        self.stream.flush()
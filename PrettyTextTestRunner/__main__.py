@@ -0,0 +1,297 @@
+import argparse
+import os
+import sys
+
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+__doc__ = """
+Discover and run tests with PrettyTextTestRunner.
+
+python -m PrettyTextTestRunner [start] [-p PATTERN] [-t TOP] [-k KEYWORD]
+python -m PrettyTextTestRunner merge FILE [FILE ...]
+python -m PrettyTextTestRunner worker ADDRESS
+
+Discovery is cached in an index file (`--index`), later runs only import
+new or changed test modules before the run starts. With `--watch` the
+process stays up and reruns the tests affected by each source change.
+`--results` writes a result file, `merge` reports any number of them, for
+example one per shard, as if they were a single run. `--coordinator`
+serves the test classes to `worker` processes on any host sharing the
+checkout, and reports their results as one run.
+"""
+
+INDEX_FILE = ".prettytest-index.json"
+
+
+def _shard(value: str) -> tuple:
+    """ @abstract Parse a one based "i/n" shard into (index, total) """
+    try:
+        _index, _total = (int(_part) for _part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected i/n, got {!r}".format(value))
+    if not 1 <= _index <= _total:
+        raise argparse.ArgumentTypeError("shard {} out of range".format(value))
+    return _index - 1, _total
+
+
+def parseArgs(argv: list=None):
+    _parser = argparse.ArgumentParser(prog="python -m PrettyTextTestRunner",
+                                      description=__doc__.strip().splitlines()[0])
+    _parser.add_argument("start", nargs="?", default=".",
+                         help="Directory to start discovery from (default: .)")
+    _parser.add_argument("-p", "--pattern", default="test*.py",
+                         help="Test file pattern (default: test*.py)")
+    _parser.add_argument("-t", "--top-level-directory", dest="top",
+                         help="Import root (default: start directory)")
+    _parser.add_argument("-k", dest="keywords", action="append", default=[],
+                         help="Only run tests whose id matches, may be repeated")
+    _parser.add_argument("--index", help="Discovery index file (default: {} in "
+                                         "the top level directory)".format(INDEX_FILE))
+    _parser.add_argument("--no-index", action="store_true",
+                         help="Use plain TestLoader.discover")
+    _parser.add_argument("--rebuild-index", action="store_true",
+                         help="Import every module to rebuild the index")
+    _parser.add_argument("--watch", action="store_true",
+                         help="Rerun affected tests whenever sources change")
+    _parser.add_argument("--watch-interval", type=float, default=0.5,
+                         help="Seconds between source polls (default: 0.5)")
+
+    _group = _parser.add_argument_group("report")
+    _group.add_argument("--simple", action="store_true", help="Simple report")
+    _group.add_argument("--no-timing", action="store_true", help="Hide test times")
+    _group.add_argument("--streaming", action="store_true",
+                        help="Write each class report as it finishes")
+    _group.add_argument("--phase-timing", action="store_true",
+                        help="Time setUp, test body, tearDown and fixtures")
+    _group.add_argument("--slowest", type=int, default=10)
+    _group.add_argument("--capture-limit", type=int,
+                        help="Characters of output kept in memory per test, the "
+                             "rest spills to a log file kept after the run")
+    _group.add_argument("--capture-dir", help="Directory for spilled output logs "
+                                              "(default: the system temp directory)")
+    _group.add_argument("--group-failures", action="store_true",
+                        help="List repeated failures once in a failure groups report")
+    _group.add_argument("--progress", action="store_true",
+                        help="Live progress line with rate and ETA")
+    _group.add_argument("--subtest-params", type=int, default=10,
+                        help="Failing parameter sets listed per subtest failure")
+
+    _group = _parser.add_argument_group("execution")
+    _group.add_argument("-f", "--failfast", action="store_true")
+    _group.add_argument("--workers", type=int, default=1, help="Processes")
+    _group.add_argument("--threads", type=int, default=1, help="Threads")
+    _group.add_argument("--async-concurrency", type=int, default=0)
+    _group.add_argument("--timeout", type=float,
+                        help="Seconds a test may run before it is interrupted, "
+                             "with --threads only once a blocking call returns")
+    _group.add_argument("--class-timeout", type=float,
+                        help="Seconds the tests of a class may run together")
+    _group.add_argument("--coordinator", metavar="ADDRESS",
+                        help="Serve test classes to workers on host:port or a "
+                             "Unix socket path")
+    _group.add_argument("--local-workers", type=int, default=0,
+                        help="Worker processes the coordinator starts itself")
+    _group.add_argument("--authkey", help="Key shared with the workers "
+                                          "(default: $PRETTYTEST_AUTHKEY)")
+    _group.add_argument("--shard", type=_shard,
+                        help="Run shard i of n, e.g. 2/4, balanced by test count "
+                             "unless --shard-durations is given")
+    _group.add_argument("--shard-durations",
+                        help="History file to balance shards by durations, "
+                             "must be the same file on every node")
+    _group.add_argument("--fingerprints", help="Skip unchanged passing classes, "
+                                               "cached in this file")
+
+    _group = _parser.add_argument_group("analysis")
+    _group.add_argument("--history", help="SQLite duration history file")
+    _group.add_argument("--failure-first", action="store_true",
+                        help="Run last failures first, then fastest classes "
+                             "first, needs --history")
+    _group.add_argument("--profile", nargs="?", const="deterministic",
+                        choices=["deterministic", "sampling"])
+    _group.add_argument("--profile-dir", help="Write per class .pstats files here")
+    _group.add_argument("--memory", nargs="?", const="tracemalloc",
+                        choices=["tracemalloc", "rss"])
+    _group.add_argument("--leak-threshold", type=int,
+                        help="Flag tests retaining more bytes than this")
+
+    _group = _parser.add_argument_group("output files")
+    _group.add_argument("--junit", help="JUnit XML file")
+    _group.add_argument("--jsonl", help="JSON lines file")
+    _group.add_argument("--results", help="Result file for `merge`, gzip "
+                                          "compressed when ending in .gz")
+    _args = _parser.parse_args(argv)
+    if _args.watch and _args.no_index:
+        _parser.error("--watch needs the discovery index")
+    if _args.failure_first and not _args.history:
+        _parser.error("--failure-first needs --history")
+    if _args.local_workers and not _args.coordinator:
+        _parser.error("--local-workers needs --coordinator")
+    if _args.coordinator and not _args.local_workers \
+            and not (_args.authkey or os.environ.get("PRETTYTEST_AUTHKEY")):
+        _parser.error("--coordinator needs --authkey or $PRETTYTEST_AUTHKEY "
+                      "for remote workers")
+    return _args
+
+
+def loadIndex(args):
+    """ @abstract DiscoveryIndex for the parsed arguments """
+    from .discovery import DiscoveryIndex
+    _top = args.top or args.start
+    return DiscoveryIndex(args.index or os.path.join(_top, INDEX_FILE),
+                          args.start, args.pattern, args.top)
+
+
+def loadSuite(args):
+    """ @abstract Discover the suite, through the index unless disabled """
+    if args.no_index:
+        from unittest import TestLoader
+        return TestLoader().discover(args.start, args.pattern, args.top)
+    return loadIndex(args).suite(args.keywords, args.rebuild_index)
+
+
+def buildRunner(args):
+    """ @abstract PrettyTextTestRunner configured from the parsed arguments """
+    from . import PrettyTextTestRunner
+    runner = PrettyTextTestRunner()
+    runner.mode = "simple" if args.simple else "full-report"
+    runner.timing = not args.no_timing
+    runner.streaming = args.streaming
+    runner.phaseTiming = args.phase_timing
+    runner.slowest = args.slowest
+    runner.captureLimit = args.capture_limit or None
+    runner.captureDir = args.capture_dir
+    runner.progress = args.progress
+    runner.groupFailures = args.group_failures
+    runner.subTestParams = args.subtest_params
+    runner.failfast = args.failfast
+    runner.workers = args.workers
+    runner.threads = args.threads
+    runner.asyncConcurrency = args.async_concurrency
+    runner.shard = args.shard
+    runner.shardDurations = args.shard_durations
+    runner.testTimeout = args.timeout
+    runner.classTimeout = args.class_timeout
+    runner.coordinator = args.coordinator
+    runner.localWorkers = args.local_workers
+    runner.authkey = args.authkey
+    runner.fingerprintFile = args.fingerprints
+    runner.historyFile = args.history
+    runner.failureFirst = args.failure_first
+    if args.profile:
+        runner.profile = True
+        runner.profileMode = args.profile
+        runner.profileDir = args.profile_dir
+    if args.memory:
+        runner.memory = True
+        runner.memoryMode = args.memory
+        runner.leakThreshold = args.leak_threshold
+    if args.junit:
+        from .writers import JUnitXMLWriter
+        runner.writers.append(JUnitXMLWriter(args.junit))
+    if args.jsonl:
+        from .writers import JSONLinesWriter
+        runner.writers.append(JSONLinesWriter(args.jsonl))
+    if getattr(args, "results", None):
+        from .writers import ResultFileWriter
+        runner.writers.append(ResultFileWriter(args.results))
+    return runner
+
+
+def parseMergeArgs(argv: list):
+    _parser = argparse.ArgumentParser(prog="python -m PrettyTextTestRunner merge",
+                                      description="Report result files as one run")
+    _parser.add_argument("files", nargs="+", help="Files written with --results")
+    _group = _parser.add_argument_group("report")
+    _group.add_argument("--simple", action="store_true", help="Simple report")
+    _group.add_argument("--no-timing", action="store_true", help="Hide test times")
+    _group.add_argument("--phase-timing", action="store_true",
+                        help="Add fixture columns and the slowest tests report")
+    _group.add_argument("--slowest", type=int, default=10)
+    _group.add_argument("--group-failures", action="store_true",
+                        help="List repeated failures once in a failure groups report")
+
+    _group = _parser.add_argument_group("output files")
+    _group.add_argument("--junit", help="JUnit XML file")
+    _group.add_argument("--jsonl", help="JSON lines file")
+    _group.add_argument("--results", help="Combined result file")
+    return _parser.parse_args(argv)
+
+
+def merge(argv: list) -> int:
+    """ @abstract Report result files as one run, see `mergeResultFiles` """
+    _args = parseMergeArgs(argv)
+    from . import PrettyTextTestRunner
+    from .merge import mergeResultFiles
+    runner = PrettyTextTestRunner()
+    runner.mode = "simple" if _args.simple else "full-report"
+    runner.timing = not _args.no_timing
+    runner.phaseTiming = _args.phase_timing
+    runner.slowest = _args.slowest
+    runner.groupFailures = _args.group_failures
+    if _args.junit:
+        from .writers import JUnitXMLWriter
+        runner.writers.append(JUnitXMLWriter(_args.junit))
+    if _args.jsonl:
+        from .writers import JSONLinesWriter
+        runner.writers.append(JSONLinesWriter(_args.jsonl))
+    if _args.results:
+        from .writers import ResultFileWriter
+        runner.writers.append(ResultFileWriter(_args.results))
+    try:
+        result = mergeResultFiles(_args.files, runner)
+    except (OSError, ValueError) as _err:
+        sys.stderr.write("merge: {}\n".format(_err))
+        return 2
+    return 0 if all(result.classPassed(_cls) for _cls in result.tally) else 1
+
+
+def worker(argv: list) -> int:
+    """ @abstract Run units for a coordinator, see `runWorker` """
+    _parser = argparse.ArgumentParser(prog="python -m PrettyTextTestRunner worker",
+                                      description="Run tests for a coordinator")
+    _parser.add_argument("address", help="Coordinator host:port or Unix socket path")
+    _parser.add_argument("--authkey", help="Key shared with the coordinator "
+                                           "(default: $PRETTYTEST_AUTHKEY)")
+    _args = _parser.parse_args(argv)
+    from multiprocessing import AuthenticationError
+    from .distributed import parseAddress, resolveAuthkey, runWorker
+    _authkey = resolveAuthkey(_args.authkey)
+    if _authkey is None:
+        _parser.error("--authkey or $PRETTYTEST_AUTHKEY is needed")
+    try:
+        runWorker(parseAddress(_args.address), _authkey)
+    except (OSError, EOFError, AuthenticationError) as _err:
+        sys.stderr.write("worker: {}\n".format(_err))
+        return 2
+    return 0
+
+
+def main(argv: list=None) -> int:
+    _argv = sys.argv[1:] if argv is None else argv
+    if _argv[:1] == ["merge"]:
+        return merge(_argv[1:])
+    if _argv[:1] == ["worker"]:
+        return worker(_argv[1:])
+    _args = parseArgs(_argv)
+    if _args.watch:
+        from .watch import Watcher
+        _index = loadIndex(_args)
+        if _args.rebuild_index:
+            _index.refresh(rebuild=True)
+        return Watcher(buildRunner(_args), _index, _args.keywords,
+                       _args.watch_interval).run()
+    _suite = loadSuite(_args)
+    if _args.no_index and _args.keywords:
+        from .parallel import iterTests
+        from .discovery import matchesKeywords
+        _suite = _suite.__class__([_test for _test in iterTests(_suite)
+                                   if matchesKeywords(_test.id(), _args.keywords)])
+    result = buildRunner(_args).run(_suite)
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
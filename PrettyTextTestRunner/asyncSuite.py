@@ -0,0 +1,376 @@
+import asyncio
+import sys
+import time
+import traceback
+from inspect import isawaitable
+from io import StringIO
+from unittest import SkipTest, TestSuite
+from unittest.case import _Outcome, _ShouldStop, _SubTest
+
+from .threaded import ThreadLocalStream
+
+__name__ = "PrettyTextTestRunner.asyncSuite"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Hide this module's frames from reported tracebacks, as unittest does
+__unittest = True
+
+
+def isConcurrentAsync(test) -> bool:
+    """ @abstract True for tests of a class opted in with `concurrentAsync = True` """
+    return bool(getattr(test.__class__, "concurrentAsync", False))
+
+
+def groupAsyncClasses(tests, limit: int) -> TestSuite:
+    """ @abstract Gather consecutive tests of opted in classes into
+            `ConcurrentAsyncSuite` groups, other tests are left as they are.
+        @params tests [iterable] TestCase instances in run order, see `iterTests`
+        @params limit [int] Concurrency limit of each group
+        @returns [TestSuite] Suite running in the same order
+    """
+    _tests = []
+    _group = None
+    for _test in tests:
+        if isConcurrentAsync(_test):
+            if _group is None or _group.testClass is not _test.__class__:
+                _group = ConcurrentAsyncSuite(limit=limit)
+                _group.testClass = _test.__class__
+                _tests.append(_group)
+            _group.addTest(_test)
+        else:
+            _group = None
+            _tests.append(_test)
+    return TestSuite(_tests)
+
+
+def _awaitStack(coro) -> str:
+    """ @abstract Format where a suspended coroutine waits, following its
+            chain of awaited coroutines down to the innermost one
+    """
+    _frames = []
+    while coro is not None:
+        _frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if _frame is not None:
+            _frames.append((_frame, _frame.f_lineno))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return "".join(traceback.format_list(traceback.StackSummary.extract(_frames)))
+
+
+class _Overran(Exception):
+    """ @abstract A test ran past its timeout, args are (kind, limit, stack) """
+
+
+class _Recorder(object):
+    """ @abstract Stand-in result of a running test's `_Outcome`, keeping
+            the subtest calls for `_replay` along with each subtest's time
+        @params result [TestResult] Result the test is reported to
+    """
+
+    def __init__(self, result):
+        self.failfast = getattr(result, "failfast", False)
+        self.calls = []
+        self._mark = time.perf_counter_ns()
+
+    def _keep(self, name: str, *args):
+        _now = time.perf_counter_ns()
+        self.calls.append((name, args, _now - self._mark))
+        self._mark = _now
+
+    def addSubTest(self, test, subtest, err):
+        self._keep("addSubTest", test, subtest, err)
+
+    def addSkip(self, test, reason):
+        self._keep("addSkip", test, reason)
+
+    def feed(self, outcome):
+        """ @abstract Take the subtest outcomes Python < 3.11 keeps in
+                `_Outcome.errors` and `_Outcome.skipped` instead of reporting
+                them
+        """
+        for _test, _err in getattr(outcome, "errors", ()):
+            if isinstance(_test, _SubTest):
+                self._keep("addSubTest", _test.test_case, _test, _err)
+        for _test, _reason in getattr(outcome, "skipped", ()):
+            self._keep("addSkip", _test, _reason)
+        for _name in ("errors", "skipped"):
+            if hasattr(outcome, _name):
+                getattr(outcome, _name).clear()
+
+
+class ConcurrentAsyncSuite(TestSuite):
+    """ @abstract Runs the tests of one IsolatedAsyncioTestCase class
+            concurrently on a single event loop. setUpClass/setUpModule run
+            once for the group like in a serial run, each test keeps its own
+            setUp/asyncSetUp/asyncTearDown/tearDown and cleanups. Output of
+            each test is buffered apart while the tests run, subtests are
+            kept and the result's test and class timeouts are enforced on the
+            loop, the result only sees each test once it finished.
+        @params tests [iterable] Tests of a single class
+        @params limit [int] Maximum number of tests in flight
+    """
+    testClass = None
+
+    def __init__(self, tests=(), limit: int=10):
+        super(ConcurrentAsyncSuite, self).__init__(tests)
+        self.limit = limit
+
+    def run(self, result, debug=False):
+        _tests = [_test for _test in self if _test is not None]
+        if not _tests:
+            return result
+
+        _first = _tests[0]
+        self._tearDownPreviousClass(_first, result)
+        self._handleModuleFixture(_first, result)
+        self._handleClassSetUp(_first, result)
+        result._previousTestClass = _first.__class__
+        if getattr(_first.__class__, "_classSetupFailed", False) \
+                or getattr(result, "_moduleSetUpFailed", False):
+            return result
+
+        # Per task output buffers, unless a threaded run installed them
+        _streams = None
+        if getattr(result, "buffer", False) and not isinstance(sys.stdout, ThreadLocalStream):
+            _streams = sys.stdout, sys.stderr
+            sys.stdout, sys.stderr = ThreadLocalStream(sys.stdout), ThreadLocalStream(sys.stderr)
+        _loop = asyncio.new_event_loop()
+        try:
+            _loop.run_until_complete(self._runAll(_tests, result))
+        finally:
+            _loop.run_until_complete(_loop.shutdown_asyncgens())
+            _loop.close()
+            if _streams is not None:
+                sys.stdout, sys.stderr = _streams
+        if self._cleanup:
+            self._tests = []
+        return result
+
+    async def _runAll(self, tests: list, result):
+        """ @abstract Run `tests` with at most `limit` in flight. Finished
+                tests are reported as an in-order prefix, so the report keeps
+                the serial order.
+        """
+        _slots = asyncio.Semaphore(max(1, self.limit))
+        _finished = [None] * len(tests)
+        _reported = 0
+        _capture = getattr(result, "buffer", False)
+        _watchdog = getattr(result, "watchdog", None)
+        _testTimeout = getattr(_watchdog, "testTimeout", None)
+        _classTimeout = getattr(_watchdog, "classTimeout", None)
+        _classEnd = time.monotonic() + _classTimeout if _classTimeout is not None else None
+
+        async def _guarded(idx, test):
+            nonlocal _reported
+            async with _slots:
+                if not result.shouldStop:
+                    # The tighter of the test's own and the class's budget
+                    _timeout = ("test", _testTimeout, _testTimeout)
+                    if _classEnd is not None:
+                        _left = _classEnd - time.monotonic()
+                        if _testTimeout is None or _left < _testTimeout:
+                            _timeout = ("class", _classTimeout, _left)
+                    _finished[idx] = await self._runTest(test, result, _capture, _timeout)
+                else:
+                    _finished[idx] = ()
+            while _reported < len(tests) and _finished[_reported] is not None:
+                _report, _finished[_reported] = _finished[_reported], ()
+                if _report:
+                    self._report(tests[_reported], result, *_report)
+                _reported += 1
+
+        await asyncio.gather(*[_guarded(_idx, _test)
+                               for _idx, _test in enumerate(tests)])
+
+    async def _call(self, func, *args):
+        _value = func(*args)
+        if isawaitable(_value):
+            _value = await _value
+        return _value
+
+    async def _runTest(self, test, result, capture: bool=False, timeout: tuple=None) -> tuple:
+        """ @abstract Run one test's full lifecycle without touching the
+                result, test methods and fixtures may interleave with others.
+            @params result [TestResult] Result the test is reported to later
+            @params capture [bool] Buffer the test's output for the report
+            @params timeout [tuple] (kind, limit, seconds left) for setUp and
+                the test body before they are cancelled, seconds left None
+                for no limit
+            @returns [tuple] Arguments for `_report` after the test
+        """
+        _output = None
+        if capture and isinstance(sys.stdout, ThreadLocalStream):
+            # Only this task's context sees the redirection
+            _output = StringIO(), StringIO()
+            sys.stdout.redirect(_output[0])
+            sys.stderr.redirect(_output[1])
+        try:
+            _report = await self._lifecycle(test, result, timeout)
+        finally:
+            if _output is not None:
+                sys.stdout.redirect(None)
+                sys.stderr.redirect(None)
+        if _output is not None:
+            _report += (tuple(_buffer.getvalue() for _buffer in _output),)
+        return _report
+
+    async def _lifecycle(self, test, result, timeout: tuple=None) -> tuple:
+        _method = getattr(test, test._testMethodName)
+        _phases = {"setUp": 0, "body": 0, "tearDown": 0}
+        _outcome = ("success", None)
+        _start = time.perf_counter_ns()
+        _kind, _limit, _left = timeout if timeout is not None else (None, None, None)
+
+        _skip = getattr(test.__class__, "__unittest_skip__", False) \
+            or getattr(_method, "__unittest_skip__", False)
+        if _skip:
+            _reason = getattr(test.__class__, "__unittest_skip_why__", "") \
+                or getattr(_method, "__unittest_skip_why__", "")
+            return (("skip", _reason), _start, time.perf_counter_ns(), _phases, [], ())
+        if _left is not None and _left <= 0:
+            # The class ran out, report the test without running it
+            return (("timeout", (_kind, _limit, None)), _start, time.perf_counter_ns(),
+                    _phases, [], ())
+
+        _expecting = getattr(_method, "__unittest_expecting_failure__", False) \
+            or getattr(test, "__unittest_expecting_failure__", False)
+        _setUpDone = False
+        # A real outcome, so subTest() reports each subtest like a serial run
+        _recorder = _Recorder(result)
+        test._outcome = _Outcome(_recorder)
+        test._outcome.expecting_failure = _expecting
+
+        async def _setUpAndRun():
+            nonlocal _setUpDone
+            _mark = time.perf_counter_ns()
+            test.setUp()
+            if hasattr(test, "asyncSetUp"):
+                await test.asyncSetUp()
+            _phases["setUp"] = time.perf_counter_ns() - _mark
+            _setUpDone = True
+
+            _mark = time.perf_counter_ns()
+            try:
+                await self._call(_method)
+            finally:
+                _phases["body"] = time.perf_counter_ns() - _mark
+
+        try:
+            if _left is None:
+                await _setUpAndRun()
+            else:
+                _task = asyncio.ensure_future(_setUpAndRun())
+                _done, _ = await asyncio.wait({_task}, timeout=_left)
+                if not _done:
+                    # Stack of the test where it overran, before cancelling it
+                    _stack = _awaitStack(_task.get_coro())
+                    _task.cancel()
+                    await asyncio.wait({_task})
+                    raise _Overran(_kind, _limit, _stack)
+                _task.result()
+            _recorder.feed(test._outcome)
+            if test._outcome.expectedFailure is not None:
+                _outcome = ("expectedFailure", test._outcome.expectedFailure)
+            elif not test._outcome.success:
+                # Its subtests failed or skipped, they tell the outcome
+                _outcome = ("subTests", None)
+            elif _expecting:
+                _outcome = ("unexpectedSuccess", None)
+        except KeyboardInterrupt:
+            raise
+        except _ShouldStop:
+            _outcome = ("subTests", None)
+        except _Overran as _exc:
+            _outcome = ("timeout", _exc.args)
+        except SkipTest as _exc:
+            _outcome = ("skip", str(_exc))
+        except test.failureException:
+            _outcome = ("expectedFailure" if _expecting and _setUpDone
+                        else "failure", sys.exc_info())
+        except BaseException:
+            _outcome = ("expectedFailure" if _expecting and _setUpDone
+                        else "error", sys.exc_info())
+
+        _mark = time.perf_counter_ns()
+        _errors = []
+        if _setUpDone:
+            try:
+                if hasattr(test, "asyncTearDown"):
+                    await test.asyncTearDown()
+                test.tearDown()
+            except KeyboardInterrupt:
+                raise
+            except BaseException:
+                _errors.append(sys.exc_info())
+        while test._cleanups:
+            _function, _args, _kwargs = test._cleanups.pop()
+            try:
+                _value = _function(*_args, **_kwargs)
+                if isawaitable(_value):
+                    await _value
+            except KeyboardInterrupt:
+                raise
+            except BaseException:
+                _errors.append(sys.exc_info())
+        _phases["tearDown"] = time.perf_counter_ns() - _mark
+        _recorder.feed(test._outcome)
+        test._outcome = None
+
+        return (_outcome, _start, time.perf_counter_ns(), _phases, _errors, _recorder.calls)
+
+    def _report(self, test, result, outcome: tuple, start: int, stop: int,
+                phases: dict, errors: list=(), calls: list=(), output: tuple=None):
+        """ @abstract Replay a finished test into `result` with its measured
+                times and buffered output, the calls of one test never
+                interleave with another. The watchdog is left out, the test
+                already ran.
+        """
+        _watchdog = getattr(result, "watchdog", None)
+        if _watchdog is not None:
+            result.watchdog = None
+        try:
+            self._replay(test, result, outcome, start, stop, phases, errors, calls, output)
+        finally:
+            if _watchdog is not None:
+                result.watchdog = _watchdog
+
+    def _replay(self, test, result, outcome: tuple, start: int, stop: int,
+                phases: dict, errors: list, calls: list, output: tuple):
+        result.startTest(test)
+        if hasattr(result, "setTestTimes"):
+            result.setTestTimes(start, stop, phases)
+        if output is not None:
+            # startTest pointed the streams at the result's buffers
+            sys.stdout.write(output[0])
+            sys.stderr.write(output[1])
+        try:
+            for _name, _args, _durationNs in calls:
+                if getattr(result, "_subTestMark", None) is not None:
+                    # Time the subtest as it ran, not as it is replayed
+                    result._subTestMark = time.perf_counter_ns() - _durationNs
+                getattr(result, _name)(*_args)
+            _kind, _detail = outcome
+            if _kind == "success":
+                if not errors:
+                    result.addSuccess(test)
+            elif _kind == "skip":
+                result.addSkip(test, _detail)
+            elif _kind == "failure":
+                result.addFailure(test, _detail)
+            elif _kind == "error":
+                result.addError(test, _detail)
+            elif _kind == "expectedFailure":
+                result.addExpectedFailure(test, _detail)
+            elif _kind == "unexpectedSuccess":
+                result.addUnexpectedSuccess(test)
+            elif _kind == "timeout":
+                _timeoutKind, _limit, _stack = _detail
+                if hasattr(result, "addTimeout"):
+                    result.addTimeout(test, result._timeoutText(_timeoutKind, _limit, _stack))
+                else:
+                    result.addError(test, (_Overran, _Overran(*_detail), None))
+            for _err in errors:
+                result.addError(test, _err)
+        finally:
+            result.stopTest(test)
@@ -0,0 +1,356 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import sys
+import time
+from unittest import TestCase, TestSuite, TestResult, skip
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from . import PrettyTestResult, PrettyTextTestRunner, __version__
+from .textTable import TextTable
+
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+__doc__ = """
+Runner overhead benchmarks, each case is measured in a fresh process.
+
+python -m PrettyTextTestRunner.benchmark records --count 100000
+python -m PrettyTextTestRunner.benchmark table --rows 1000 100000 1000000
+python -m PrettyTextTestRunner.benchmark result --count 100000 --fail-rate 0.1
+python -m PrettyTextTestRunner.benchmark run --sizes 1000 100000 1000000 \
+    --fail-rate 0.01 --skip-rate 0.05 --output-rate 0.1 --output-size 200 \
+    --json-out bench.json
+"""
+
+
+class _SyntheticTest(TestCase):
+    """ @abstract Trivial test holding a fixture of `fixtureSize` bytes """
+    fixtureSize = 0
+
+    def setUp(self):
+        self.fixture = bytearray(self.fixtureSize)
+
+    def test_pass(self):
+        pass
+
+
+class _TupleLayoutResult(PrettyTestResult):
+    """ @abstract PrettyTestResult storing rows as the original
+            (name, test, status, output) tuples plus a nested execTimes dict,
+            kept for comparison only.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(_TupleLayoutResult, self).__init__(*args, **kwargs)
+        self.tupleTimes = {}
+
+    def _record(self, test, status: str, output: str=""):
+        self.results[self.testClsName(test)].append(
+            (self.testName(test), test, status, output))
+        self.tupleTimes[test.id()] = {"start": time.time(), "stop": time.time()}
+
+
+class _MixedTest(TestCase):
+    """ @abstract Trivial tests making up the synthetic suites """
+    outputSize = 0
+
+    def test_pass(self):
+        pass
+
+    def test_fail(self):
+        self.fail("synthetic failure")
+
+    @skip("synthetic skip")
+    def test_skip(self):
+        pass
+
+    def test_output(self):
+        sys.stdout.write("x" * self.outputSize)
+
+
+def syntheticSuite(count: int, failRate: float=0.0, skipRate: float=0.0,
+                   outputRate: float=0.0, seed: int=0) -> TestSuite:
+    """ @abstract Build a suite of `count` trivial tests with the given mix
+        @params count [int] Number of tests
+        @params failRate [float] Share of failing tests
+        @params skipRate [float] Share of skipped tests
+        @params outputRate [float] Share of tests writing
+            `_MixedTest.outputSize` characters to stdout
+        @params seed [int] Seed of the mix, runs with the same seed match
+        @returns [TestSuite] Suite of `_MixedTest`
+    """
+    _random = random.Random(seed)
+    _tests = []
+    for _ in range(count):
+        _draw = _random.random()
+        if _draw < failRate:
+            _name = "test_fail"
+        elif _draw < failRate + skipRate:
+            _name = "test_skip"
+        elif _draw < failRate + skipRate + outputRate:
+            _name = "test_output"
+        else:
+            _name = "test_pass"
+        _tests.append(_MixedTest(_name))
+    return TestSuite(_tests)
+
+
+def _peakRSS() -> int:
+    """ @abstract Peak resident set size of this process, in KiB """
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measureRecords(layout: str, count: int, fixtureSize: int, queue):
+    _SyntheticTest.fixtureSize = fixtureSize
+    _resultClass = _TupleLayoutResult if layout == "tuple" else PrettyTestResult
+    result = _resultClass(None, 1, 0)
+    result.timing = True
+    _before = _peakRSS()
+    _start = time.perf_counter()
+    for _ in range(count):
+        # Tests are created one at a time, as TestSuite drops them after
+        # running, so only the result can keep them alive
+        _SyntheticTest("test_pass")(result)
+    queue.put({
+        "layout": layout,
+        "count": count,
+        "fixtureSize": fixtureSize,
+        "seconds": round(time.perf_counter() - _start, 4),
+        "peakRSSKiB": _peakRSS() - _before,
+    })
+
+
+def _isolated(target, *args) -> dict:
+    """ @abstract Run a benchmark case in a fresh process, returning its
+            measurement dict.
+    """
+    _ctx = multiprocessing.get_context("spawn")
+    _queue = _ctx.Queue()
+    _proc = _ctx.Process(target=target, args=args + (_queue,))
+    _proc.start()
+    _measure = _queue.get()
+    _proc.join()
+    return _measure
+
+
+def benchRecords(count: int=100000, fixtureSize: int=1024) -> list:
+    """ @abstract Compare peak RSS of the tuple layout and `TestRecord`
+            rows for `count` passing tests.
+        @params count [int] Number of tests to run
+        @params fixtureSize [int] Bytes allocated by each test's setUp
+        @returns [list] Measurement dicts, one per layout
+    """
+    return [_isolated(_measureRecords, _layout, count, fixtureSize)
+            for _layout in ("tuple", "record")]
+
+
+class _NullStream(object):
+    """ @abstract Write sink counting the characters written """
+
+    def __init__(self):
+        self.chars = 0
+
+    def write(self, text: str):
+        self.chars += len(text)
+
+    def flush(self):
+        pass
+
+
+def _measureTable(rows: int, queue):
+    _table = TextTable(PrettyTextTestRunner._test_props)
+    _start = time.perf_counter()
+    for _idx in range(rows):
+        _output = "" if _idx % 10 else \
+            "Traceback (most recent call last): AssertionError: {} != 0".format(_idx)
+        _table.appendRow(["test_{}".format(_idx), _output, "(0.001s) PASS"])
+    _appended = time.perf_counter()
+    _sink = _NullStream()
+    _table.write(_sink)
+    _written = time.perf_counter()
+    queue.put({
+        "rows": rows,
+        "appendSeconds": round(_appended - _start, 4),
+        "writeSeconds": round(_written - _appended, 4),
+        "chars": _sink.chars,
+        "rowsPerSecond": round(rows / max(_written - _appended, 1e-9)),
+        "peakRSSKiB": _peakRSS(),
+    })
+
+
+def benchTable(rows: list=(1000, 100000, 1000000)) -> list:
+    """ @abstract Time building and writing test report tables of each
+            size in `rows`.
+        @params rows [list] Table sizes to measure
+        @returns [list] Measurement dicts, one per size
+    """
+    return [_isolated(_measureTable, _rows) for _rows in rows]
+
+
+def _failureInfo() -> tuple:
+    try:
+        raise AssertionError("synthetic failure")
+    except AssertionError:
+        return sys.exc_info()
+
+
+def _measureResultCalls(count: int, outputSize: int, queue):
+    """ @abstract Time the result hooks alone, without running test bodies """
+    result = PrettyTestResult(None, 1, 0)
+    result.timing = True
+    result.buffer = True
+    _test = _MixedTest("test_pass")
+    _err = _failureInfo()
+    _output = "x" * outputSize
+    _hooks = {"startTest": 0, "addSuccess": 0, "addFailure": 0, "stopTest": 0}
+    _clock = time.perf_counter_ns
+    for _idx in range(count):
+        _mark = _clock()
+        result.startTest(_test)
+        _started = _clock()
+        if _output:
+            sys.stdout.write(_output)
+        _added = _clock()
+        if _idx % 2:
+            result.addFailure(_test, _err)
+            _hook = "addFailure"
+        else:
+            result.addSuccess(_test)
+            _hook = "addSuccess"
+        _stopping = _clock()
+        result.stopTest(_test)
+        _done = _clock()
+        _hooks["startTest"] += _started - _mark
+        _hooks[_hook] += _stopping - _added
+        _hooks["stopTest"] += _done - _stopping
+    _calls = {"startTest": count, "addSuccess": (count + 1) // 2,
+              "addFailure": count // 2, "stopTest": count}
+    queue.put({
+        "count": count,
+        "outputSize": outputSize,
+        "nsPerCall": {_hook: round(_hooks[_hook] / max(_calls[_hook], 1))
+                      for _hook in _hooks},
+        "peakRSSKiB": _peakRSS(),
+    })
+
+
+def benchResult(count: int=100000, outputSize: int=0) -> list:
+    """ @abstract Per call cost of startTest, addSuccess, addFailure and
+            stopTest, half the calls failing.
+        @params count [int] Number of simulated tests
+        @params outputSize [int] Characters written while each test is
+            buffered
+        @returns [list] Single measurement dict
+    """
+    return [_isolated(_measureResultCalls, count, outputSize)]
+
+
+def _measureRun(count: int, mix: dict, queue):
+    _MixedTest.outputSize = mix["outputSize"]
+    _mix = (mix["failRate"], mix["skipRate"], mix["outputRate"])
+
+    # Plain unittest on the same suite is the floor the runner adds to
+    _start = time.perf_counter()
+    syntheticSuite(count, *_mix)(TestResult())
+    _plain = time.perf_counter() - _start
+
+    _sink = _NullStream()
+    _stdout, sys.stdout = sys.stdout, _sink
+    try:
+        runner = PrettyTextTestRunner(stream=_sink)
+        _start = time.perf_counter()
+        result = runner.run(syntheticSuite(count, *_mix))
+        _run = time.perf_counter() - _start
+
+        # Report building alone, on the finished result
+        _start = time.perf_counter()
+        runner._summaryReport(result).write(_sink)
+        for _clsName in result.results:
+            runner._classReport(result, _clsName).write(_sink)
+        _report = time.perf_counter() - _start
+    finally:
+        sys.stdout = _stdout
+
+    queue.put({
+        "count": count,
+        "mix": mix,
+        "plainSeconds": round(_plain, 4),
+        "runSeconds": round(_run, 4),
+        "reportSeconds": round(_report, 4),
+        "overheadNsPerTest": round((_run - _plain) * 1e9 / max(count, 1)),
+        "reportChars": _sink.chars,
+        "peakRSSKiB": _peakRSS(),
+    })
+
+
+def benchRun(sizes: list=(1000, 100000, 1000000), failRate: float=0.01,
+             skipRate: float=0.05, outputRate: float=0.0,
+             outputSize: int=0) -> list:
+    """ @abstract Time `PrettyTextTestRunner.run` over synthetic suites
+            against a plain TestResult run of the same suite, and the report
+            building alone.
+        @params sizes [list] Suite sizes to measure
+        @params failRate, skipRate, outputRate [float] Test mix, see
+            `syntheticSuite`
+        @params outputSize [int] Characters written by each output test
+        @returns [list] Measurement dicts, one per size
+    """
+    _mix = {"failRate": failRate, "skipRate": skipRate,
+            "outputRate": outputRate, "outputSize": outputSize}
+    return [_isolated(_measureRun, _count, _mix) for _count in sizes]
+
+
+def main(argv: list=None):
+    _parser = argparse.ArgumentParser(prog="python -m PrettyTextTestRunner.benchmark")
+    _parser.add_argument("case", choices=["records", "table", "result", "run"])
+    _parser.add_argument("--count", type=int, default=100000)
+    _parser.add_argument("--fixture-size", type=int, default=1024)
+    _parser.add_argument("--rows", type=int, nargs="+",
+                         default=[1000, 100000, 1000000])
+    _parser.add_argument("--sizes", type=int, nargs="+",
+                         default=[1000, 100000, 1000000])
+    _parser.add_argument("--fail-rate", type=float, default=0.01)
+    _parser.add_argument("--skip-rate", type=float, default=0.05)
+    _parser.add_argument("--output-rate", type=float, default=0.0)
+    _parser.add_argument("--output-size", type=int, default=0)
+    _parser.add_argument("--json-out", help="Also write the report to this file")
+    _args = _parser.parse_args(argv)
+
+    if _args.case == "records":
+        _results = benchRecords(_args.count, _args.fixture_size)
+    elif _args.case == "table":
+        _results = benchTable(_args.rows)
+    elif _args.case == "result":
+        _results = benchResult(_args.count, _args.output_size)
+    elif _args.case == "run":
+        _results = benchRun(_args.sizes, _args.fail_rate, _args.skip_rate,
+                            _args.output_rate, _args.output_size)
+
+    # Enough context to compare reports across releases and machines
+    _report = {
+        "case": _args.case,
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.time(),
+        "results": _results,
+    }
+    _text = json.dumps(_report, indent=2)
+    if _args.json_out:
+        with open(_args.json_out, "w") as _fh:
+            _fh.write(_text + "\n")
+    print(_text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import io
+import os
+import re
+import tempfile
+
+__name__ = "PrettyTextTestRunner.capture"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+class BoundedCapture(io.TextIOBase):
+    """ @abstract Output buffer for a buffered test holding at most `limit`
+            characters in memory. Past the limit everything written goes to
+            a log file, and `getvalue` gives the head and tail lines with a
+            pointer to the full log. Head and tail are capped in characters
+            too, for output without newlines or written in one large piece.
+            Spilled logs are kept after the run for the report to point at.
+        @params limit [int] Characters kept in memory before spilling
+        @params directory [str] Directory for spilled logs, defaults to the
+            system temp directory
+        @params headLines [int] Lines shown from the start of a spilled log
+        @params tailLines [int] Lines shown from the end of a spilled log
+        @props label [str] Log file name prefix, usually the test id
+    """
+
+    def __init__(self, limit: int=1 << 16, directory: str=None,
+                 headLines: int=20, tailLines: int=20):
+        super(BoundedCapture, self).__init__()
+        self.limit = limit
+        self.directory = directory
+        self.headLines = headLines
+        self.tailLines = tailLines
+        self.label = "output"
+        self._parts = []
+        self._size = 0
+        self._spill = None
+        self.spillPath = None
+        self._head = ""
+        self._tail = ""
+        # Enough characters to hold `headLines`/`tailLines` lines of a
+        # typical log
+        self._headChars = max(headLines * 200, 4096)
+        self._tailChars = max(tailLines * 200, 4096)
+
+    def writable(self):
+        return True
+
+    def write(self, text: str) -> int:
+        if self._spill is not None:
+            self._spill.write(text)
+            self._size += len(text)
+            self._tail = (self._tail + text[-self._tailChars:])[-self._tailChars:]
+            return len(text)
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size > self.limit:
+            self._spillToDisk()
+        return len(text)
+
+    def _spillToDisk(self):
+        _parts, self._parts = self._parts, []
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+        _fd, self.spillPath = tempfile.mkstemp(
+            prefix=_UNSAFE.sub("_", self.label)[:80] + ".", suffix=".log",
+            dir=self.directory)
+        self._spill = io.open(_fd, "w", encoding="utf-8", errors="replace")
+        # Piece by piece, a large write is never copied whole
+        _head = ""
+        for _part in _parts:
+            self._spill.write(_part)
+            if len(_head) < self._headChars:
+                _head += _part[:self._headChars - len(_head)]
+            self._tail = (self._tail + _part[-self._tailChars:])[-self._tailChars:]
+        self._head = "".join(_head.splitlines(True)[:self.headLines])
+
+    @property
+    def spilled(self) -> bool:
+        return self.spillPath is not None
+
+    def getvalue(self) -> str:
+        """ @abstract Everything written, or head and tail lines once spilled """
+        if not self.spilled:
+            return "".join(self._parts)
+        if self._spill is not None:
+            self._spill.flush()
+        _tailLines = self._tail.splitlines(True)
+        # The first line is cut short, unless it is all there is
+        _tailLines = _tailLines[1:][-self.tailLines:] if len(_tailLines) > 1 else _tailLines
+        _head = self._head if self._head.endswith("\n") else self._head + "\n"
+        return "{}... {} characters, full log: {} ...\n{}".format(
+            _head, self._size, self.spillPath, "".join(_tailLines))
+
+    def flush(self):
+        if self._spill is not None:
+            self._spill.flush()
+
+    def seek(self, offset: int, whence: int=0) -> int:
+        """ @abstract Only rewinding is supported, as TestResult does """
+        if offset != 0 or whence != 0:
+            raise io.UnsupportedOperation("BoundedCapture only rewinds")
+        return 0
+
+    def truncate(self, size: int=None) -> int:
+        """ @abstract Start over for the next test. A spilled log is closed
+                and kept on disk for the report to point at.
+        """
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._parts = []
+        self._size = 0
+        self.spillPath = None
+        self._head = self._tail = ""
+        return 0
+
+    def close(self):
+        self.truncate()
+        super(BoundedCapture, self).close()
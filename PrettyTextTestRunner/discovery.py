@@ -0,0 +1,209 @@
+import json
+import os
+import sys
+from fnmatch import fnmatch, fnmatchcase
+from importlib import import_module
+from unittest import TestLoader, TestSuite
+from unittest.loader import _make_failed_import_test
+
+from .parallel import iterTests
+
+__name__ = "PrettyTextTestRunner.discovery"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Bump when the index layout changes, older indexes are rebuilt
+INDEX_VERSION = 1
+
+
+def matchesKeywords(testId: str, keywords: list) -> bool:
+    """ @abstract unittest `-k` matching, substrings or fnmatch patterns """
+    if not keywords:
+        return True
+    return any(fnmatchcase(testId, _kw if "*" in _kw else "*{}*".format(_kw))
+               for _kw in keywords)
+
+
+class LazyModuleSuite(TestSuite):
+    """ @abstract Suite of one test module which is only imported when the
+            suite is first iterated, so the run starts before every module
+            has been loaded.
+        @params moduleName [str] Dotted module name
+        @params loader [TestLoader] Loader building the module's tests
+        @params keywords [list] Optional `-k` patterns to keep
+        @params expectedCount [int] Indexed number of tests, counted without
+            importing the module until it runs
+    """
+
+    def __init__(self, moduleName: str, loader: TestLoader, keywords: list=None,
+                 expectedCount: int=None):
+        super(LazyModuleSuite, self).__init__()
+        self.moduleName = moduleName
+        self.loader = loader
+        self.keywords = keywords
+        self.expectedCount = expectedCount
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            _suite = self.loader.loadTestsFromName(self.moduleName)
+        except Exception:
+            # Reported as a failing test, like TestLoader.discover does
+            _suite = _make_failed_import_test(self.moduleName, self.loader.suiteClass)
+        if self.keywords:
+            _suite = [_test for _test in iterTests(_suite)
+                      if matchesKeywords(_test.id(), self.keywords)]
+        self.addTests(_suite)
+
+    def __iter__(self):
+        self._load()
+        return super(LazyModuleSuite, self).__iter__()
+
+    def countTestCases(self):
+        if not self._loaded and self.expectedCount is not None:
+            return self.expectedCount
+        self._load()
+        return super(LazyModuleSuite, self).countTestCases()
+
+
+class DiscoveryIndex(object):
+    """ @abstract Test discovery backed by a JSON index of test modules, their
+            mtime and size and the test ids they hold. Only new or changed
+            modules are imported to refresh the index, the suite built from
+            it imports each module as it is about to run.
+        @params path [str] JSON index file
+        @params startDir [str] Directory to discover from
+        @params pattern [str] Test file name pattern
+        @params topLevelDir [str] Import root, defaults to `startDir`
+        @params loader [TestLoader] Loader to use, defaults to a new one
+        @example Index Format
+            {
+                "version": 1, "startDir": str, "pattern": str,
+                "modules": {moduleName: {"path": str, "mtime": int,
+                                         "size": int, "tests": [testId, ...]}}
+            }
+    """
+
+    def __init__(self, path: str, startDir: str=".", pattern: str="test*.py",
+                 topLevelDir: str=None, loader: TestLoader=None):
+        self.path = path
+        self.startDir = os.path.abspath(startDir)
+        self.pattern = pattern
+        self.topLevelDir = os.path.abspath(topLevelDir or startDir)
+        self.loader = loader or TestLoader()
+        self.modules = {}
+        self.imported = []  # Modules imported to refresh the index
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path) as _fh:
+                    _index = json.load(_fh)
+            except ValueError:
+                _index = {}
+            if _index.get("version") == INDEX_VERSION \
+                    and _index.get("startDir") == self.startDir \
+                    and _index.get("pattern") == pattern:
+                self.modules = _index.get("modules", {})
+        if self.topLevelDir not in sys.path:
+            sys.path.insert(0, self.topLevelDir)
+
+    def _moduleName(self, path: str) -> str:
+        _rel = os.path.relpath(os.path.splitext(path)[0], self.topLevelDir)
+        return _rel.replace(os.sep, ".")
+
+    def findModules(self) -> list:
+        """ @abstract Walk `startDir` like TestLoader.discover, descending
+                into packages only.
+            @returns [list] of (moduleName, path), sorted by path
+        """
+        _found = []
+        for _dirpath, _dirnames, _filenames in os.walk(self.startDir):
+            _dirnames[:] = sorted(
+                _dir for _dir in _dirnames
+                if _dir.isidentifier()
+                and os.path.isfile(os.path.join(_dirpath, _dir, "__init__.py")))
+            for _filename in sorted(_filenames):
+                _stem, _ext = os.path.splitext(_filename)
+                if _ext == ".py" and _stem.isidentifier() \
+                        and fnmatch(_filename, self.pattern):
+                    _path = os.path.join(_dirpath, _filename)
+                    _found.append((self._moduleName(_path), _path))
+        return _found
+
+    def refresh(self, rebuild: bool=False) -> list:
+        """ @abstract Bring the index up to date with the files on disk
+            @params rebuild [bool] Import every module, ignoring the index
+            @returns [list] Module names in run order
+        """
+        _found = self.findModules()
+        _names = set()
+        for _name, _path in _found:
+            _names.add(_name)
+            _stat = os.stat(_path)
+            _entry = self.modules.get(_name)
+            if not rebuild and _entry is not None and _entry["path"] == _path \
+                    and _entry["mtime"] == _stat.st_mtime_ns \
+                    and _entry["size"] == _stat.st_size:
+                continue
+            _tests = self._testIds(_name)
+            self.modules[_name] = {
+                "path": _path,
+                # A module failing to import is retried on the next run
+                "mtime": _stat.st_mtime_ns if _tests is not None else None,
+                "size": _stat.st_size,
+                "tests": _tests if _tests is not None else [_name],
+            }
+            self.imported.append(_name)
+            self._dirty = True
+        for _name in list(self.modules):
+            if _name not in _names:
+                del self.modules[_name]
+                self._dirty = True
+        return [_name for _name, _ in _found]
+
+    def _testIds(self, moduleName: str) -> list:
+        try:
+            _module = import_module(moduleName)
+        except Exception:
+            # Kept in the run, the import error is reported as a test
+            return None
+        _suite = self.loader.loadTestsFromModule(_module, pattern=self.pattern)
+        return [_test.id() for _test in iterTests(_suite)]
+
+    def suite(self, keywords: list=None, rebuild: bool=False) -> TestSuite:
+        """ @abstract Refresh the index and build a suite of lazily imported
+                modules. With `keywords`, modules without a matching test id
+                are not imported at all.
+            @params keywords [list] Optional `-k` patterns
+            @params rebuild [bool] See `refresh`
+            @returns [TestSuite] Suite of `LazyModuleSuite`
+        """
+        _suites = []
+        for _name in self.refresh(rebuild):
+            _tests = self.modules[_name]["tests"]
+            if keywords:
+                _tests = [_id for _id in _tests if matchesKeywords(_id, keywords)]
+                if not _tests:
+                    continue
+            _suites.append(LazyModuleSuite(_name, self.loader, keywords, len(_tests)))
+        self.save()
+        return self.loader.suiteClass(_suites)
+
+    def testCount(self) -> int:
+        """ @abstract Number of indexed tests """
+        return sum(len(_entry["tests"]) for _entry in self.modules.values())
+
+    def save(self):
+        """ @abstract Write the index file if anything changed """
+        if not self._dirty:
+            return
+        _tmp = self.path + ".tmp"
+        with open(_tmp, "w") as _fh:
+            json.dump({"version": INDEX_VERSION, "startDir": self.startDir,
+                       "pattern": self.pattern, "modules": self.modules}, _fh)
+        os.replace(_tmp, self.path)
+        self._dirty = False
@@ -0,0 +1,339 @@
+import collections
+import os
+import pickle
+import platform
+import queue
+import sys
+import threading
+import time
+import traceback
+from multiprocessing.connection import Client, Listener, wait
+
+from .parallel import (_chunkBudget, _failedState, _killedState, _packTest, _runChunk,
+                       chunkSettings, mergeFinished, splitSuite)
+
+__name__ = "PrettyTextTestRunner.distributed"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Environment variable holding the shared key when none is given
+AUTHKEY_ENV = "PRETTYTEST_AUTHKEY"
+
+# Times a unit is handed out again after its worker disconnected, before
+# its tests are reported as errors
+MAX_ATTEMPTS = 3
+
+# Pending connections the listening socket queues
+BACKLOG = 128
+
+# Seconds between checks for new workers
+POLL = 0.05
+
+
+def parseAddress(address: str):
+    """ @abstract Parse "host:port" into a TCP address, anything else is a
+            Unix socket path.
+        @params address [str] Address as given on the command line
+        @returns [tuple|str] Address for multiprocessing.connection
+    """
+    _host, _, _port = address.rpartition(":")
+    if _host and _port.isdigit():
+        return (_host, int(_port))
+    return address
+
+
+def formatAddress(address) -> str:
+    if isinstance(address, tuple):
+        return "{}:{}".format(*address)
+    return address
+
+
+def resolveAuthkey(authkey=None) -> bytes:
+    """ @abstract Shared key from the argument or `AUTHKEY_ENV` """
+    if authkey is None:
+        authkey = os.environ.get(AUTHKEY_ENV)
+    if isinstance(authkey, str):
+        authkey = authkey.encode("utf-8")
+    return authkey
+
+
+def runWorker(address, authkey: bytes) -> int:
+    """ @abstract Worker entry point. Connects to a coordinator and runs the
+            units it is handed, one at a time, until told it is done.
+        @params address [tuple|str] Coordinator address
+        @params authkey [bytes] Key shared with the coordinator
+        @returns [int] Number of units run
+    """
+    _conn = Client(address, authkey=authkey)
+    _units = 0
+    try:
+        _conn.send(("hello", platform.node(), os.getpid()))
+        _message = _conn.recv()
+        if _message[0] == "done":
+            return _units
+        _, settings, paths = _message
+        # Workers share the checkout, make the coordinator's imports work
+        for _path in paths:
+            if _path not in sys.path and os.path.isdir(_path):
+                sys.path.append(_path)
+        while True:
+            try:
+                _message = _conn.recv()
+            except EOFError:
+                break
+            if _message[0] == "done":
+                break
+            _, _idx, _payload = _message
+            try:
+                _state = _runChunk(pickle.loads(_payload), settings)
+            except Exception:
+                _reply = ("error", _idx, traceback.format_exc())
+            else:
+                _reply = ("result", _idx, _state)
+            try:
+                _conn.send(_reply)
+            except OSError:
+                # The coordinator gave up on this unit and dropped us
+                break
+            _units += 1
+    finally:
+        _conn.close()
+    return _units
+
+
+def _localWorker(address, authkey: bytes):
+    try:
+        runWorker(address, authkey)
+    except (OSError, EOFError):
+        # The run finished before this worker got to connect
+        pass
+
+
+class Coordinator(object):
+    """ @abstract Serve the test class units of a suite to workers over a
+            socket and merge their results, in serial order, into one
+            result. Workers pull a unit whenever they are idle, so faster
+            workers take more of the queue, and the unit of a worker which
+            disconnects is handed to the next idle worker. With timeouts, a
+            worker still holding its unit after the unit's budget plus
+            `KILL_GRACE` is dropped and the unit reported as TIMEOUT, a
+            local worker is killed and replaced.
+        @params runner [PrettyTextTestRunner] Runner holding the settings
+        @params address [tuple|str] Address to listen on, port 0 picks one
+        @params authkey [bytes] Key workers must present
+        @params localWorkers [int] Worker processes to start on this host
+        @methods run
+    """
+
+    def __init__(self, runner, address, authkey: bytes, localWorkers: int=0):
+        self.runner = runner
+        self.authkey = authkey
+        self.localWorkers = localWorkers
+        # The default backlog of 1 drops workers connecting together, which
+        # then wait a second for the SYN to be retried
+        self.listener = Listener(address, backlog=BACKLOG, authkey=authkey)
+        self.address = self.listener.address
+        self._accepted = queue.Queue()
+        self._closed = False
+        self._processes = []
+
+    def _accept(self):
+        while not self._closed:
+            try:
+                self._accepted.put(self.listener.accept())
+            except Exception:
+                # Failed handshakes, or the listener closing at the end
+                continue
+
+    def _startLocal(self, count: int):
+        import multiprocessing
+        for _ in range(count):
+            _process = multiprocessing.Process(target=_localWorker,
+                                               args=(self.address, self.authkey),
+                                               daemon=True)
+            _process.start()
+            self._processes.append(_process)
+
+    def run(self, suite, result):
+        """ @abstract Run `suite` on the workers, merging into `result` """
+        _settings = chunkSettings(self.runner, result)
+        _chunks = splitSuite(suite)
+        _payloads = [pickle.dumps([_packTest(_test) for _test in _chunk])
+                     for _chunk in _chunks]
+        _states = [None] * len(_chunks)
+        _merged = 0
+        _queue = collections.deque(range(len(_chunks)))
+        _attempts = [0] * len(_chunks)
+        _budgets = [_chunkBudget(_settings, _chunk) for _chunk in _chunks]
+        _assigned = {}  # {connection: unit index}
+        _deadlines = {}  # {connection: monotonic time its unit overruns}
+        _workers = {}  # {connection: (host, pid)}
+        _idle = []
+        _stopping = False
+
+        def _dispatch(conn):
+            if _queue and not _stopping:
+                _idx = _queue.popleft()
+                _attempts[_idx] += 1
+                _assigned[conn] = _idx
+                if _budgets[_idx] is not None:
+                    _deadlines[conn] = time.monotonic() + _budgets[_idx]
+                try:
+                    conn.send(("unit", _idx, _payloads[_idx]))
+                except OSError:
+                    # Gone, `wait` reports it and the unit is requeued
+                    pass
+            else:
+                _idle.append(conn)
+
+        if not self.localWorkers:
+            sys.stderr.write("Serving {} test classes on {}\n".format(
+                len(_chunks), formatAddress(self.address)))
+            sys.stderr.flush()
+        self._startLocal(self.localWorkers)
+        _thread = threading.Thread(target=self._accept, name="PrettyTestCoordinator",
+                                   daemon=True)
+        _thread.start()
+        _conns = []
+        try:
+            while _merged < len(_chunks):
+                _new = []
+                if not _conns:
+                    # Nothing to wait on but the next worker
+                    try:
+                        _new.append(self._accepted.get(timeout=POLL))
+                    except queue.Empty:
+                        pass
+                while not self._accepted.empty():
+                    _new.append(self._accepted.get())
+                for _conn in _new:
+                    try:
+                        _, _host, _pid = _conn.recv()
+                        _conn.send(("settings", _settings, sys.path))
+                    except (EOFError, OSError):
+                        continue
+                    _workers[_conn] = (_host, _pid)
+                    _conns.append(_conn)
+                    _dispatch(_conn)
+                if self._processes and not _conns and self._accepted.empty() \
+                        and not any(_process.is_alive() for _process in self._processes):
+                    # Every local worker is gone and nobody else connected
+                    for _idx in _queue:
+                        _states[_idx] = _failedState(
+                            _settings, _chunks[_idx], "No worker left to run this class")
+                    _queue.clear()
+                _now = time.monotonic()
+                for _conn, _deadline in list(_deadlines.items()):
+                    if _now < _deadline:
+                        continue
+                    # Hung while still connected, its result is not waited for
+                    _idx = _assigned.pop(_conn)
+                    del _deadlines[_conn]
+                    _conns.remove(_conn)
+                    _conn.close()
+                    _states[_idx] = _killedState(_settings, _chunks[_idx], _budgets[_idx])
+                    self._killLocal(_workers.pop(_conn))
+                for _conn in wait(_conns, timeout=POLL):
+                    try:
+                        _kind, _idx, _value = _conn.recv()
+                    except (EOFError, OSError):
+                        _conns.remove(_conn)
+                        _workers.pop(_conn, None)
+                        _deadlines.pop(_conn, None)
+                        if _conn in _idle:
+                            _idle.remove(_conn)
+                        _idx = _assigned.pop(_conn, None)
+                        if _idx is None:
+                            continue
+                        if _stopping:
+                            # Failing fast, the unit counts as not run
+                            _states[_idx] = {}
+                        elif _attempts[_idx] < MAX_ATTEMPTS:
+                            _queue.appendleft(_idx)
+                            if _idle:
+                                _dispatch(_idle.pop())
+                        else:
+                            _states[_idx] = _failedState(
+                                _settings, _chunks[_idx],
+                                "Worker disconnected while running this class")
+                        continue
+                    del _assigned[_conn]
+                    _deadlines.pop(_conn, None)
+                    if _kind == "error":
+                        _value = _failedState(_settings, _chunks[_idx],
+                                              "Worker failed to run this class:\n" + _value)
+                    _states[_idx] = _value
+                    if _value["shouldStop"] and result.failfast:
+                        _stopping = True
+                        for _left in _queue:
+                            _states[_left] = {}
+                        _queue.clear()
+                    _dispatch(_conn)
+                _merged = mergeFinished(result, _states, _merged)
+        finally:
+            self._close(_thread, _conns)
+
+    def _killLocal(self, worker: tuple):
+        """ @abstract Kill the local worker process `worker` identified as in
+                its hello and start another in its place. Remote workers
+                are only disconnected.
+            @params worker [tuple] (host, pid)
+        """
+        _host, _pid = worker
+        if _host != platform.node():
+            return
+        for _process in self._processes:
+            if _process.pid == _pid and _process.is_alive():
+                _process.kill()
+                _process.join()
+                self._startLocal(1)
+                return
+
+    def _sendHome(self, conn):
+        try:
+            conn.send(("done",))
+            conn.close()
+        except OSError:
+            pass
+
+    def _close(self, thread, conns: list):
+        """ @abstract Send every worker home and stop accepting """
+        for _conn in conns:
+            self._sendHome(_conn)
+        # Forked local workers hold the listening socket too, keep accepting
+        # until the ones still connecting have been sent home
+        for _process in self._processes:
+            while _process.is_alive():
+                try:
+                    self._sendHome(self._accepted.get(timeout=0.05))
+                except queue.Empty:
+                    pass
+            _process.join()
+        self._closed = True
+        # Wake the accepting thread with a connection of our own
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except Exception:
+            pass
+        thread.join(timeout=5)
+        self.listener.close()
+        while not self._accepted.empty():
+            self._sendHome(self._accepted.get())
+
+
+def runDistributed(runner, suite, result):
+    """ @abstract Run `suite` as a coordinator on `runner.coordinator`, see
+            `Coordinator`
+        @params runner [PrettyTextTestRunner] Runner holding the settings
+        @params suite [TestSuite|TestCase] Suite to run
+        @params result [PrettyTestResult] Result to merge into
+    """
+    _authkey = resolveAuthkey(runner.authkey)
+    if _authkey is None:
+        if not runner.localWorkers:
+            raise ValueError("remote workers need a shared key, set `authkey` "
+                             "or {}".format(AUTHKEY_ENV))
+        _authkey = os.urandom(32)
+    Coordinator(runner, parseAddress(runner.coordinator), _authkey,
+                runner.localWorkers).run(suite, result)
@@ -0,0 +1,110 @@
+import hashlib
+import re
+
+__name__ = "PrettyTextTestRunner.grouping"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Object addresses differ between otherwise identical messages
+_ADDRESS = re.compile(r"0x[0-9a-fA-F]+")
+
+
+def failureFingerprint(exctype: type, value: BaseException, tbException,
+                       testFile: str=None) -> str:
+    """ @abstract Fingerprint a failure by its exception type and the frames
+            it went through outside the test module, the code under test.
+            Failures raised in the test module itself are keyed by their test
+            module frames, function and line, and the exception message with
+            object addresses blanked out, so only the same failing line of
+            the same test groups.
+        @params exctype [type] Exception type
+        @params value [BaseException] Exception
+        @params tbException [TracebackException] Trimmed traceback, or None
+        @params testFile [str] Source file of the test module
+        @returns [str] Short hex fingerprint, stable between runs and processes
+    """
+    _parts = ["{}.{}".format(exctype.__module__, exctype.__qualname__)]
+    _stack = tbException.stack if tbException is not None else []
+    _frames = [_frame for _frame in _stack if _frame.filename != testFile]
+    if _frames:
+        _parts.extend("{}:{}:{}".format(_frame.filename, _frame.name, _frame.lineno)
+                      for _frame in _frames)
+    else:
+        _parts.extend("{}:{}".format(_frame.name, _frame.lineno) for _frame in _stack)
+        try:
+            _message = str(value)
+        except Exception:
+            _message = ""
+        _parts.append(_ADDRESS.sub("0x?", _message))
+    return hashlib.sha1("\n".join(_parts).encode("utf-8", "replace")).hexdigest()[:8]
+
+
+class FailureGroup(object):
+    """ @abstract Failures sharing a fingerprint
+        @props fingerprint [str] See `failureFingerprint`
+        @props count [int] Failures in the group
+        @props firstTest [str] Id of the first failing test
+        @props failure [FailureText] Representative failure, the first one
+    """
+    __slots__ = ("fingerprint", "count", "firstTest", "failure")
+
+    def __init__(self, fingerprint: str, firstTest: str, failure, count: int=0):
+        self.fingerprint = fingerprint
+        self.firstTest = firstTest
+        self.failure = failure
+        self.count = count
+
+    @property
+    def summary(self) -> str:
+        """ @abstract Last line of the representative traceback """
+        _lines = self.failure.tracebackText.strip().splitlines()
+        return _lines[-1] if _lines else ""
+
+
+class FailureGroups(object):
+    """ @abstract Failures of a run grouped by fingerprint, keeping one
+            representative traceback per group.
+        @methods add, get, repeated, export, merge
+    """
+
+    def __init__(self):
+        self.groups = {}  # {fingerprint: FailureGroup}
+
+    def add(self, failure, testId: str) -> str:
+        """ @abstract Count a failure in its group
+            @params failure [FailureText] Failure with a fingerprint
+            @params testId [str] Id of the failing test
+            @returns [str] Fingerprint, None when the failure has none
+        """
+        _fingerprint = failure.fingerprint
+        if _fingerprint is None:
+            return None
+        _group = self.groups.get(_fingerprint)
+        if _group is None:
+            _group = self.groups[_fingerprint] = FailureGroup(_fingerprint, testId, failure)
+        _group.count += 1
+        return _fingerprint
+
+    def get(self, fingerprint: str) -> FailureGroup:
+        return self.groups.get(fingerprint)
+
+    def repeated(self) -> list:
+        """ @abstract Groups of more than one failure, largest first """
+        return sorted((_group for _group in self.groups.values() if _group.count > 1),
+                      key=lambda _group: -_group.count)
+
+    def export(self) -> list:
+        """ @abstract Picklable state, see `merge` """
+        return [(_group.fingerprint, _group.firstTest, _group.failure, _group.count)
+                for _group in self.groups.values()]
+
+    def merge(self, state: list):
+        """ @abstract Fold the exported groups of another result in """
+        for _fingerprint, _firstTest, _failure, _count in state:
+            _group = self.groups.get(_fingerprint)
+            if _group is None:
+                self.groups[_fingerprint] = FailureGroup(_fingerprint, _firstTest,
+                                                         _failure, _count)
+            else:
+                _group.count += _count
@@ -0,0 +1,222 @@
+import math
+import sqlite3
+import time
+
+__name__ = "PrettyTextTestRunner.history"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS durations (
+    test_id TEXT NOT NULL,
+    run_id INTEGER NOT NULL,
+    duration_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS durations_test_run ON durations (test_id, run_id);
+CREATE INDEX IF NOT EXISTS durations_run ON durations (run_id);
+CREATE TABLE IF NOT EXISTS outcomes (
+    test_id TEXT PRIMARY KEY,
+    run_id INTEGER NOT NULL,
+    failed INTEGER NOT NULL
+);
+"""
+
+# Window functions need SQLite 3.25, older builds, as shipped with some
+# Python 3.7 installs, rank samples with correlated subqueries instead
+_WINDOW_FUNCTIONS = sqlite3.sqlite_version_info >= (3, 25, 0)
+
+# Rolling statistics of each test of the current run over its previous
+# `window` samples
+_STATS_QUERY = """
+WITH hist AS (
+    SELECT test_id, duration_ns,
+           ROW_NUMBER() OVER (PARTITION BY test_id ORDER BY run_id DESC) AS rn
+    FROM durations
+    WHERE run_id < :run AND test_id IN (SELECT test_id FROM durations WHERE run_id = :run)
+), agg AS (
+    SELECT test_id, COUNT(*) AS n, AVG(duration_ns) AS mean,
+           AVG(duration_ns * duration_ns) AS meansq
+    FROM hist WHERE rn <= :window GROUP BY test_id
+)
+SELECT cur.test_id, cur.duration_ns, agg.n, agg.mean, agg.meansq
+FROM durations AS cur JOIN agg ON agg.test_id = cur.test_id
+WHERE cur.run_id = :run
+"""
+
+_STATS_QUERY_COMPAT = """
+WITH hist AS (
+    SELECT test_id, duration_ns FROM durations AS h
+    WHERE run_id < :run AND test_id IN (SELECT test_id FROM durations WHERE run_id = :run)
+      AND (SELECT COUNT(*) FROM durations AS newer
+           WHERE newer.test_id = h.test_id AND newer.run_id > h.run_id
+             AND newer.run_id < :run) < :window
+), agg AS (
+    SELECT test_id, COUNT(*) AS n, AVG(duration_ns) AS mean,
+           AVG(duration_ns * duration_ns) AS meansq
+    FROM hist GROUP BY test_id
+)
+SELECT cur.test_id, cur.duration_ns, agg.n, agg.mean, agg.meansq
+FROM durations AS cur JOIN agg ON agg.test_id = cur.test_id
+WHERE cur.run_id = :run
+"""
+
+# UPSERT needs SQLite 3.24, older builds update then insert the missing rows
+_UPSERT = sqlite3.sqlite_version_info >= (3, 24, 0)
+
+# Latest outcome per test, a test failing in any record of a run stays failed
+_OUTCOME_UPSERT = """
+INSERT INTO outcomes (test_id, run_id, failed) VALUES (:test, :run, :failed)
+ON CONFLICT (test_id) DO UPDATE SET
+    failed = CASE WHEN outcomes.run_id = excluded.run_id
+                  THEN MAX(outcomes.failed, excluded.failed) ELSE excluded.failed END,
+    run_id = excluded.run_id
+"""
+
+_OUTCOME_UPDATE = """
+UPDATE outcomes SET
+    failed = CASE WHEN run_id = :run THEN MAX(failed, :failed) ELSE :failed END,
+    run_id = :run
+WHERE test_id = :test
+"""
+
+_OUTCOME_INSERT = """
+INSERT OR IGNORE INTO outcomes (test_id, run_id, failed) VALUES (:test, :run, :failed)
+"""
+
+# Rolling mean of every known test, used to balance shards
+_MEANS_QUERY = """
+SELECT test_id, AVG(duration_ns) FROM (
+    SELECT test_id, duration_ns,
+           ROW_NUMBER() OVER (PARTITION BY test_id ORDER BY run_id DESC) AS rn
+    FROM durations
+) WHERE rn <= :window GROUP BY test_id
+"""
+
+_MEANS_QUERY_COMPAT = """
+SELECT test_id, AVG(duration_ns) FROM durations AS d
+WHERE (SELECT COUNT(*) FROM durations AS newer
+       WHERE newer.test_id = d.test_id AND newer.run_id > d.run_id) < :window
+GROUP BY test_id
+"""
+
+
+class DurationHistory(object):
+    """ @abstract Append-only per-test duration store in a SQLite file, with
+            rolling regression checks against previous runs. The latest
+            outcome of each test is kept too, see `failedTests`.
+        @params path [str] SQLite database file
+        @params window [int] Number of previous samples per test to compare to
+        @params keepRuns [int] Runs kept in the store, older ones are pruned
+        @params batchSize [int] Durations buffered before each write
+    """
+
+    def __init__(self, path: str, window: int=20, keepRuns: int=100,
+                 batchSize: int=5000):
+        self.path = path
+        self.window = window
+        self.keepRuns = keepRuns
+        self.batchSize = batchSize
+        self._pending = []
+        self._outcomes = {}  # {testId: failed} of the current run
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        self.runId = None
+
+    def startRun(self):
+        """ @abstract Open a new run, durations added after this belong to it """
+        with self._db:
+            self.runId = self._db.execute(
+                "INSERT INTO runs (started) VALUES (?)", (time.time(),)).lastrowid
+
+    def meanDurations(self) -> dict:
+        """ @abstract Rolling mean duration of every known test over its last
+                `window` samples.
+            @returns [dict] {testId: meanNs}
+        """
+        self.flush()
+        return dict(self._db.execute(_MEANS_QUERY if _WINDOW_FUNCTIONS else _MEANS_QUERY_COMPAT,
+                                     {"window": self.window}))
+
+    def failedTests(self) -> set:
+        """ @abstract Tests whose latest recorded outcome was a failure, in
+                whichever run they last ran.
+            @returns [set] of testId
+        """
+        self.flush()
+        return {_row[0] for _row in
+                self._db.execute("SELECT test_id FROM outcomes WHERE failed = 1")}
+
+    def add(self, testId: str, durationNs: int, failed: bool=False):
+        """ @abstract Buffer one duration and outcome of the current run, see
+                `startRun`. A test failing in any of its records stays failed.
+        """
+        self._pending.append((testId, self.runId, durationNs))
+        self._outcomes[testId] = self._outcomes.get(testId, False) or failed
+        if len(self._pending) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        """ @abstract Write buffered durations and outcomes in a single
+                transaction
+        """
+        if not self._pending and not self._outcomes:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO durations (test_id, run_id, duration_ns) VALUES (?, ?, ?)",
+                self._pending)
+            _outcomes = [{"test": _testId, "run": self.runId, "failed": int(_failed)}
+                         for _testId, _failed in self._outcomes.items()]
+            if _UPSERT:
+                self._db.executemany(_OUTCOME_UPSERT, _outcomes)
+            else:
+                self._db.executemany(_OUTCOME_UPDATE, _outcomes)
+                self._db.executemany(_OUTCOME_INSERT, _outcomes)
+        self._pending = []
+        self._outcomes = {}
+
+    def regressions(self, ratio: float=1.5, sigmas: float=3.0,
+                    minSamples: int=5, minNs: int=1000000) -> list:
+        """ @abstract Tests of the current run slower than their history.
+                A test is flagged when it exceeds `ratio` times its rolling
+                mean and, if `sigmas` is set, the mean plus `sigmas` standard
+                deviations.
+            @params ratio [float] Slow down ratio against the mean
+            @params sigmas [float] Standard deviations above the mean, or None
+            @params minSamples [int] Samples required before judging a test
+            @params minNs [int] Ignore tests faster than this, in nanoseconds
+            @returns [list] of (testId, durationNs, meanNs, stdDevNs), slowest
+                ratio first
+        """
+        self.flush()
+        _flagged = []
+        _rows = self._db.execute(_STATS_QUERY if _WINDOW_FUNCTIONS else _STATS_QUERY_COMPAT,
+                                 {"run": self.runId, "window": self.window})
+        for _testId, _duration, _count, _mean, _meanSq in _rows:
+            if _count < minSamples or _duration < minNs or _mean <= 0:
+                continue
+            _stdDev = math.sqrt(max(_meanSq - _mean * _mean, 0))
+            if _duration <= _mean * ratio:
+                continue
+            if sigmas is not None and _duration <= _mean + sigmas * _stdDev:
+                continue
+            _flagged.append((_testId, _duration, _mean, _stdDev))
+        _flagged.sort(key=lambda _row: _row[1] / _row[2], reverse=True)
+        return _flagged
+
+    def close(self):
+        """ @abstract Flush, prune runs beyond `keepRuns` and close the file """
+        self.flush()
+        if self.runId is None:
+            self._db.close()
+            return
+        with self._db:
+            _oldest = self.runId - self.keepRuns
+            self._db.execute("DELETE FROM durations WHERE run_id <= ?", (_oldest,))
+            self._db.execute("DELETE FROM runs WHERE run_id <= ?", (_oldest,))
+        self._db.close()
@@ -0,0 +1,143 @@
+import os
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+__name__ = "PrettyTextTestRunner.memory"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def formatBytes(size: int, signed: bool=False) -> str:
+    """ @abstract Short human readable size
+        @params signed [bool] Prefix positive sizes with "+"
+    """
+    if size is None:
+        return ""
+    _sign = "-" if size < 0 else ("+" if signed and size > 0 else "")
+    _size = float(abs(size))
+    for _unit in ("B", "KB", "MB"):
+        if _size < 1024:
+            return "{}{}{}".format(_sign, round(_size, 1) if _unit != "B" else int(_size), _unit)
+        _size /= 1024
+    return "{}{}GB".format(_sign, round(_size, 1))
+
+
+def _currentRSS() -> int:
+    """ @abstract Resident set size of this process in bytes, None if unknown """
+    try:
+        with open("/proc/self/statm") as _fh:
+            return int(_fh.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _maxRSS() -> int:
+    """ @abstract Peak resident set size of this process in bytes """
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MemoryTracker(object):
+    """ @abstract Measure each test's peak allocation and the memory it
+            leaves behind between startTest and stopTest.
+        @params mode [str] "tracemalloc" for Python allocations, or "rss" for
+            the process resident set size. RSS peaks are only known when the
+            test raised the process high-water mark.
+        @params leakThreshold [int] Retained bytes above which a test is
+            flagged, None to not flag. With tracemalloc, flagging takes a
+            snapshot before every test to find the allocation sites.
+        @params sites [int] Allocation sites kept per flagged test
+        @params frames [int] Traceback depth recorded by tracemalloc
+        @methods start, stop, close
+    """
+
+    def __init__(self, mode: str="tracemalloc", leakThreshold: int=None,
+                 sites: int=5, frames: int=1):
+        if mode not in ("tracemalloc", "rss"):
+            raise ValueError("Unknown memory mode: {}".format(mode))
+        self.mode = mode
+        self.leakThreshold = leakThreshold
+        self.sites = sites
+        self.frames = frames
+        self._started = False
+        self._before = None
+        self._maxBefore = None
+        self._snapshot = None
+
+    def start(self):
+        """ @abstract Mark the start of a test """
+        if self.mode == "rss":
+            self._before = _currentRSS()
+            self._maxBefore = _maxRSS()
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started = True
+        if self.leakThreshold is not None:
+            self._snapshot = tracemalloc.take_snapshot()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self._before = tracemalloc.get_traced_memory()[0]
+
+    def stop(self) -> tuple:
+        """ @abstract Measure the test started by `start`
+            @returns [tuple] (peakBytes, retainedBytes, sites), sites is a
+                list of "file:line size" strings for flagged tests, else None
+        """
+        if self._before is None:
+            return None, None, None
+        if self.mode == "rss":
+            _after = _currentRSS()
+            _maxAfter = _maxRSS()
+            _retained = _after - self._before if _after is not None else None
+            _peak = None
+            if _maxAfter is not None and _maxAfter > self._maxBefore:
+                _peak = _maxAfter - self._before
+                if _retained is not None:
+                    _peak = max(_peak, _retained)
+            self._before = None
+            return _peak, _retained, None
+
+        _current, _peak = tracemalloc.get_traced_memory()
+        _retained = _current - self._before
+        _peak = _peak - self._before
+        self._before = None
+        _sites = None
+        if self._snapshot is not None:
+            if _retained > self.leakThreshold:
+                _sites = self._allocationSites(self._snapshot)
+            self._snapshot = None
+        return _peak, _retained, _sites
+
+    def _allocationSites(self, before) -> list:
+        _after = tracemalloc.take_snapshot()
+        # Leave out tracemalloc itself and this runner's own bookkeeping
+        _filters = [tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, os.path.join(
+                        os.path.dirname(os.path.abspath(__file__)), "*"))]
+        _diff = _after.filter_traces(_filters).compare_to(
+            before.filter_traces(_filters), "lineno")
+        _sites = []
+        for _stat in _diff[:self.sites]:
+            if _stat.size_diff <= 0:
+                break
+            _frame = _stat.traceback[0]
+            _sites.append("{}:{} {}".format(os.path.basename(_frame.filename),
+                                            _frame.lineno,
+                                            formatBytes(_stat.size_diff)))
+        return _sites
+
+    def close(self):
+        """ @abstract Stop tracemalloc if this tracker started it """
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
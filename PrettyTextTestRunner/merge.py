@@ -0,0 +1,151 @@
+import gzip
+import json
+
+from .parallel import TestRef
+from .records import TestRecord, _formattedFailure
+from .subtests import SubTestSummary
+from .writers import ResultFileWriter
+
+__name__ = "PrettyTextTestRunner.merge"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+def readResultFile(path: str):
+    """ @abstract Read a file written by ResultFileWriter, one line at a time
+        @params path [str] Result file, gzip compressed when ending in ".gz"
+        @returns [generator] of (clsName, TestRecord), the generator's return
+            value is the footer, {"runtime", "started", "finished"} in
+            seconds. Files without a wall clock span end `runtime` after
+            their header's start.
+    """
+    _open = gzip.open if path.endswith(".gz") else open
+    _footer = {"runtime": 0.0}
+    with _open(path, "rt", encoding="utf-8") as _fh:
+        _header = json.loads(_fh.readline() or "{}")
+        if _header.get("format") != ResultFileWriter.FORMAT:
+            raise ValueError("{} is not a result file".format(path))
+        if _header.get("version") != ResultFileWriter.VERSION:
+            raise ValueError("{} has unsupported version {}".format(
+                path, _header.get("version")))
+        _fields = _header["fields"]
+        for _line in _fh:
+            _value = json.loads(_line)
+            if isinstance(_value, dict):
+                _footer.update(_value)
+                continue
+            _row = dict(zip(_fields, _value))
+            _output = _row["output"] or ""
+            if _row["traceback"] is not None:
+                _output = _formattedFailure(_row["traceback"], _output, _row["group"])
+            _rec = TestRecord(_row["testId"], _row["name"], _row["status"], _output)
+            if _row["durationNs"] is not None:
+                _rec.start, _rec.stop = 0, _row["durationNs"]
+            for _field in ("setUpNs", "bodyNs", "tearDownNs", "peakBytes",
+                           "retainedBytes", "group"):
+                setattr(_rec, _field, _row[_field])
+            if _row.get("subTests") is not None:
+                _rec.subTests = SubTestSummary.restore(_row["subTests"])
+            yield _row["clsName"], _rec
+    _footer.setdefault("started", _header.get("started"))
+    if _footer["started"] is not None:
+        _footer.setdefault("finished", _footer["started"] + _footer["runtime"])
+    return _footer
+
+
+def _addOutcome(result, record):
+    """ @abstract Add a placeholder entry for `record` to the outcome list
+            of `result` its status belongs to, as a run would have
+    """
+    _text = str(record.output or "")
+    if record.status == 'F':
+        result.failures.append((TestRef.fromRecord(record), _text))
+    elif record.status in ('E', 'T'):
+        result.errors.append((TestRef.fromRecord(record), _text))
+    elif record.status == '?':
+        result.unexpectedSuccesses.append(TestRef.fromRecord(record))
+    elif record.status == 'S':
+        result.skipped.append((TestRef.fromRecord(record), _text))
+    elif record.status == 'X':
+        result.expectedFailures.append((TestRef.fromRecord(record), _text))
+
+
+def mergeResultFiles(paths: list, runner):
+    """ @abstract Report result files as one run in a single pass. Each class
+            report is written as soon as the class ends and its rows are
+            freed, so memory is bounded by the largest class. A class split
+            across files is reported once per part, its tally is combined.
+            The runtime is the wall clock span from the first file's start
+            to the last file's end, so files of parallel runs are not
+            summed. Failing records get placeholder entries in the result's
+            failure lists, `wasSuccessful` agrees with the report.
+        @params paths [list] Files written by ResultFileWriter
+        @params runner [PrettyTextTestRunner] Runner formatting the reports,
+            its writers receive every record
+        @returns [PrettyTestResult] Result holding the combined tally
+    """
+    result = runner._makeResult()
+    result.timing = runner.timing
+    result.phaseTiming = runner.phaseTiming
+    result.slowestCount = runner.slowest
+    result.writers = runner.writers
+    # Class reports are written as they end, like a streaming run
+    runner.streaming = True
+    runner._streamed = False
+    runner._progress = None
+    result.startTestRun()
+    _runtime = 0.0
+    _spans = []
+    _current = None
+    for _path in paths:
+        _records = readResultFile(_path)
+        while True:
+            try:
+                _clsName, _rec = next(_records)
+            except StopIteration as _stop:
+                _runtime += _stop.value["runtime"]
+                if _stop.value["started"] is not None:
+                    _spans.append((_stop.value["started"], _stop.value["finished"]))
+                break
+            if _clsName != _current:
+                if _current is not None:
+                    runner._streamClass(result, _current)
+                _current = _clsName
+            result._addClass(_clsName)
+            result.tally[_clsName][result.TALLY[_rec.status]] += 1
+            result.results[_clsName].append(_rec)
+            result.testsRun += 1
+            _addOutcome(result, _rec)
+            if _rec.subTests is not None:
+                _tally = result.subTestTally.setdefault(_clsName, {"run": 0, "failed": 0})
+                _tally["run"] += _rec.subTests.total
+                _tally["failed"] += _rec.subTests.failed
+            if result.phaseTiming and _rec.setUpNs is not None:
+                result.classPhaseTotals[_clsName] = result.classPhaseTotals.get(
+                    _clsName, 0) + _rec.setUpNs + _rec.tearDownNs
+                result.noteSlow((_rec.setUpNs + _rec.bodyNs + _rec.tearDownNs,
+                                 _rec.testId, _rec.setUpNs, _rec.bodyNs, _rec.tearDownNs))
+            if _rec.group is not None:
+                result.failureGroups.add(_rec.output, _rec.testId)
+            result.emitRecord(_clsName, _rec)
+    if _current is not None:
+        runner._streamClass(result, _current)
+    # Files predating the wall clock span have their runtimes summed
+    _span = None
+    if _spans and len(_spans) == len(paths):
+        _span = (min(_start for _start, _ in _spans), max(_end for _, _end in _spans))
+        _runtime = _span[1] - _span[0]
+    # A combined result file keeps the runtime of the runs it holds
+    for _writer in result.writers:
+        if isinstance(_writer, ResultFileWriter):
+            _writer.runtime = _runtime
+            _writer.span = _span
+    result.stopTestRun()
+
+    _reports = []
+    _groupReport = runner._groupReport(result) if runner.groupFailures else None
+    if _groupReport is not None:
+        _reports.append(("Failure groups", _groupReport))
+    runner._streamSummary(result, _runtime, [], _reports)
+    return result
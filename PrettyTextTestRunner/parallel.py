@@ -0,0 +1,509 @@
+import os
+import signal
+import sys
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, wait
+from unittest import TestCase, TestSuite
+
+from .timing import FixtureTimer
+
+__name__ = "PrettyTextTestRunner.parallel"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Shared failfast flag, installed into each worker process by `_initWorker`
+_STOP_EVENT = None
+
+# Queue of (chunk index, worker pid, wall clock start) for the pool, see `runParallel`
+_STARTED = None
+
+# Seconds a worker gets past its chunk's timeouts before it is killed, for
+# its own watchdog to interrupt the test first
+KILL_GRACE = 10.0
+
+# Times a chunk is run again after its worker died along with others', before
+# its tests are reported as errors
+MAX_ATTEMPTS = 3
+
+
+class TestRef(object):
+    """ @abstract Lightweight, picklable stand-in for a TestCase that has
+            already been run in another process.
+        @params test [TestCase] Test to describe
+    """
+
+    def __init__(self, test):
+        self._id = test.id()
+        self._str = str(test)
+        self._description = test.shortDescription() \
+            if hasattr(test, "shortDescription") else None
+
+    def id(self):
+        return self._id
+
+    def shortDescription(self):
+        return self._description
+
+    def __str__(self):
+        return self._str
+
+    def __repr__(self):
+        return "<TestRef {}>".format(self._id)
+
+    @classmethod
+    def fromRecord(cls, record):
+        """ @abstract Stand-in for the test of a record read back from a
+                result file
+            @params record [TestRecord] Record to describe
+            @returns [TestRef]
+        """
+        _ref = cls.__new__(cls)
+        _ref._id = record.testId
+        _ref._str = "{} ({})".format(record.name, record.testId.rpartition(".")[0])
+        _ref._description = None
+        return _ref
+
+
+class _ChunkSuite(TestSuite):
+    """ @abstract TestSuite which stops iterating once another worker has
+            tripped failfast.
+    """
+    # Event to watch instead of the process wide `_STOP_EVENT`
+    stopEvent = None
+
+    def run(self, result, debug=False):
+        self._result = result
+        return super(_ChunkSuite, self).run(result, debug)
+
+    def __iter__(self):
+        _event = self.stopEvent if self.stopEvent is not None else _STOP_EVENT
+        for _test in super(_ChunkSuite, self).__iter__():
+            if _event is not None and _event.is_set():
+                self._result.stop()
+            yield _test
+
+
+def iterTests(suite):
+    """ @abstract Flatten a suite into its TestCase instances, in run order.
+        @params suite [TestSuite|TestCase] Suite to flatten
+        @returns [generator] of TestCase
+    """
+    if isinstance(suite, TestCase):
+        yield suite
+        return
+    for _test in suite:
+        if isinstance(_test, TestCase):
+            yield _test
+        else:
+            yield from iterTests(_test)
+
+
+def splitSuite(suite) -> list:
+    """ @abstract Split a suite into class-level chunks, preserving the order
+            classes are first seen in.
+        @params suite [TestSuite|TestCase] Suite to split
+        @returns [list] of lists of TestCase, one list per test class
+    """
+    _chunks = {}
+    for _test in iterTests(suite):
+        _chunks.setdefault(_test.__class__, []).append(_test)
+    return list(_chunks.values())
+
+
+def _packTest(test):
+    """ @abstract IsolatedAsyncioTestCase instances hold a contextvars.Context
+            which cannot be pickled, send them as (class, method name) and
+            rebuild them in the worker with `_unpackTest`.
+    """
+    # Only look for the class once something imported it, it pulls in asyncio
+    _asyncCase = sys.modules.get("unittest.async_case")
+    if _asyncCase is not None \
+            and isinstance(test, _asyncCase.IsolatedAsyncioTestCase):
+        return (test.__class__, test._testMethodName)
+    return test
+
+
+def _unpackTest(packed):
+    if isinstance(packed, tuple):
+        _cls, _methodName = packed
+        return _cls(_methodName)
+    return packed
+
+
+def exportResult(result) -> dict:
+    """ @abstract Snapshot the picklable state of a finished PrettyTestResult,
+            replacing TestCase objects with `TestRef`. Result rows are
+            `TestRecord` and pickle as they are.
+        @params result [PrettyTestResult] Result to export
+        @returns [dict] Result state
+    """
+    _refs = {}
+
+    def _ref(test):
+        if id(test) not in _refs:
+            _refs[id(test)] = TestRef(test)
+        return _refs[id(test)]
+
+    return {
+        "tally": result.tally,
+        "results": result.results,
+        "errors": [(_ref(_t), _s) for _t, _s in result.errors],
+        "failures": [(_ref(_t), _s) for _t, _s in result.failures],
+        "skipped": [(_ref(_t), _s) for _t, _s in result.skipped],
+        "expectedFailures": [(_ref(_t), _s) for _t, _s in result.expectedFailures],
+        "unexpectedSuccesses": [_ref(_t) for _t in result.unexpectedSuccesses],
+        "testsRun": result.testsRun,
+        "slowest": result.slowest,
+        "classPhaseTotals": result.classPhaseTotals,
+        "fixtureTimes": result.fixtureTimes,
+        "memoryLeaks": result.memoryLeaks,
+        "failureGroups": result.failureGroups.export(),
+        "subTestTally": result.subTestTally,
+        "shouldStop": result.shouldStop,
+    }
+
+
+def mergeResult(result, state: dict):
+    """ @abstract Fold an exported result state into `result`.
+        @params result [PrettyTestResult] Result to merge into
+        @params state [dict] State returned by `exportResult`
+    """
+    for _cls, _counts in state["tally"].items():
+        if _cls not in result.tally:
+            result.tally[_cls] = dict(_counts)
+        else:
+            for _key, _val in _counts.items():
+                result.tally[_cls][_key] += _val
+    for _cls, _rows in state["results"].items():
+        result.results.setdefault(_cls, []).extend(_rows)
+        for _rec in _rows:
+            if result.history is not None and _rec.start is not None:
+                result.history.add(_rec.testId, _rec.stop - _rec.start,
+                                   _rec.status in result.FAILED)
+            result.emitRecord(_cls, _rec)
+    result.errors.extend(state["errors"])
+    result.failures.extend(state["failures"])
+    result.skipped.extend(state["skipped"])
+    result.expectedFailures.extend(state["expectedFailures"])
+    result.unexpectedSuccesses.extend(state["unexpectedSuccesses"])
+    result.testsRun += state["testsRun"]
+    for _entry in state["slowest"]:
+        result.noteSlow(_entry)
+    for _cls, _ns in state["classPhaseTotals"].items():
+        result.classPhaseTotals[_cls] = result.classPhaseTotals.get(_cls, 0) + _ns
+    for _kind, _fixtures in state["fixtureTimes"].items():
+        for _name, _times in _fixtures.items():
+            _merged = result.fixtureTimes[_kind].setdefault(
+                _name, {"setUp": 0, "tearDown": 0})
+            _merged["setUp"] += _times["setUp"]
+            _merged["tearDown"] += _times["tearDown"]
+    result.memoryLeaks.extend(state["memoryLeaks"])
+    result.failureGroups.merge(state["failureGroups"])
+    for _cls, _counts in state["subTestTally"].items():
+        _merged = result.subTestTally.setdefault(_cls, {"run": 0, "failed": 0})
+        _merged["run"] += _counts["run"]
+        _merged["failed"] += _counts["failed"]
+    if state["shouldStop"]:
+        result.stop()
+
+
+def chunkSettings(runner, result) -> dict:
+    """ @abstract Result settings copied from the runner for each chunk """
+    return {
+        "resultclass": runner.resultclass,
+        "descriptions": runner.descriptions,
+        "verbosity": runner.verbosity,
+        "timing": result.timing,
+        "failfast": result.failfast,
+        "buffer": result.buffer,
+        "capture": result.capture,
+        "tb_locals": result.tb_locals,
+        "warnings": runner.warnings,
+        "phaseTiming": result.phaseTiming,
+        "slowestCount": result.slowestCount,
+        "subTestParams": result.subTestParams,
+        "asyncConcurrency": runner.asyncConcurrency,
+        "memory": (runner.memoryMode, runner.leakThreshold) if runner.memory else None,
+        "timeouts": (runner.testTimeout, runner.classTimeout)
+        if runner.testTimeout is not None or runner.classTimeout is not None else None,
+        # Watchdog shared by the threads of a threaded run
+        "watchdog": None,
+    }
+
+
+def chunkResult(settings: dict):
+    """ @abstract Fresh result for one chunk, see `chunkSettings` """
+    result = settings["resultclass"](None, settings["descriptions"],
+                                     settings["verbosity"])
+    result.timing = settings["timing"]
+    result.failfast = settings["failfast"]
+    result.buffer = settings["buffer"]
+    result.capture = settings["capture"]
+    result.tb_locals = settings["tb_locals"]
+    result.phaseTiming = settings["phaseTiming"]
+    result.slowestCount = settings["slowestCount"]
+    result.subTestParams = settings["subTestParams"]
+    if settings["memory"] is not None:
+        from .memory import MemoryTracker
+        result.memory = MemoryTracker(*settings["memory"])
+    if settings["watchdog"] is not None:
+        result.watchdog = settings["watchdog"]
+    elif settings["timeouts"] is not None:
+        from .watchdog import Watchdog
+        result.watchdog = Watchdog(*settings["timeouts"])
+    return result
+
+
+def mergeFinished(result, states: list, merged: int) -> int:
+    """ @abstract Merge the finished prefix of chunk `states` so streamed
+            reports keep serial order. Merged entries are replaced by {}.
+        @params result [PrettyTestResult] Result to merge into
+        @params states [list] Exported states in chunk order, None while
+            still running
+        @params merged [int] Number of entries already merged
+        @returns [int] Updated number of merged entries
+    """
+    while merged < len(states) and states[merged] is not None:
+        _state, states[merged] = states[merged], {}
+        merged += 1
+        if _state:
+            mergeResult(result, _state)
+            for _cls in _state["results"]:
+                result.completeClass(_cls)
+    return merged
+
+
+def _initWorker(stopEvent, started=None):
+    global _STOP_EVENT, _STARTED
+    _STOP_EVENT = stopEvent
+    _STARTED = started
+    if started is not None:
+        # Tells the parent which of its children are workers of the pool
+        started.put((None, os.getpid(), time.time()))
+
+
+def _runChunk(tests: list, settings: dict, index: int=None) -> dict:
+    """ @abstract Worker entry point, run one class chunk in a fresh result.
+        @params tests [list] TestCase instances of a single class, packed by
+            `_packTest`
+        @params settings [dict] Result settings copied from the runner
+        @params index [int] Chunk index to report the start of, if any
+        @returns [dict] Exported result state
+    """
+    if index is not None and _STARTED is not None:
+        _STARTED.put((index, os.getpid(), time.time()))
+    result = chunkResult(settings)
+    tests = [_unpackTest(_test) for _test in tests]
+    if settings["asyncConcurrency"] > 0:
+        from .asyncSuite import groupAsyncClasses
+        tests = list(groupAsyncClasses(tests, settings["asyncConcurrency"]))
+
+    with warnings.catch_warnings():
+        if settings["warnings"]:
+            warnings.simplefilter(settings["warnings"])
+        # A top-level suite per chunk runs setUpModule/setUpClass and their
+        # teardowns once for this chunk
+        if result.phaseTiming:
+            with FixtureTimer(iterTests(tests), result.fixtureTimes, result.testClsName):
+                _ChunkSuite(tests)(result)
+        else:
+            _ChunkSuite(tests)(result)
+
+    if result.memory is not None:
+        result.memory.close()
+    if result.watchdog is not None:
+        result.watchdog.close()
+    if result.shouldStop and _STOP_EVENT is not None:
+        _STOP_EVENT.set()
+    return exportResult(result)
+
+
+def _chunkBudget(settings: dict, chunk: list) -> float:
+    """ @abstract Seconds a chunk may run before its worker is killed, None
+            without timeouts
+    """
+    if settings["timeouts"] is None:
+        return None
+    _testTimeout, _classTimeout = settings["timeouts"]
+    _limits = []
+    if _testTimeout is not None:
+        _limits.append(_testTimeout * len(chunk))
+    if _classTimeout is not None:
+        _limits.append(_classTimeout)
+    return min(_limits) + KILL_GRACE
+
+
+def _killedState(settings: dict, chunk: list, budget: float) -> dict:
+    """ @abstract Exported state reporting every test of a chunk whose
+            worker was killed as TIMEOUT
+    """
+    result = chunkResult(dict(settings, timeouts=None))
+    _text = "TIMEOUT: worker killed after running this class for {}s, " \
+            "the results of the class are lost".format(round(budget, 3))
+    for _test in chunk:
+        result.addTimeout(_test, _text)
+        result.testsRun += 1
+    return exportResult(result)
+
+
+def _failedState(settings: dict, chunk: list, text: str) -> dict:
+    """ @abstract Exported state reporting every test of a unit which could
+            not be run as an error
+    """
+    result = chunkResult(dict(settings, timeouts=None))
+    for _test in chunk:
+        _clsName = result.testClsName(_test)
+        result._addClass(_clsName)
+        result.tally[_clsName]["error"] += 1
+        result._record(_test, 'E', text)
+        result.errors.append((_test, text))
+        result.testsRun += 1
+    return exportResult(result)
+
+
+def runParallel(runner, suite, result):
+    """ @abstract Run `suite` in a process pool of `runner.workers` processes,
+            one task per test class, and merge everything into `result` in
+            the same order a serial run would produce. With timeouts, a
+            chunk overrunning its budget has its worker killed, the pool is
+            replaced and the other unfinished chunks are submitted again. A
+            worker dying, e.g. a test calling os._exit or crashing the
+            interpreter, breaks the pool the same way: the chunk it ran is
+            reported as errors and the others are submitted again.
+        @params runner [PrettyTextTestRunner] Runner holding the settings
+        @params suite [TestSuite|TestCase] Suite to run
+        @params result [PrettyTestResult] Result to merge into
+    """
+    _settings = chunkSettings(runner, result)
+    _chunks = splitSuite(suite)
+    _states = [None] * len(_chunks)
+    _merged = 0
+    _budgets = [_chunkBudget(_settings, _chunk) for _chunk in _chunks]
+    _poll = 0.5 if _settings["timeouts"] is not None else None
+    # Process pools are costly to import, only load them when used
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+    from multiprocessing import Event, SimpleQueue, active_children
+    _stopEvent = Event()
+    _started = None
+    _attempts = [0] * len(_chunks)
+    _children = {}  # {pid: Process} children alive when a pool was fed
+    _workers = set()  # pids of the current pool's workers
+
+    def _newPool():
+        nonlocal _started
+        # A queue per pool, one written by a killed worker may be corrupt.
+        # Futures are marked running once queued for a worker, not when it
+        # starts them, so workers report the real start of a chunk. Puts
+        # are written right away, they outlive a worker dying next.
+        _started = SimpleQueue()
+        _workers.clear()
+        return ProcessPoolExecutor(max_workers=runner.workers,
+                                   initializer=_initWorker,
+                                   initargs=(_stopEvent, _started))
+
+    def _drainStarts():
+        while not _started.empty():
+            _idx, _pid, _start = _started.get()
+            if _idx is None:
+                _workers.add(_pid)
+            else:
+                _starts[_idx] = (_pid, _start)
+
+    def _exitcode(pid: int):
+        _process = _children.get(pid)
+        return _process.exitcode if _process is not None else None
+
+    def _closePool(pool, kill: bool=False):
+        # Cancelling by hand, `cancel_futures` needs Python 3.9
+        for _future in _pending:
+            _future.cancel()
+        if kill:
+            _drainStarts()
+            for _pid in _workers:
+                if _pid in _children:
+                    _children[_pid].kill()
+        pool.shutdown(wait=True)
+
+    def _resubmit(indexes):
+        if _stopEvent.is_set():
+            # Failfast tripped, nothing left to run again
+            for _idx in indexes:
+                _states[_idx] = {}
+            indexes = []
+        _pool = _newPool()
+        return _pool, _submit(_pool, sorted(indexes))
+
+    def _submit(pool, indexes):
+        _futures = {pool.submit(_runChunk, [_packTest(_test) for _test in _chunks[_idx]],
+                                _settings, _idx): _idx
+                    for _idx in indexes}
+        # The pool spawns its workers from submit, hold on to them while
+        # they are alive to read their exit codes later
+        _children.update((_process.pid, _process) for _process in active_children())
+        return _futures
+
+    _pool = _newPool()
+    try:
+        _pending = _submit(_pool, range(len(_chunks)))
+        _starts = {}  # {chunk index: (worker pid, wall clock start)}
+        while _pending:
+            _done, _ = wait(_pending, timeout=_poll, return_when=FIRST_COMPLETED)
+            _broken = []
+            for _future in _done:
+                _idx = _pending.pop(_future)
+                if _future.cancelled():
+                    _states[_idx] = {}
+                    continue
+                try:
+                    _states[_idx] = _future.result()
+                except BrokenProcessPool:
+                    _broken.append(_idx)
+                    continue
+                if _states[_idx]["shouldStop"] and result.failfast:
+                    _stopEvent.set()
+                    for _other in _pending:
+                        _other.cancel()
+            _drainStarts()
+            if _broken:
+                _closePool(_pool)
+                # The pool terminates the other workers once one died on its
+                # own, the chunk of that one is to blame
+                _begun = [_idx for _idx in _broken if _idx in _starts]
+                _lost = [_idx for _idx in _begun
+                         if _exitcode(_starts[_idx][0]) not in (None, -signal.SIGTERM)]
+                if not _lost:
+                    # Cannot tell, blame every chunk which started, a few times
+                    for _idx in _begun or _broken:
+                        _attempts[_idx] += 1
+                        if _attempts[_idx] >= MAX_ATTEMPTS:
+                            _lost.append(_idx)
+                for _idx in _lost:
+                    _states[_idx] = _failedState(_settings, _chunks[_idx],
+                                                 "Worker died while running this class")
+                if _lost and result.failfast:
+                    _stopEvent.set()
+                _children.clear()
+                _pool, _pending = _resubmit(
+                    [_idx for _idx in _broken if _states[_idx] is None]
+                    + list(_pending.values()))
+                _starts = {}
+            elif _poll is not None:
+                _now = time.time()
+                _hung = [_future for _future, _idx in _pending.items()
+                         if _idx in _starts and _now - _starts[_idx][1] > _budgets[_idx]]
+                if _hung:
+                    for _future in _hung:
+                        _idx = _pending.pop(_future)
+                        _states[_idx] = _killedState(_settings, _chunks[_idx],
+                                                     _now - _starts[_idx][1])
+                    # Workers cannot be told apart, replace the whole pool
+                    _closePool(_pool, kill=True)
+                    _children.clear()
+                    _pool, _pending = _resubmit(_pending.values())
+                    _starts = {}
+            _merged = mergeFinished(result, _states, _merged)
+    finally:
+        _pool.shutdown()
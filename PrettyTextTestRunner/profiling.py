@@ -0,0 +1,286 @@
+import cProfile
+import heapq
+import os
+import pstats
+import sys
+import threading
+import time
+import unittest
+from functools import wraps
+from inspect import iscoroutinefunction
+
+__name__ = "PrettyTextTestRunner.profiling"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Frames of unittest and of this runner are plumbing, not test code
+_SKIP_DIRS = (os.path.dirname(unittest.__file__) + os.sep,
+              os.path.dirname(os.path.abspath(__file__)) + os.sep)
+
+
+def _isPlumbing(func: tuple) -> bool:
+    return func[0].startswith(_SKIP_DIRS) or "_lsprof.Profiler" in func[2]
+
+
+def funcLabel(func: tuple) -> str:
+    """ @abstract Readable name of a pstats function key
+        @params func [tuple] (filename, firstlineno, name)
+    """
+    _filename, _line, _name = func
+    if _filename == "~":
+        return _name
+    return "{} ({}:{})".format(_name, os.path.basename(_filename), _line)
+
+
+class TestProfiler(object):
+    """ @abstract Profile each test between startTest and stopTest and
+            aggregate per function across the run. Only setUp, the test
+            method and tearDown are profiled, see `instrument`, so result
+            bookkeeping and unittest internals stay out of the profile.
+        @params mode [str] "deterministic" for cProfile or "sampling" for a
+            low overhead stack sampler
+        @params interval [float] Sampling interval in seconds
+        @params slowest [int] Number of slowest tests keeping their own top
+            frames
+        @params frames [int] Top frames kept per slow test
+        @methods start, instrument, restore, stop, hotFunctions, slowTests,
+            dumpClassStats, close
+    """
+
+    def __init__(self, mode: str="deterministic", interval: float=0.001,
+                 slowest: int=10, frames: int=3):
+        if mode not in ("deterministic", "sampling"):
+            raise ValueError("Unknown profile mode: {}".format(mode))
+        self.mode = mode
+        self.interval = interval
+        self.slowestCount = slowest
+        self.frames = frames
+        self.functions = {}  # {func: [calls, ownSeconds, cumulativeSeconds]}
+        self.classStats = {}  # {clsName: pstats.Stats}, deterministic only
+        self._slowest = []  # min-heap of (seconds, testId, [(func, own), ...])
+        self._start = None
+        self._profile = None
+        self._depth = 0
+        # Sampling state, written by the sampler thread while a test runs
+        self._samples = {}  # {func: [ownSeconds, cumulativeSeconds]}
+        self._threadId = None
+        self._outer = frozenset()
+        self._sampling = threading.Event()
+        self._closed = False
+        self._sampler = None
+
+    def start(self):
+        """ @abstract Prepare a profile for the test about to run on this
+                thread, nothing is recorded until `resume`.
+        """
+        self._start = time.perf_counter()
+        self._depth = 0
+        if self.mode == "deterministic":
+            self._profile = cProfile.Profile()
+            return
+        self._samples = {}
+        self._threadId = threading.get_ident()
+        if self._sampler is None:
+            self._sampler = threading.Thread(target=self._sampleLoop,
+                                             name="TestProfiler", daemon=True)
+            self._sampler.start()
+
+    def resume(self):
+        """ @abstract Record until the matching `pause` """
+        self._depth += 1
+        if self._depth > 1 or self._start is None:
+            return
+        if self.mode == "deterministic":
+            self._profile.enable()
+            return
+        # Frames already on the stack belong to the runner, sampling stops
+        # walking once it reaches one of them
+        _outer = []
+        _frame = sys._getframe(1)
+        while _frame is not None:
+            _outer.append(_frame)
+            _frame = _frame.f_back
+        self._outer = frozenset(_outer)
+        self._sampling.set()
+
+    def pause(self):
+        self._depth -= 1
+        if self._depth > 0 or self._start is None:
+            return
+        if self.mode == "deterministic":
+            self._profile.disable()
+            return
+        self._sampling.clear()
+        self._outer = frozenset()
+
+    def _wrap(self, func):
+        if iscoroutinefunction(func):
+            @wraps(func)
+            async def _profiledAsync(*args, **kwargs):
+                self.resume()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self.pause()
+            return _profiledAsync
+
+        @wraps(func)
+        def _profiled(*args, **kwargs):
+            self.resume()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.pause()
+        return _profiled
+
+    def instrument(self, test) -> list:
+        """ @abstract Shadow setUp, the test method and tearDown on the
+                instance with wrappers profiling their calls.
+            @params test [TestCase] Test about to run
+            @returns [list] State to hand back to `restore`
+        """
+        _saved = []
+        for _attr in ("setUp", getattr(test, "_testMethodName", None), "tearDown"):
+            _func = getattr(test, _attr, None) if _attr else None
+            if _func is None:
+                continue
+            _saved.append((_attr, test.__dict__.get(_attr)))
+            test.__dict__[_attr] = self._wrap(_func)
+        return _saved
+
+    def restore(self, test, saved: list):
+        """ @abstract Undo `instrument`, keeping attributes set before it """
+        for _attr, _previous in reversed(saved):
+            if _previous is None:
+                test.__dict__.pop(_attr, None)
+            else:
+                test.__dict__[_attr] = _previous
+
+    def stop(self, testId: str, clsName: str):
+        """ @abstract Finish the test started by `start` and fold its profile
+                into the run totals.
+        """
+        if self._start is None:
+            return
+        if self._depth > 0:
+            self._depth = 1
+            self.pause()
+        if self.mode == "deterministic":
+            _own = self._foldStats(pstats.Stats(self._profile), clsName) \
+                if self._profile.getstats() else {}
+            self._profile = None
+        else:
+            _own = self._foldSamples()
+        _seconds = time.perf_counter() - self._start
+        self._start = None
+
+        _top = heapq.nlargest(self.frames, _own.items(), key=lambda _item: _item[1])
+        _entry = (_seconds, testId, _top)
+        if len(self._slowest) < self.slowestCount:
+            heapq.heappush(self._slowest, _entry)
+        elif _entry[:2] > self._slowest[0][:2]:
+            heapq.heapreplace(self._slowest, _entry)
+
+    def _foldStats(self, stats, clsName: str) -> dict:
+        """ @abstract Add a test's cProfile stats to the totals
+            @returns [dict] {func: ownSeconds} of the test
+        """
+        _own = {}
+        for _func, (_cc, _calls, _tt, _ct, _) in stats.stats.items():
+            if _isPlumbing(_func):
+                continue
+            _totals = self.functions.setdefault(_func, [0, 0.0, 0.0])
+            _totals[0] += _calls
+            _totals[1] += _tt
+            _totals[2] += _ct
+            _own[_func] = _tt
+        if clsName in self.classStats:
+            self.classStats[clsName].add(stats)
+        else:
+            self.classStats[clsName] = stats
+        return _own
+
+    def _sampleLoop(self):
+        while not self._closed:
+            self._sampling.wait()
+            if self._closed:
+                return
+            # Each sample stands for the time actually slept
+            _slept = time.perf_counter()
+            time.sleep(self.interval)
+            _weight = time.perf_counter() - _slept
+            _frame = sys._current_frames().get(self._threadId)
+            _outer = self._outer
+            if _frame is None or not self._sampling.is_set():
+                continue
+            _seen = set()
+            _top = True
+            # Walk out from the running frame to the frames which were
+            # already there when the test started
+            while _frame is not None and _frame not in _outer:
+                _code = _frame.f_code
+                _func = (_code.co_filename, _code.co_firstlineno, _code.co_name)
+                if _isPlumbing(_func):
+                    _frame = _frame.f_back
+                    continue
+                _times = self._samples.setdefault(_func, [0.0, 0.0])
+                if _top:
+                    _times[0] += _weight
+                    _top = False
+                if _func not in _seen:
+                    _times[1] += _weight
+                    _seen.add(_func)
+                _frame = _frame.f_back
+            del _frame
+
+    def _foldSamples(self) -> dict:
+        """ @abstract Add a test's samples to the totals
+            @returns [dict] {func: ownSeconds} of the test
+        """
+        _own = {}
+        _samples, self._samples = self._samples, {}
+        for _func, (_ownTime, _cumTime) in _samples.items():
+            _totals = self.functions.setdefault(_func, [0, 0.0, 0.0])
+            _totals[1] += _ownTime
+            _totals[2] += _cumTime
+            if _ownTime:
+                _own[_func] = _ownTime
+        return _own
+
+    def hotFunctions(self, count: int) -> list:
+        """ @abstract Top functions by cumulative time over the run
+            @returns [list] of (func, calls, ownSeconds, cumulativeSeconds),
+                calls is None when sampling
+        """
+        _top = heapq.nlargest(count, self.functions.items(),
+                              key=lambda _item: _item[1][2])
+        return [(_func, _calls if self.mode == "deterministic" else None, _own, _cum)
+                for _func, (_calls, _own, _cum) in _top]
+
+    def slowTests(self) -> list:
+        """ @abstract Slowest profiled tests, slowest first
+            @returns [list] of (seconds, testId, [(func, ownSeconds), ...])
+        """
+        return sorted(self._slowest, key=lambda _entry: _entry[:2], reverse=True)
+
+    def dumpClassStats(self, directory: str) -> list:
+        """ @abstract Write one `<clsName>.pstats` file per class,
+                deterministic mode only.
+            @returns [list] Written paths
+        """
+        os.makedirs(directory, exist_ok=True)
+        _paths = []
+        for _clsName, _stats in self.classStats.items():
+            _path = os.path.join(directory, _clsName + ".pstats")
+            _stats.dump_stats(_path)
+            _paths.append(_path)
+        return _paths
+
+    def close(self):
+        """ @abstract Stop the sampler thread, if any """
+        self._closed = True
+        self._sampling.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
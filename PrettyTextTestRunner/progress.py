@@ -0,0 +1,111 @@
+import time
+
+from . import COLOR, START
+
+__name__ = "PrettyTextTestRunner.progress"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Record status to the tally it counts towards
+_COUNTS = {'.': "pass", 'X': "pass", 'F': "fail", '?': "fail",
+           'E': "error", 'T': "error", 'S': "skip", 'C': "pass"}
+_COLORS = {"pass": "GREEN", "fail": "RED", "error": "YELLOW", "skip": "CYAN"}
+_CLEAR = "\r" + START + "K"
+
+
+def _duration(seconds: float) -> str:
+    """ @abstract Short duration, "42s", "3m07s" or "1h02m" """
+    _seconds = int(seconds + 0.5)
+    if _seconds < 60:
+        return "{}s".format(_seconds)
+    if _seconds < 3600:
+        return "{}m{:02d}s".format(_seconds // 60, _seconds % 60)
+    return "{}h{:02d}m".format(_seconds // 3600, _seconds % 3600 // 60)
+
+
+class ProgressLine(object):
+    """ @abstract Live progress of a run, fed records like a ResultWriter.
+            On a terminal one line is redrawn in place at most `interval`
+            seconds apart, otherwise a plain line is written every
+            `lineInterval` seconds, so tiny tests do not pay for terminal I/O.
+        @params stream [file] Stream to draw on
+        @params total [int] Tests expected in the run
+        @params interval [float] Seconds between redraws on a terminal
+        @params lineInterval [float] Seconds between lines when not a terminal
+        @params color [bool] Color the counts, only used on a terminal
+        @methods startTestRun, writeRecord, stopTestRun, clear
+    """
+
+    def __init__(self, stream, total: int, interval: float=0.1,
+                 lineInterval: float=10.0, color: bool=True):
+        self.stream = stream
+        self.total = total
+        _isatty = getattr(stream, "isatty", None)
+        self.tty = bool(_isatty and _isatty())
+        self.interval = interval if self.tty else lineInterval
+        self.color = color and self.tty
+        self.done = 0
+        self.counts = {"pass": 0, "fail": 0, "error": 0, "skip": 0}
+        self._start = None
+        self._nextDraw = 0.0
+        self._drawn = False
+
+    def startTestRun(self):
+        self._start = time.monotonic()
+        self._nextDraw = self._start + self.interval
+
+    def writeRecord(self, clsName: str, record, statusText: str):
+        self.done += 1
+        self.counts[_COUNTS.get(record.status, "pass")] += 1
+        _now = time.monotonic()
+        if _now >= self._nextDraw:
+            self._nextDraw = _now + self.interval
+            self._draw(_now)
+
+    def _paint(self, text: str, key: str) -> str:
+        if not self.color or not self.counts[key]:
+            return text
+        return START + COLOR[_COLORS[key]] + text + START + COLOR["END"]
+
+    def text(self, now: float=None) -> str:
+        """ @abstract Progress line, without line ending """
+        _elapsed = (now or time.monotonic()) - self._start
+        _done = min(self.done, self.total) if self.total else self.done
+        _parts = ["[{}/{}]".format(_done, self.total if self.total else "?")]
+        _parts.extend(self._paint("{} {}".format(_key, _count), _key)
+                      for _key, _count in self.counts.items())
+        _rate = self.done / _elapsed if _elapsed > 0 else 0.0
+        _parts.append("{:.1f} tests/s".format(_rate))
+        if self.total and _rate > 0 and _done < self.total:
+            _parts.append("ETA {}".format(_duration((self.total - _done) / _rate)))
+        else:
+            _parts.append("elapsed {}".format(_duration(_elapsed)))
+        return " ".join(_parts)
+
+    def _draw(self, now: float):
+        if self.tty:
+            self.stream.write(_CLEAR + self.text(now))
+            self._drawn = True
+        else:
+            self.stream.write(self.text(now) + "\n")
+        self.stream.flush()
+
+    def clear(self):
+        """ @abstract Remove the drawn line before writing to the stream, it
+                is drawn again with the next record.
+        """
+        if self._drawn:
+            self.stream.write(_CLEAR)
+            self.stream.flush()
+            self._drawn = False
+        self._nextDraw = 0.0
+
+    def stopTestRun(self):
+        """ @abstract Leave the final state on its own line """
+        _now = time.monotonic()
+        if self.tty:
+            self.stream.write(_CLEAR)
+        self.stream.write(self.text(_now) + "\n")
+        self.stream.flush()
+        self._drawn = False
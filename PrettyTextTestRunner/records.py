@@ -0,0 +1,126 @@
+__name__ = "PrettyTextTestRunner.records"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class TestRecord(object):
+    """ @abstract Compact result row for a single test. Only plain values are
+            kept so the TestCase, its fixtures and attributes can be freed as
+            soon as the test has run.
+        @params testId [str] Result of `test.id()`
+        @params name [str] Test method name
+        @params status [str] Status code, a key of `PrettyTestResult.STATUS`
+        @params output [str] Failure text and captured output, if any
+        @props start, stop [int] perf_counter_ns() around the test
+        @props setUpNs, bodyNs, tearDownNs [int] Phase durations, None unless
+            phase timing is enabled
+        @props peakBytes, retainedBytes [int] Peak and net retained memory,
+            None unless memory tracking is enabled
+        @props group [str] Failure group fingerprint of a failed test
+        @props subTests [SubTestSummary] Outcome of the test's subtests, if any
+    """
+    __slots__ = ("testId", "name", "status", "output", "start", "stop",
+                 "setUpNs", "bodyNs", "tearDownNs", "peakBytes", "retainedBytes",
+                 "group", "subTests")
+
+    def __init__(self, testId: str, name: str, status: str, output: str=""):
+        self.testId = testId
+        self.name = name
+        self.status = status
+        self.output = output
+        self.start = None
+        self.stop = None
+        self.setUpNs = None
+        self.bodyNs = None
+        self.tearDownNs = None
+        self.peakBytes = None
+        self.retainedBytes = None
+        self.group = None
+        self.subTests = None
+
+    @property
+    def duration(self) -> float:
+        """ @abstract Run time in seconds, None when timing was disabled """
+        if self.start is None or self.stop is None:
+            return None
+        return (self.stop - self.start) / 1e9
+
+    def __getstate__(self):
+        return tuple(getattr(self, _slot) for _slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for _slot, _val in zip(self.__slots__, state):
+            setattr(self, _slot, _val)
+
+    def __repr__(self):
+        return "<TestRecord {} {}>".format(self.testId, self.status)
+
+
+class FailureText(object):
+    """ @abstract Traceback snapshot which is only formatted the first time
+            its text is needed, then cached. Behaves like the string it
+            formats to for the usual `errors`/`failures` consumers.
+        @params tbException [TracebackException] Trimmed traceback, or None
+        @params extra [str] Text to append, such as captured output
+        @params fingerprint [str] Failure group, see `grouping.failureFingerprint`
+    """
+    __slots__ = ("_tbException", "_tbText", "extra", "fingerprint", "_text")
+
+    def __init__(self, tbException=None, extra: str="", fingerprint: str=None):
+        self._tbException = tbException
+        self._tbText = None
+        self.extra = extra
+        self.fingerprint = fingerprint
+        self._text = None
+
+    @property
+    def tracebackText(self) -> str:
+        """ @abstract The traceback alone, without `extra` """
+        if self._tbText is None:
+            self._tbText = "".join(self._tbException.format()) \
+                if self._tbException is not None else ""
+            # Drop the snapshot once it has been rendered
+            self._tbException = None
+        return self._tbText
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = self.tracebackText + self.extra
+        return self._text
+
+    def __len__(self) -> int:
+        return len(str(self))
+
+    def __eq__(self, other) -> bool:
+        return str(self) == str(other)
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __contains__(self, item) -> bool:
+        return item in str(self)
+
+    def __add__(self, other) -> str:
+        return str(self) + other
+
+    def __radd__(self, other) -> str:
+        return other + str(self)
+
+    def __getattr__(self, name):
+        # str methods such as splitlines() or startswith()
+        return getattr(str(self), name)
+
+    def __reduce__(self):
+        # Pickle formatted, the traceback snapshot does not pickle
+        return (_formattedFailure, (self.tracebackText, self.extra, self.fingerprint))
+
+    def __repr__(self):
+        return repr(str(self))
+
+
+def _formattedFailure(tbText: str, extra: str, fingerprint: str) -> FailureText:
+    """ @abstract Rebuild a pickled FailureText """
+    _failure = FailureText(None, extra, fingerprint)
+    _failure._tbText = tbText
+    return _failure
@@ -0,0 +1,222 @@
+import ast
+import hashlib
+import json
+import os
+import sys
+from inspect import ismodule
+from unittest import TestSuite
+
+from .parallel import iterTests
+
+__name__ = "PrettyTextTestRunner.selection"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+def _fileHash(path: str) -> str:
+    _digest = hashlib.sha1()
+    with open(path, "rb") as _fh:
+        for _block in iter(lambda: _fh.read(1 << 20), b""):
+            _digest.update(_block)
+    return _digest.hexdigest()
+
+
+def _dottedImports(module) -> list:
+    """ @abstract Submodules imported as `import pkg.mod`, which only bind
+            `pkg` in the namespace
+    """
+    _file = getattr(module, "__file__", None)
+    if not _file or not _file.endswith(".py"):
+        return []
+    try:
+        with open(_file, "rb") as _fh:
+            _tree = ast.parse(_fh.read(), _file)
+    except (OSError, SyntaxError, ValueError):
+        return []
+    return [_alias.name for _node in ast.walk(_tree) if isinstance(_node, ast.Import)
+            for _alias in _node.names if "." in _alias.name]
+
+
+def referencedModules(module) -> list:
+    """ @abstract Names of the modules `module` refers to: the modules in its
+            namespace and the modules defining its objects. Its package is
+            left out, the package's namespace holds every submodule imported
+            so far, used or not.
+        @params module [module] Imported module
+        @returns [list] of module names, not necessarily imported
+    """
+    _names = []
+    for _value in list(vars(module).values()):
+        if ismodule(_value):
+            _names.append(_value.__name__)
+        else:
+            try:
+                _names.append(getattr(_value, "__module__", None))
+            except Exception:
+                continue
+    return [_name for _name in _names if isinstance(_name, str) and _name]
+
+
+class FingerprintCache(object):
+    """ @abstract Remembers, per test class, the source files it depends on
+            and whether it passed, so unchanged passing classes can be skipped
+            on the next run.
+        @params path [str] JSON cache file
+        @params root [str] Only modules below this directory are tracked,
+            defaults to the working directory
+        @example Cache Format
+            {
+                "files": {path: [mtime_ns, size, sha1], ... },
+                "classes": {clsName: {"passed": true, "deps": [path, ... ]}}
+            }
+    """
+
+    def __init__(self, path: str, root: str=None):
+        self.path = path
+        self.root = os.path.realpath(root or os.getcwd()) + os.sep
+        self.files = {}
+        self.classes = {}
+        self._stats = {}
+        self._moduleDeps = {}
+        if os.path.exists(path):
+            with open(path) as _fh:
+                _cache = json.load(_fh)
+            self.files = _cache.get("files", {})
+            self.classes = _cache.get("classes", {})
+
+    def _tracked(self, filename) -> bool:
+        if not filename:
+            return False
+        _real = os.path.realpath(filename)
+        return _real.startswith(self.root) and "site-packages" not in _real
+
+    def _stat(self, path: str):
+        """ @abstract (mtime_ns, size) of `path`, None if missing, each file
+                is only stat'ed once per run.
+        """
+        if path not in self._stats:
+            try:
+                _st = os.stat(path)
+                self._stats[path] = (_st.st_mtime_ns, _st.st_size)
+            except OSError:
+                self._stats[path] = None
+        return self._stats[path]
+
+    def unchanged(self, path: str) -> bool:
+        """ @abstract Compare `path` to its recorded fingerprint. The content
+                hash is only read when mtime or size moved.
+        """
+        _known = self.files.get(path)
+        _stat = self._stat(path)
+        if _known is None or _stat is None:
+            return False
+        if [_stat[0], _stat[1]] == _known[:2]:
+            return True
+        if _stat[1] != _known[1]:
+            return False
+        _same = _fileHash(path) == _known[2]
+        if _same:
+            # Touched only, refresh the stat part
+            self.files[path] = [_stat[0], _stat[1], _known[2]]
+        return _same
+
+    def _packageFiles(self, name: str) -> set:
+        """ @abstract Tracked `__init__` files of the packages holding module
+                `name`, which run when it is imported
+        """
+        _files = set()
+        while "." in name:
+            name = name.rpartition(".")[0]
+            _file = getattr(sys.modules.get(name), "__file__", None)
+            if self._tracked(_file):
+                _files.add(os.path.realpath(_file))
+        return _files
+
+    def moduleDeps(self, module) -> set:
+        """ @abstract Tracked source files `module` depends on, following the
+                modules and objects in its namespace transitively. Packages
+                only add their `__init__` file, their namespace holds every
+                submodule imported so far by anyone.
+            @params module [module] Imported module
+            @returns [set] of file paths
+        """
+        if module.__name__ in self._moduleDeps:
+            return self._moduleDeps[module.__name__]
+        _deps = set()
+        _seen = {module.__name__}
+        _stack = [module]
+        while _stack:
+            _mod = _stack.pop()
+            _file = getattr(_mod, "__file__", None)
+            if not self._tracked(_file):
+                continue
+            _deps.add(os.path.realpath(_file))
+            _deps |= self._packageFiles(_mod.__name__)
+            if _mod is not module and hasattr(_mod, "__path__"):
+                continue
+            for _name in referencedModules(_mod) + _dottedImports(_mod):
+                if _name not in _seen and _name in sys.modules:
+                    _seen.add(_name)
+                    _stack.append(sys.modules[_name])
+        self._moduleDeps[module.__name__] = _deps
+        return _deps
+
+    def classDeps(self, cls) -> set:
+        """ @abstract Tracked files of the modules defining `cls` and its bases """
+        _deps = set()
+        for _base in cls.__mro__:
+            _module = sys.modules.get(_base.__module__)
+            if _module is not None:
+                _deps |= self.moduleDeps(_module)
+        return _deps
+
+    def isFresh(self, clsName: str) -> bool:
+        """ @abstract True when `clsName` passed last time and none of its
+                dependencies changed since.
+        """
+        _entry = self.classes.get(clsName)
+        if not _entry or not _entry["passed"] or not _entry["deps"]:
+            return False
+        return all(self.unchanged(_path) for _path in _entry["deps"])
+
+    def select(self, suite, clsName):
+        """ @abstract Split `suite` into tests to run and tests of fresh
+                classes which can be reported from the cache.
+            @params suite [TestSuite|TestCase] Suite to select from
+            @params clsName [callable] Maps a test to its report class name
+            @returns [tuple] (TestSuite to run, [cached TestCase, ...])
+        """
+        _fresh = {}
+        _run = []
+        _cached = []
+        for _test in iterTests(suite):
+            _cls = clsName(_test)
+            if _cls not in _fresh:
+                _fresh[_cls] = self.isFresh(_cls)
+            (_cached if _fresh[_cls] else _run).append(_test)
+        return TestSuite(_run), _cached
+
+    def update(self, classes: dict, passed: dict):
+        """ @abstract Record the outcome and dependencies of classes that ran
+            @params classes [dict] {clsName: {TestCase class, ...}}, a report
+                class name can cover classes of several modules
+            @params passed [dict] {clsName: bool}
+        """
+        for _clsName, _classes in classes.items():
+            if _clsName not in passed:
+                continue
+            _deps = sorted(set().union(*(self.classDeps(_cls) for _cls in _classes)))
+            for _path in _deps:
+                _stat = self._stat(_path)
+                _known = self.files.get(_path)
+                if _stat is not None and (_known is None or [_stat[0], _stat[1]] != _known[:2]):
+                    self.files[_path] = [_stat[0], _stat[1], _fileHash(_path)]
+            self.classes[_clsName] = {"passed": passed[_clsName], "deps": _deps}
+
+    def save(self):
+        """ @abstract Write the cache file """
+        _tmp = self.path + ".tmp"
+        with open(_tmp, "w") as _fh:
+            json.dump({"files": self.files, "classes": self.classes}, _fh)
+        os.replace(_tmp, self.path)
@@ -0,0 +1,99 @@
+from unittest import TestSuite
+
+from .parallel import iterTests
+
+__name__ = "PrettyTextTestRunner.sharding"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+def classKey(test) -> str:
+    """ @abstract Module and qualified name of the class of `test`, the unit
+            shards are made of. Report class names can merge the classes of
+            a whole package.
+    """
+    return "{}.{}".format(test.__class__.__module__, test.__class__.__qualname__)
+
+
+def classWeights(classes: dict, durations: dict=None) -> dict:
+    """ @abstract Estimate the cost of each class. Known test durations are
+            summed, unknown tests count as the average known test. Without any
+            known durations every test weighs 1.
+        @params classes [dict] {clsName: [TestCase, ...]}
+        @params durations [dict] {testId: duration} from previous runs
+        @returns [dict] {clsName: weight}
+    """
+    durations = durations or {}
+    _known = [durations[_test.id()] for _tests in classes.values()
+              for _test in _tests if _test.id() in durations]
+    _default = (sum(_known) / len(_known)) if _known else 1
+    return {_cls: sum(durations.get(_test.id(), _default) for _test in _tests)
+            for _cls, _tests in classes.items()}
+
+
+def assignShards(weights: dict, total: int) -> dict:
+    """ @abstract Longest-processing-time-first assignment of classes to
+            `total` shards. Ties are broken by class name so every node
+            computes the same partition.
+        @params weights [dict] {clsName: weight}
+        @params total [int] Number of shards
+        @returns [dict] {clsName: shard index}
+    """
+    _loads = [0] * total
+    _assigned = {}
+    for _cls in sorted(weights, key=lambda _cls: (-weights[_cls], _cls)):
+        _shard = min(range(total), key=lambda _idx: (_loads[_idx], _idx))
+        _loads[_shard] += weights[_cls]
+        _assigned[_cls] = _shard
+    return _assigned
+
+
+def failureFirstSuite(suite, clsName, failed: set, durations: dict=None) -> TestSuite:
+    """ @abstract Reorder a suite so classes holding a test which failed last
+            time run first, their failed tests leading, then the other
+            classes fastest first. Classes stay together, so their fixtures
+            still run once, module fixtures may run again when classes of a
+            module are no longer adjacent.
+        @params suite [TestSuite|TestCase] Suite to reorder
+        @params clsName [callable] Maps a test to its report class name
+        @params failed [set] Ids of the tests which failed last time
+        @params durations [dict] Optional {testId: duration} to sort by
+        @returns [TestSuite] Reordered tests
+    """
+    _classes = {}
+    for _test in iterTests(suite):
+        _classes.setdefault(clsName(_test), []).append(_test)
+    _weights = classWeights(_classes, durations)
+    _failing = {_cls for _cls, _tests in _classes.items()
+                if any(_test.id() in failed for _test in _tests)}
+    # Stable sorts, equal classes and tests keep their original order
+    _order = sorted(_classes, key=lambda _cls: (_cls not in _failing, _weights[_cls]))
+    _tests = []
+    for _cls in _order:
+        if _cls in _failing:
+            _tests.extend(sorted(_classes[_cls], key=lambda _test: _test.id() not in failed))
+        else:
+            _tests.extend(_classes[_cls])
+    return TestSuite(_tests)
+
+
+def shardSuite(suite, index: int, total: int, durations: dict=None) -> TestSuite:
+    """ @abstract Select the test classes of shard `index` out of `total`,
+            each class, see `classKey`, going to exactly one shard.
+        @params suite [TestSuite|TestCase] Full suite, in the same order on
+            every node
+        @params index [int] Zero based shard index
+        @params total [int] Number of shards
+        @params durations [dict] Optional {testId: duration} to balance by
+        @returns [TestSuite] Tests of this shard, in original order
+    """
+    if total < 1 or not 0 <= index < total:
+        raise ValueError("Invalid shard {} of {}.".format(index, total))
+
+    _classes = {}
+    for _test in iterTests(suite):
+        _classes.setdefault(classKey(_test), []).append(_test)
+    _assigned = assignShards(classWeights(_classes, durations), total)
+    return TestSuite([_test for _cls, _tests in _classes.items()
+                      if _assigned[_cls] == index for _test in _tests])
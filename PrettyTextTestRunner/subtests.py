@@ -0,0 +1,116 @@
+__name__ = "PrettyTextTestRunner.subtests"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class SubTestGroup(object):
+    """ @abstract Failed subtests of one test sharing a traceback
+        @props status [str] 'F' or 'E', see `PrettyTestResult.STATUS`
+        @props failure [FailureText] Failure of the first subtest
+        @props count [int] Subtests in the group
+        @props params [list] Parameter descriptions of the first failing
+            subtests with their own exception message, at most
+            `SubTestSummary.paramLimit`
+    """
+    __slots__ = ("status", "failure", "count", "params")
+
+    def __init__(self, status: str, failure, count: int=0, params: list=None):
+        self.status = status
+        self.failure = failure
+        self.count = count
+        self.params = params if params is not None else []
+
+
+class SubTestSummary(object):
+    """ @abstract Compact outcome of the subtests of one test: counters,
+            timing and failures collapsed by traceback, so a sweep of any
+            size is held in a fixed number of fields plus one entry per
+            distinct failure.
+        @params paramLimit [int] Parameter descriptions kept per failure group
+        @props counts [dict] {"success", "failed", "error", "skipped": int}
+        @props totalNs, slowestNs [int] Summed and longest subtest time, None
+            without timing
+        @props slowestParams [str] Parameters of the longest subtest
+        @props groups [dict] {traceback key: SubTestGroup}
+        @methods add, addFailure, addTime, text, export, restore
+    """
+    __slots__ = ("paramLimit", "counts", "totalNs", "slowestNs", "slowestParams",
+                 "groups")
+
+    def __init__(self, paramLimit: int=10):
+        self.paramLimit = paramLimit
+        self.counts = {"success": 0, "failed": 0, "error": 0, "skipped": 0}
+        self.totalNs = None
+        self.slowestNs = None
+        self.slowestParams = None
+        self.groups = {}
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def failed(self) -> int:
+        return self.counts["failed"] + self.counts["error"]
+
+    def add(self, key: str):
+        """ @abstract Count a passed or skipped subtest
+            @params key [str] Tally key, "success" or "skipped"
+        """
+        self.counts[key] += 1
+
+    def addFailure(self, status: str, traceKey: str, params: str, failure=None):
+        """ @abstract Count a failed subtest in the group of its traceback
+            @params status [str] 'F' or 'E'
+            @params traceKey [str] Traceback key, see `failureFingerprint`
+            @params params [str] Parameter description and message, e.g.
+                "(i=3): AssertionError: 3 not less than 3"
+            @params failure [FailureText] Failure, only needed for the first
+                subtest of a group
+            @returns [SubTestGroup] Group counting the subtest
+        """
+        self.counts["failed" if status == 'F' else "error"] += 1
+        _group = self.groups.get(traceKey)
+        if _group is None:
+            _group = self.groups[traceKey] = SubTestGroup(status, failure)
+        _group.count += 1
+        if len(_group.params) < self.paramLimit:
+            _group.params.append(params)
+        return _group
+
+    def addTime(self, durationNs: int, params: str):
+        """ @abstract Add the run time of a subtest """
+        self.totalNs = (self.totalNs or 0) + durationNs
+        if self.slowestNs is None or durationNs > self.slowestNs:
+            self.slowestNs, self.slowestParams = durationNs, params
+
+    def text(self) -> str:
+        """ @abstract One line summary for the report """
+        _text = "Subtests: {} run, {} pass, {} failed, {} errors, {} skipped".format(
+            self.total, self.counts["success"], self.counts["failed"],
+            self.counts["error"], self.counts["skipped"])
+        if self.totalNs is not None and self.total:
+            _text += ", mean {}ms, slowest {}ms {}".format(
+                round(self.totalNs / self.total / 1e6, 3),
+                round(self.slowestNs / 1e6, 3), self.slowestParams)
+        return _text
+
+    def export(self) -> list:
+        """ @abstract JSON compatible state, see `restore` """
+        return [self.counts, self.totalNs, self.slowestNs, self.slowestParams,
+                [[_key, _group.status, _group.failure.tracebackText, _group.failure.extra,
+                  _group.failure.fingerprint, _group.count, _group.params]
+                 for _key, _group in self.groups.items()]]
+
+    @classmethod
+    def restore(cls, state: list):
+        """ @abstract Rebuild an exported summary """
+        from .records import _formattedFailure
+        _summary = cls()
+        _counts, _summary.totalNs, _summary.slowestNs, _summary.slowestParams, _groups = state
+        _summary.counts.update(_counts)
+        for _key, _status, _tbText, _extra, _fingerprint, _count, _params in _groups:
+            _summary.groups[_key] = SubTestGroup(
+                _status, _formattedFailure(_tbText, _extra, _fingerprint), _count, _params)
+        return _summary
@@ -1,3 +1,4 @@
+import sys
 from textwrap import wrap
 
 __name__ = "PrettyTextTestRunner.textTable"
@@ -5,6 +6,23 @@ __module__ = "PrettyTextTestRunner"
 __author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
 __license__ = "MIT"
 
+# Characters textwrap rewrites, content without them can skip `wrap`
+_WRAP_SPECIAL = frozenset("\t\n\x0b\x0c\r")
+
+# Number of lines joined into a single stream write
+WRITE_CHUNK_LINES = 4096
+
+
+def _wrapCell(content: str, width: int) -> list:
+    """ @abstract Same result as `textwrap.wrap(content, width)`, with a fast
+            path for short single line ASCII content.
+    """
+    if len(content) <= width and content.isascii() \
+            and _WRAP_SPECIAL.isdisjoint(content):
+        _line = content.rstrip(" ")
+        return [_line] if _line else []
+    return wrap(content, width)
+
 class TextTable(object):
     """ @abstract Easily build a text formated table
         @parmas props [dict] Table descriptor dict
@@ -43,13 +61,16 @@ class TextTable(object):
         else:
             self.columnJustify = [_defaultJustify] * len(props["colWidths"])
 
-        self.columnWidths = props["colWidths"]
+        # Copied, layout must never write back into a shared descriptor
+        self.columnWidths = list(props["colWidths"])
         self.padding = props["padding"] if "padding" in props else 0
         self.margins = props["margins"] if "margins" in props else _emptyMargins
         self.indent = props["indent"] if "indent" in props else 0
         self.border = props["border"] if "border" in props else _defaultBorder
         self.__heading__ = []
         self.__table__ = []
+        self.__lineWidths = [0] * len(self.columnWidths)
+        self.__prepareRows()
 
     @property
     def hr(self):
@@ -62,20 +83,22 @@ class TextTable(object):
 
     def __generateCell(self, colIdx: int=0, content: str="",
                        single: bool=False) -> list:
-        """ @abstract Format content for table cell.
+        """ @abstract Format content for table cell. This is the first layout
+                pass, widest lines are recorded and column widths resolved
+                once in `__resolveWidths` before any line is emitted.
             @params colIdx [int] Column index.
             @params content [str] Text for cell, can be multi-lined.
             @params single [bool] #Optional flag to denote text is a single line.
             @returns [list] of formatted strings
         """
         _lines = []
-        _contentwidth = self.columnWidths[colIdx] - (2 * self.padding) 
-        if self.margins["top"] > 0 and not header:
+        _contentwidth = self.columnWidths[colIdx] - (2 * self.padding)
+        if self.margins["top"] > 0 and not single:
             _lines.extend(["" for _ in range(0, self.margins["top"])])
 
         try:
             if len(content) > 0:
-                _lines.extend(wrap(content, _contentwidth))
+                _lines.extend(_wrapCell(content, _contentwidth))
         except TypeError:
             return _lines
 
@@ -83,17 +106,53 @@ class TextTable(object):
             _lines.extend(["" for _ in range(0, self.margins["bottom"])])
 
         if len(_lines) > 0:
-            #Adjust column width to largest line value
-            try:
-                _maxWidth = max([len(_val) for _val in _lines])
-            except ValueError:
-                return _lines
-
-            if _maxWidth > _contentwidth:
-                self.columnWidths[colIdx] += _maxWidth - self.columnWidths[colIdx]
+            _maxWidth = max([len(_val) for _val in _lines])
+            if _maxWidth > self.__lineWidths[colIdx]:
+                self.__lineWidths[colIdx] = _maxWidth
 
         return _lines
 
+    def __resolveWidths(self):
+        """ @abstract Widen any column whose content outgrew it, once all
+                cells are known.
+        """
+        for _colIdx, _maxWidth in enumerate(self.__lineWidths):
+            if _maxWidth > self.columnWidths[_colIdx] - (2 * self.padding):
+                self.columnWidths[_colIdx] = _maxWidth + (2 * self.padding)
+
+    def __cellFormatter(self, colIdx: int):
+        """ @abstract Build the function padding a single cell line to the
+                width of column `colIdx`.
+        """
+        _colWidth = self.columnWidths[colIdx]
+        _justify = self.columnJustify[colIdx]
+        _padding = " " * self.padding
+        if _justify == "left":
+            return lambda _content: (_padding + _content).ljust(_colWidth)
+        elif _justify == "right":
+            return lambda _content: (_content + _padding).rjust(_colWidth)
+        elif _justify == "center":
+            _maxContWidth = _colWidth - (2 * self.padding)
+
+            def _center(_content):
+                _pad = " " * (((_maxContWidth - len(_content)) // 2) + self.padding)
+                return (_pad + _content + _pad).ljust(_colWidth)
+            return _center
+        return lambda _content: _content.ljust(_colWidth)
+
+    def __prepareRows(self):
+        """ @abstract Second layout pass set up, fix widths and build the
+                per column formatters and blank cell lines.
+        """
+        self.__resolveWidths()
+        self.__border = "|" if self.border == "solid" else " "
+        self.__prefix = " " * self.indent + self.__border
+        self.__cellFormats = []
+        for _colIdx, _width in enumerate(self.columnWidths):
+            _justify = self.__cellFormatter(_colIdx)
+            _blank = _justify(" " * (_width - (2 * self.padding)))
+            self.__cellFormats.append((_justify, _blank))
+
     def appendRow(self, cells: list=[], single: bool=False):
         """ @abstract Append a row of cells to the table.
             @params cells [list] List of cell content.
@@ -107,51 +166,22 @@ class TextTable(object):
             @params columns [list] Formated column content
             @returns [list] List of complete formatted rows
         """
-        _lines = []
         # compute maximum line length
-        _maxLen = max(*[len(_) for _ in columns])
-
-        _border = "|" if self.border == "solid" else " "
+        _maxLen = max([len(_) for _ in columns]) if columns else 0
+        if _maxLen == 1:
+            # Single line rows are the common case, skip the blank lookups
+            return [self.__prefix + self.__border.join(
+                [_justify(_col[0].lstrip(" ")) if _col else _blank
+                 for _col, (_justify, _blank) in zip(columns, self.__cellFormats)]
+            ) + self.__border]
 
+        _lines = []
         # pad other columns to max length
         for _rowIdx in range(0, _maxLen):
-            _line = " " * self.indent
-            for _colIdx in range(0, len(columns)):
-                _col = columns[_colIdx]
-                _justify = self.columnJustify[_colIdx]
-                _colWidth = self.columnWidths[_colIdx]
-                _maxContWidth = _colWidth - (2*self.padding)
-
-                if _rowIdx < len(_col):
-                    _content = _col[_rowIdx].lstrip(" ")
-                else:
-                    _content = " " * _maxContWidth
-
-                _padLeft = 0
-                _padRidge = 0
-                if _justify == "center":
-                    _padLeft = ((_maxContWidth - len(_content)) // 2) + self.padding
-                    _padRight = _padLeft
-
-                elif _justify == "left":
-                    _padLeft = self.padding
-                    _padRight = _maxContWidth - len(_content) + self.padding
-
-                elif _justify == "right":
-                    _padRight = self.padding
-                    _padLeft = _maxContWidth - len(_content) + self.padding
-                else:
-                    _padLeft = 0
-                    _padRidge = 0
-
-                _content = " " * _padLeft + _content + " " * _padRight
-
-                # import pdb; pdb.set_trace()  # breakpoint 4e0ee8d8 //
-                if len(_content) < _colWidth:
-                    _content += " "*(_colWidth - len(_content))
-                _line += _border + _content
-            _line += _border
-            _lines.append(_line)
+            _cells = [_justify(_col[_rowIdx].lstrip(" "))
+                      if _rowIdx < len(_col) else _blank
+                      for _col, (_justify, _blank) in zip(columns, self.__cellFormats)]
+            _lines.append(self.__prefix + self.__border.join(_cells) + self.__border)
         return _lines
 
     def generateHeader(self) -> list:
@@ -161,7 +191,7 @@ class TextTable(object):
 
     def drawHeader(self):
         """ @abstract Generate and draw the table header row """
-        _header = [self.__generateCell(_idx, _val) for _idx, _val in enumerate(self.columnTitles)]
+        self.__prepareRows()
         print("\n".join(self.generateHeader()))
 
     def generateBody(self) -> list:
@@ -175,6 +205,7 @@ class TextTable(object):
 
     def drawBody(self):
         """ @abstract Generate and draw the table body """
+        self.__prepareRows()
         print("\n".join(self.generateBody()))
 
     def generateHR(self) -> list:
@@ -187,20 +218,48 @@ class TextTable(object):
     # """ @abstract Generate and draw the table footer """
     #     print("".join(self.generateFooter()))
 
+    def iterLines(self):
+        """ @abstract Lay out then yield every line of the table, one row at
+                a time.
+            @returns [generator] of str
+        """
+        # The header takes part in the width pass too
+        _header = [self.__generateCell(_idx, _val, True)
+                   for _idx, _val in enumerate(self.columnTitles)]
+        self.__prepareRows()
+        if self.border == "solid":
+            yield self.hr
+        yield from self.generateRow(_header)
+        yield self.hr
+        for _r in self.__table__:
+            yield from self.generateRow(_r)
+        if self.border == "solid":
+            yield self.hr
+
     def generate(self) -> list:
         """ @abstract Generate the entire table
             @returns [list] Rows of string
         """
-        _output = []
-        if self.border == "solid":
-            _output.extend(self.generateHR())
-        _output.extend(self.generateHeader())
-        _output.extend(self.generateHR())
-        _output.extend(self.generateBody())
-        if self.border == "solid":
-            _output.extend(self.generateHR())
-        return _output
+        return list(self.iterLines())
+
+    def write(self, stream=None, chunkLines: int=WRITE_CHUNK_LINES):
+        """ @abstract Generate and write the entire table to `stream`, joining
+                `chunkLines` lines per write call.
+            @params stream [file] Defaults to sys.stdout
+            @params chunkLines [int] Lines per write
+        """
+        stream = stream if stream is not None else sys.stdout
+        _chunk = []
+        for _line in self.iterLines():
+            _chunk.append(_line)
+            if len(_chunk) >= chunkLines:
+                _chunk.append("")
+                stream.write("\n".join(_chunk))
+                _chunk = []
+        if _chunk:
+            _chunk.append("")
+            stream.write("\n".join(_chunk))
 
     def draw(self):
         """ @abstract Generate and draw the entire table """
-        print("\n".join(self.generate()))
+        self.write()
@@ -0,0 +1,180 @@
+import sys
+import threading
+import warnings
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from unittest import TestSuite
+
+from .parallel import (_ChunkSuite, chunkSettings, chunkResult, exportResult,
+                       mergeFinished, splitSuite)
+
+__name__ = "PrettyTextTestRunner.threaded"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class ThreadLocalStream(object):
+    """ @abstract Stand-in for sys.stdout/sys.stderr sending writes to a
+            per-thread target, so tests buffering in different threads do
+            not mix their output. asyncio tasks running concurrently in one
+            thread each get their own target too, held in a context
+            variable. The thread's target is kept apart from it, since
+            IsolatedAsyncioTestCase runs its tests in a context copied when
+            the test was created. Threads without a target write through to
+            the wrapped stream.
+        @params stream [file] Stream to fall back to
+    """
+
+    def __init__(self, stream):
+        self.fallback = stream
+        self._target = ContextVar("target", default=None)
+        self._local = threading.local()
+
+    def redirect(self, target):
+        """ @abstract Send this task's writes to `target`, None to undo """
+        self._target.set(target)
+
+    def redirectThread(self, target):
+        """ @abstract Send this thread's writes to `target`, None to undo """
+        self._local.target = target
+
+    @property
+    def target(self):
+        _target = self._target.get()
+        if _target is None:
+            _target = getattr(self._local, "target", None)
+        return self.fallback if _target is None else _target
+
+    def write(self, text):
+        return self.target.write(text)
+
+    def writelines(self, lines):
+        return self.target.writelines(lines)
+
+    def flush(self):
+        return self.target.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+class _ModuleFixtures(object):
+    """ @abstract setUpModule/tearDownModule bookkeeping shared by the class
+            chunks of a threaded run. A module is set up by the first chunk
+            reaching it and torn down by the last chunk of it to finish.
+        @params chunks [list] Lists of TestCase, one per class
+    """
+
+    def __init__(self, chunks: list):
+        self._remaining = {}
+        for _chunk in chunks:
+            _module = _chunk[0].__class__.__module__
+            self._remaining[_module] = self._remaining.get(_module, 0) + 1
+        self._locks = {_module: threading.Lock() for _module in self._remaining}
+        self._failed = {}  # {module: setUpModule failed}, once set up
+
+    def setUp(self, suite, test, result):
+        _module = test.__class__.__module__
+        with self._locks[_module]:
+            if _module not in self._failed:
+                TestSuite._handleModuleFixture(suite, test, result)
+                self._failed[_module] = result._moduleSetUpFailed
+            else:
+                result._moduleSetUpFailed = self._failed[_module]
+
+    def release(self, suite, test, result):
+        """ @abstract Chunk of `test` finished, tear the module down if it
+                was the last one.
+        """
+        _module = test.__class__.__module__
+        with self._locks[_module]:
+            self._remaining[_module] -= 1
+            if self._remaining[_module] > 0 or _module not in self._failed:
+                return
+            result._previousTestClass = test.__class__
+            result._moduleSetUpFailed = self._failed[_module]
+            TestSuite._handleModuleTearDown(suite, result)
+
+
+class _ThreadChunkSuite(_ChunkSuite):
+    """ @abstract Chunk suite leaving module fixtures to `_ModuleFixtures` """
+
+    def __init__(self, tests, fixtures, stopEvent):
+        super(_ThreadChunkSuite, self).__init__(tests)
+        self.fixtures = fixtures
+        self.stopEvent = stopEvent
+
+    def _handleModuleFixture(self, test, result):
+        if test.__class__.__module__ == self._get_previous_module(result):
+            return
+        self.fixtures.setUp(self, test, result)
+
+    def _handleModuleTearDown(self, result):
+        pass
+
+
+def _runThreadChunk(tests: list, settings: dict, fixtures, stopEvent) -> dict:
+    """ @abstract Thread entry point, run one class chunk in a fresh result.
+            Warning filters and fixture timers are process wide and left to
+            the calling thread.
+        @returns [dict] Exported result state
+    """
+    result = chunkResult(settings)
+    _first = tests[0]
+    if settings["asyncConcurrency"] > 0:
+        from .asyncSuite import groupAsyncClasses
+        tests = list(groupAsyncClasses(tests, settings["asyncConcurrency"]))
+    _suite = _ThreadChunkSuite(tests, fixtures, stopEvent)
+    try:
+        _suite(result)
+    finally:
+        fixtures.release(_suite, _first, result)
+    if result.shouldStop:
+        stopEvent.set()
+    return exportResult(result)
+
+
+def runThreaded(runner, suite, result):
+    """ @abstract Run `suite` in a pool of `runner.threads` threads, one task
+            per test class. Each class fills its own result, merged into
+            `result` from the calling thread in serial order, so tallies,
+            rows, history and writers are only touched by one thread.
+            Timeouts reach a test in a pool thread as an asynchronous
+            exception, raised only once the thread runs Python code again:
+            a test blocked in time.sleep, a socket or a lock overruns until
+            the call returns. A warning says so when timeouts are set.
+        @params runner [PrettyTextTestRunner] Runner holding the settings
+        @params suite [TestSuite|TestCase] Suite to run
+        @params result [PrettyTestResult] Result to merge into
+    """
+    _settings = chunkSettings(runner, result)
+    # Allocations are process wide, they cannot be told apart per thread
+    _settings["memory"] = None
+    _settings["watchdog"] = result.watchdog
+    if result.watchdog is not None:
+        warnings.warn("with `threads`, a timed out test is only interrupted once "
+                      "a blocking call returns, use `workers` to bound blocking "
+                      "tests", RuntimeWarning, stacklevel=2)
+    _chunks = splitSuite(suite)
+    _states = [None] * len(_chunks)
+    _merged = 0
+    _stopEvent = threading.Event()
+    _fixtures = _ModuleFixtures(_chunks)
+
+    _stdout, _stderr = sys.stdout, sys.stderr
+    sys.stdout, sys.stderr = ThreadLocalStream(_stdout), ThreadLocalStream(_stderr)
+    try:
+        with ThreadPoolExecutor(max_workers=runner.threads) as _pool:
+            # Chunks are never cancelled, a stopped chunk still releases its
+            # module fixtures
+            _pending = {_pool.submit(_runThreadChunk, _chunk, _settings,
+                                     _fixtures, _stopEvent): _idx
+                        for _idx, _chunk in enumerate(_chunks)}
+            while _pending:
+                _done, _ = wait(_pending, return_when=FIRST_COMPLETED)
+                for _future in _done:
+                    _states[_pending.pop(_future)] = _future.result()
+                _merged = mergeFinished(result, _states, _merged)
+    finally:
+        sys.stdout, sys.stderr = _stdout, _stderr
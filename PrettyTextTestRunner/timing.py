@@ -0,0 +1,120 @@
+import sys
+import time
+from functools import wraps
+from inspect import iscoroutinefunction
+
+__name__ = "PrettyTextTestRunner.timing"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Test phases timed on each test instance, see `instrumentTest`
+TEST_PHASES = ("setUp", "body", "tearDown")
+
+
+def timed(func, sink: dict, key: str):
+    """ @abstract Wrap `func` so each call adds its perf_counter_ns duration
+            to `sink[key]`. Coroutine functions are timed on await.
+        @params func [callable] Function to time
+        @params sink [dict] Duration totals in nanoseconds
+        @params key [str] Key to add to
+        @returns [callable] Wrapped function
+    """
+    if iscoroutinefunction(func):
+        @wraps(func)
+        async def _timedAsync(*args, **kwargs):
+            _start = time.perf_counter_ns()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                sink[key] = sink.get(key, 0) + time.perf_counter_ns() - _start
+        return _timedAsync
+
+    @wraps(func)
+    def _timed(*args, **kwargs):
+        _start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sink[key] = sink.get(key, 0) + time.perf_counter_ns() - _start
+    return _timed
+
+
+def instrumentTest(test, sink: dict) -> list:
+    """ @abstract Shadow setUp, tearDown and the test method on the instance
+            with timed wrappers.
+        @params test [TestCase] Test about to run
+        @params sink [dict] Receives "setUp", "body" and "tearDown" in ns
+        @returns [list] Attribute names to remove with `restoreTest`
+    """
+    _methodName = getattr(test, "_testMethodName", None)
+    _patched = []
+    for _attr, _phase in (("setUp", "setUp"), (_methodName, "body"),
+                          ("tearDown", "tearDown")):
+        _func = getattr(test, _attr, None) if _attr else None
+        if _func is None or _attr in test.__dict__:
+            continue
+        test.__dict__[_attr] = timed(_func, sink, _phase)
+        _patched.append(_attr)
+    return _patched
+
+
+def restoreTest(test, patched: list):
+    """ @abstract Undo `instrumentTest` """
+    for _attr in patched:
+        test.__dict__.pop(_attr, None)
+
+
+class FixtureTimer(object):
+    """ @abstract Context manager timing setUpClass/tearDownClass and
+            setUpModule/tearDownModule of every class in a suite. The hooks
+            are patched for the duration of the block only.
+        @params tests [iterable] TestCase instances about to run
+        @params fixtureTimes [dict] PrettyTestResult.fixtureTimes to fill
+        @params clsName [callable] Maps a test to its report class name
+    """
+
+    def __init__(self, tests, fixtureTimes: dict, clsName):
+        self.fixtureTimes = fixtureTimes
+        self._targets = {}
+        for _test in tests:
+            _cls = _test.__class__
+            if _cls not in self._targets:
+                self._targets[_cls] = ("class", clsName(_test))
+            _module = sys.modules.get(_cls.__module__)
+            if _module is not None and _module not in self._targets:
+                self._targets[_module] = ("module", _cls.__module__)
+        self._saved = []
+
+    def __enter__(self):
+        _hooks = {"class": ("setUpClass", "tearDownClass"),
+                  "module": ("setUpModule", "tearDownModule")}
+        # Resolve every hook before patching any, a subclass must not pick
+        # up the wrapper installed on its parent
+        _patches = []
+        for _target, (_kind, _name) in self._targets.items():
+            _sink = self.fixtureTimes[_kind].setdefault(
+                _name, {"setUp": 0, "tearDown": 0})
+            for _hook, _phase in zip(_hooks[_kind], ("setUp", "tearDown")):
+                _func = getattr(_target, _hook, None)
+                if _func is not None:
+                    _patches.append((_target, _kind, _hook,
+                                     timed(_func, _sink, _phase)))
+
+        for _target, _kind, _hook, _wrapper in _patches:
+            if _kind == "class":
+                self._saved.append((_target, _hook, _target.__dict__.get(_hook)))
+                setattr(_target, _hook, staticmethod(_wrapper))
+            else:
+                self._saved.append((_target, _hook, getattr(_target, _hook)))
+                setattr(_target, _hook, _wrapper)
+        return self
+
+    def __exit__(self, *exc_info):
+        for _target, _hook, _own in reversed(self._saved):
+            if _own is None:
+                delattr(_target, _hook)
+            else:
+                setattr(_target, _hook, _own)
+        self._saved = []
+        return False
@@ -0,0 +1,248 @@
+import os
+import sys
+import time
+import traceback
+from importlib import import_module, reload
+
+from .discovery import LazyModuleSuite
+from .selection import referencedModules
+
+__name__ = "PrettyTextTestRunner.watch"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+
+class _FirstResult(object):
+    """ @abstract Result writer noting when the first test finished """
+
+    def __init__(self):
+        self.at = None
+
+    def startTestRun(self):
+        pass
+
+    def writeRecord(self, clsName: str, record, statusText: str):
+        if self.at is None:
+            self.at = time.monotonic()
+
+    def stopTestRun(self):
+        pass
+
+
+class Watcher(object):
+    """ @abstract Keep one process with its imports warm and rerun tests as
+            sources change. The tree is polled with one scandir stat per
+            source file, changed modules are reloaded along with every
+            module depending on them, dependencies first, and only the test
+            modules among them are run again.
+        @params runner [PrettyTextTestRunner] Runner writing each report
+        @params index [DiscoveryIndex] Index finding the test modules
+        @params keywords [list] Optional `-k` patterns
+        @params interval [float] Seconds between polls
+        @params clear [bool] Clear the terminal before each report
+        @methods run, scan, cycle
+    """
+
+    def __init__(self, runner, index, keywords: list=None, interval: float=0.5,
+                 clear: bool=True):
+        self.runner = runner
+        self.index = index
+        self.keywords = keywords
+        self.interval = interval
+        _isatty = getattr(runner.stream, "isatty", None)
+        self.clear = clear and bool(_isatty and _isatty())
+        self.root = os.path.realpath(index.topLevelDir)
+        self._snapshot = {}
+        # {path: [module name, ...]} modules dropped by a failed reload, to
+        # import again when the failing file changes
+        self._broken = {}
+        self.result = None
+
+    def _tracked(self, filename: str) -> bool:
+        if not filename:
+            return False
+        _real = os.path.realpath(filename)
+        return _real.startswith(self.root + os.sep) and "site-packages" not in _real
+
+    def scan(self) -> dict:
+        """ @abstract Stat every Python source below the root
+            @returns [dict] {path: (mtime_ns, size)}
+        """
+        _found = {}
+        _dirs = [self.root]
+        while _dirs:
+            try:
+                _entries = os.scandir(_dirs.pop())
+            except OSError:
+                continue
+            with _entries:
+                for _entry in _entries:
+                    if _entry.is_dir(follow_symlinks=False):
+                        if not _entry.name.startswith(".") \
+                                and _entry.name not in ("__pycache__", "site-packages"):
+                            _dirs.append(_entry.path)
+                    elif _entry.name.endswith(".py"):
+                        try:
+                            _stat = _entry.stat()
+                        except OSError:
+                            continue
+                        _found[_entry.path] = (_stat.st_mtime_ns, _stat.st_size)
+        return _found
+
+    def _changes(self) -> set:
+        _snapshot = self.scan()
+        _changed = {_path for _path, _stat in _snapshot.items()
+                    if self._snapshot.get(_path) != _stat}
+        _changed |= set(self._snapshot) - set(_snapshot)
+        self._snapshot = _snapshot
+        return _changed
+
+    def _trackedModules(self) -> dict:
+        """ @abstract {module name: module} of imported modules below the root """
+        return {_name: _module for _name, _module in list(sys.modules.items())
+                if _module is not None and self._tracked(getattr(_module, "__file__", None))}
+
+    def affected(self, changed: set) -> list:
+        """ @abstract Imported modules of the changed files and every module
+                depending on them, in reload order.
+            @params changed [set] Changed file paths
+            @returns [list] Module names, dependencies first
+        """
+        _modules = self._trackedModules()
+        _byFile = {os.path.realpath(_module.__file__): _name
+                   for _name, _module in _modules.items()}
+        # A package holds its submodules as attributes whether it uses them
+        # or not, only submodules depending on their package are followed
+        _deps = {_name: {_dep for _dep in referencedModules(_module)
+                                 + [_name.rpartition(".")[0]]
+                         if _dep in _modules and _dep != _name
+                         and not _dep.startswith(_name + ".")}
+                 for _name, _module in _modules.items()}
+        _dependents = {}
+        for _name, _names in _deps.items():
+            for _dep in _names:
+                _dependents.setdefault(_dep, set()).add(_name)
+
+        _affected = set()
+        _stack = []
+        for _path in map(os.path.realpath, changed):
+            if _path in _byFile:
+                _stack.append(_byFile[_path])
+            _stack.extend(self._broken.pop(_path, ()))
+        while _stack:
+            _name = _stack.pop()
+            if _name not in _affected:
+                _affected.add(_name)
+                _stack.extend(_dependents.get(_name, ()))
+
+        _order = []
+        _visited = set()
+
+        def _visit(name):
+            _visited.add(name)
+            for _dep in sorted(_deps.get(name, set()) & _affected):
+                if _dep not in _visited:
+                    _visit(_dep)
+            _order.append(name)
+
+        for _name in sorted(_affected):
+            if _name not in _visited:
+                _visit(_name)
+        return _order
+
+    def _reload(self, names: list) -> list:
+        """ @abstract Reload `names` in order, importing the ones a failed
+                reload dropped. A module failing to reload is dropped from
+                sys.modules and its package, so the modules importing it fail
+                too and test modules report the error as a failing test.
+            @returns [list] Names which failed to reload
+        """
+        _failed = []
+        for _idx, _name in enumerate(names):
+            _module = sys.modules.get(_name)
+            try:
+                if _module is None:
+                    _module = import_module(_name)
+                else:
+                    reload(_module)
+            except Exception:
+                _failed.append(_name)
+                sys.modules.pop(_name, None)
+                _parent, _, _child = _name.rpartition(".")
+                if _parent in sys.modules:
+                    vars(sys.modules[_parent]).pop(_child, None)
+                _file = getattr(_module, "__file__", None)
+                if _file:
+                    self._broken.setdefault(os.path.realpath(_file), []).extend(
+                        names[_idx:])
+                self.runner.stream.write("Reloading {} failed: {}".format(
+                    _name, "".join(traceback.format_exception_only(*sys.exc_info()[:2]))))
+        return _failed
+
+    def _run(self, suite, started: float) -> float:
+        """ @abstract Run `suite` with a fresh report
+            @returns [float] Seconds from `started` to the first result
+        """
+        if self.clear:
+            self.runner.stream.write(CLEAR_SCREEN)
+        _probe = _FirstResult()
+        self.runner.writers.append(_probe)
+        try:
+            self.result = self.runner.run(suite)
+        finally:
+            self.runner.writers.remove(_probe)
+        return _probe.at - started if _probe.at is not None else None
+
+    def cycle(self, changed: set):
+        """ @abstract Reload and rerun what `changed` files affect
+            @params changed [set] Changed file paths
+        """
+        _started = time.monotonic()
+        _reloaded = self.affected(changed)
+        self._reload(_reloaded)
+        _affected = set(_reloaded)
+        _changed = {os.path.realpath(_path) for _path in changed}
+        _run = [_name for _name, _path in self.index.findModules()
+                if _name in _affected or os.path.realpath(_path) in _changed]
+        if not _run:
+            self.runner.stream.write("No tests affected by {}\n".format(
+                ", ".join(sorted(os.path.relpath(_path, self.root) for _path in changed))))
+            self.runner.stream.flush()
+            return
+        _suite = self.index.loader.suiteClass(
+            [LazyModuleSuite(_name, self.index.loader, self.keywords) for _name in _run])
+        _first = self._run(_suite, _started)
+        self.runner.stream.write(
+            "watch: {} module(s) reloaded, {} test module(s) rerun, first result "
+            "after {}, cycle {}s\n".format(
+                len(_reloaded), len(_run),
+                "{}ms".format(round(_first * 1000, 1)) if _first is not None else "-",
+                round(time.monotonic() - _started, 3)))
+        self.runner.stream.flush()
+        # Keep the index current for the next cold start
+        self.index.refresh()
+        self.index.save()
+
+    def run(self) -> int:
+        """ @abstract Run everything once, then watch until interrupted
+            @returns [int] Exit code of the last run
+        """
+        _started = time.monotonic()
+        self._snapshot = self.scan()
+        self._run(self.index.suite(self.keywords), _started)
+        try:
+            while True:
+                time.sleep(self.interval)
+                _changed = self._changes()
+                if not _changed:
+                    continue
+                # Let editors finish writing before reloading
+                time.sleep(min(self.interval, 0.1))
+                _changed |= self._changes()
+                self.cycle(_changed)
+        except KeyboardInterrupt:
+            pass
+        return 0 if self.result is not None and self.result.wasSuccessful() else 1
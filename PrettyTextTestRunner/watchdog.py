@@ -0,0 +1,165 @@
+import faulthandler
+import signal
+import tempfile
+import threading
+import time
+
+__name__ = "PrettyTextTestRunner.watchdog"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class TestTimeout(BaseException):
+    """ @abstract Raised into a test which overran its timeout. Derived from
+            BaseException so `except Exception` in the test does not swallow
+            it, unittest still reports it as an error.
+    """
+
+
+def dumpStacks() -> str:
+    """ @abstract Stacks of every thread, as written by faulthandler """
+    with tempfile.TemporaryFile("w+") as _fh:
+        faulthandler.dump_traceback(_fh, all_threads=True)
+        _fh.seek(0)
+        return _fh.read()
+
+
+def _raiseTimeout(*args, **kwargs):
+    raise TestTimeout()
+
+
+class _Deadline(object):
+    __slots__ = ("at", "kind", "limit", "stacks", "fired")
+
+    def __init__(self, at: float, kind: str, limit: float):
+        self.at = at
+        self.kind = kind
+        self.limit = limit
+        self.stacks = None
+        self.fired = False
+
+
+class Watchdog(object):
+    """ @abstract Enforce per-test and per-class timeouts for the tests
+            running in any thread. A background thread waits for the
+            earliest deadline, dumps every thread's stack and interrupts the
+            overrunning test: with SIGALRM in the main thread, which also
+            breaks blocking calls, and with an asynchronous exception in
+            other threads, delivered once the thread runs Python code again.
+        @params testTimeout [float] Seconds a single test may run, None for
+            no limit
+        @params classTimeout [float] Seconds the tests of a class may run
+            together, counted from its first test. Tests starting after it
+            ran out are not run.
+        @methods start, expired, stop, close
+    """
+
+    def __init__(self, testTimeout: float=None, classTimeout: float=None):
+        self.testTimeout = testTimeout
+        self.classTimeout = classTimeout
+        self._deadlines = {}  # {thread ident: _Deadline}
+        self._classStarts = {}  # {clsName: monotonic start}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._mainIdent = threading.main_thread().ident
+        # SIGALRM can only be handled when installed from the main thread
+        self._alarm = hasattr(signal, "pthread_kill") \
+            and threading.current_thread() is threading.main_thread()
+        if self._alarm:
+            self._oldHandler = signal.signal(signal.SIGALRM, self._onAlarm)
+        self._thread = threading.Thread(target=self._watch, name="PrettyTestWatchdog",
+                                        daemon=True)
+        self._thread.start()
+
+    def _onAlarm(self, signum, frame):
+        _deadline = self._deadlines.get(self._mainIdent)
+        if _deadline is not None and _deadline.fired:
+            raise TestTimeout()
+
+    def start(self, test, clsName: str):
+        """ @abstract Arm the watchdog for `test`, about to run in this thread """
+        _now = time.monotonic()
+        _deadline = None
+        if self.testTimeout is not None:
+            _deadline = _Deadline(_now + self.testTimeout, "test", self.testTimeout)
+        if self.classTimeout is not None:
+            _at = self._classStarts.setdefault(clsName, _now) + self.classTimeout
+            if _at <= _now:
+                # The class ran out, fail the test in setUp without running it
+                _deadline = _Deadline(_at, "class", self.classTimeout)
+                _deadline.fired = True
+                test.__dict__["setUp"] = _raiseTimeout
+            elif _deadline is None or _at < _deadline.at:
+                _deadline = _Deadline(_at, "class", self.classTimeout)
+        if _deadline is None:
+            return
+        with self._cond:
+            self._deadlines[threading.get_ident()] = _deadline
+            self._cond.notify()
+
+    def expired(self, err: tuple) -> tuple:
+        """ @abstract Tell whether `err` is this thread's test timing out
+            @params err [tuple] sys.exc_info() style error
+            @returns [tuple] (kind, limit, stacks), kind being "test" or
+                "class" and stacks None when the test did not get to run,
+                None for other errors
+        """
+        _deadline = self._deadlines.get(threading.get_ident())
+        if _deadline is None or not _deadline.fired \
+                or not issubclass(err[0], TestTimeout):
+            return None
+        return _deadline.kind, _deadline.limit, _deadline.stacks
+
+    def stop(self, test):
+        """ @abstract Disarm the watchdog for the test of this thread. An
+                interrupt sent for the test but not delivered yet is dropped,
+                so it cannot land in the teardown or the next test.
+        """
+        _ident = threading.get_ident()
+        with self._cond:
+            # `_interrupt` runs under the same lock, none is sent after this
+            _deadline = self._deadlines.pop(_ident, None)
+            if _deadline is not None and _deadline.fired \
+                    and not (_ident == self._mainIdent and self._alarm):
+                # A pending SIGALRM finds no fired deadline and is ignored
+                import ctypes
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(_ident), None)
+        if test.__dict__.get("setUp") is _raiseTimeout:
+            del test.__dict__["setUp"]
+
+    def _watch(self):
+        with self._cond:
+            while not self._closed:
+                _now = time.monotonic()
+                _next = None
+                for _ident, _deadline in list(self._deadlines.items()):
+                    if _deadline.fired:
+                        continue
+                    if _deadline.at <= _now:
+                        _deadline.stacks = dumpStacks()
+                        _deadline.fired = True
+                        self._interrupt(_ident)
+                    elif _next is None or _deadline.at < _next:
+                        _next = _deadline.at
+                self._cond.wait(None if _next is None else _next - _now)
+
+    def _interrupt(self, ident: int):
+        # Called with `_cond` held, see `stop`
+        if ident == self._mainIdent and self._alarm:
+            signal.pthread_kill(ident, signal.SIGALRM)
+            return
+        import ctypes
+        ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(ident),
+                                                   ctypes.py_object(TestTimeout))
+
+    def close(self):
+        """ @abstract Stop the watchdog thread and restore SIGALRM """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        if self._alarm:
+            signal.signal(signal.SIGALRM, self._oldHandler
+                          if self._oldHandler is not None else signal.SIG_DFL)
+            self._alarm = False
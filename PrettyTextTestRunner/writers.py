@@ -0,0 +1,208 @@
+import gzip
+import json
+import os
+import platform
+import re
+import sys
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+__name__ = "PrettyTextTestRunner.writers"
+__module__ = "PrettyTextTestRunner"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Characters XML 1.0 does not allow, even escaped
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# Bytes buffered by the file object before a write reaches the OS
+WRITE_BUFFER = 1 << 16
+
+
+class ResultWriter(object):
+    """ @abstract Base class of machine readable result writers. Records are
+            handed over one at a time as each test finishes, nothing is
+            re-read from `PrettyTestResult.results`.
+        @params path [str] Output file
+        @methods startTestRun, writeRecord, stopTestRun
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = None
+
+    def startTestRun(self):
+        self._fh = open(self.path, "w", encoding="utf-8", buffering=WRITE_BUFFER)
+
+    def writeRecord(self, clsName: str, record, statusText: str):
+        """ @abstract Write one finished test
+            @params clsName [str] Class name as given by `testClsName`
+            @params record [TestRecord] Finished record
+            @params statusText [str] Readable status, see `PrettyTestResult.STATUS`
+        """
+        raise NotImplementedError()
+
+    def stopTestRun(self):
+        """ @abstract Flush and fsync once, at the end of the run """
+        if self._fh is None:
+            return
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+        self._fh = None
+
+
+class JSONLinesWriter(ResultWriter):
+    """ @abstract Write one JSON object per test, one per line """
+
+    def writeRecord(self, clsName: str, record, statusText: str):
+        _line = {
+            "id": record.testId,
+            "class": clsName,
+            "name": record.name,
+            "status": statusText,
+            "duration": record.duration,
+        }
+        if record.setUpNs is not None:
+            _line.update({"setUpNs": record.setUpNs, "bodyNs": record.bodyNs,
+                          "tearDownNs": record.tearDownNs})
+        if record.retainedBytes is not None:
+            _line.update({"peakBytes": record.peakBytes,
+                          "retainedBytes": record.retainedBytes})
+        if record.subTests is not None:
+            _line["subTests"] = record.subTests.counts
+        if record.output:
+            _line["output"] = str(record.output)
+        self._fh.write(json.dumps(_line))
+        self._fh.write("\n")
+
+
+class ResultFileWriter(ResultWriter):
+    """ @abstract Write the compact result file `merge` reads back: a header
+            object, one JSON array per test in `FIELDS` order, and a footer
+            object with the runtime and the wall clock span of the run.
+            Paths ending in ".gz" are compressed.
+        @props runtime [float] Runtime for the footer in seconds, None for
+            the time since `startTestRun`
+        @props span [tuple] (started, finished) wall clock times for the
+            footer, None for the times of this run
+    """
+    FORMAT = "PrettyTextTestRunner results"
+    VERSION = 1
+    FIELDS = ("testId", "clsName", "name", "status", "durationNs", "setUpNs",
+              "bodyNs", "tearDownNs", "peakBytes", "retainedBytes", "group",
+              "traceback", "output", "subTests")
+
+    def __init__(self, path: str):
+        super(ResultFileWriter, self).__init__(path)
+        self.runtime = None
+        self.span = None
+
+    def startTestRun(self):
+        if self.path.endswith(".gz"):
+            self._fh = gzip.open(self.path, "wt", encoding="utf-8")
+        else:
+            super(ResultFileWriter, self).startTestRun()
+        self._started = time.time()
+        self._count = 0
+        self._write({"format": self.FORMAT, "version": self.VERSION,
+                     "fields": self.FIELDS, "started": self._started,
+                     "host": platform.node(), "python": sys.version.split()[0]})
+
+    def _write(self, value):
+        self._fh.write(json.dumps(value, separators=(",", ":")))
+        self._fh.write("\n")
+
+    def writeRecord(self, clsName: str, record, statusText: str):
+        _duration = record.stop - record.start \
+            if record.start is not None and record.stop is not None else None
+        # Failures keep the traceback apart from the captured output
+        _traceback = getattr(record.output, "tracebackText", None)
+        _output = getattr(record.output, "extra", None) if _traceback is not None \
+            else record.output
+        self._write([record.testId, clsName, record.name, record.status, _duration,
+                     record.setUpNs, record.bodyNs, record.tearDownNs,
+                     record.peakBytes, record.retainedBytes, record.group,
+                     _traceback, str(_output) if _output else None,
+                     record.subTests.export() if record.subTests is not None else None])
+        self._count += 1
+
+    def stopTestRun(self):
+        if self._fh is not None:
+            _finished = time.time()
+            _runtime = self.runtime if self.runtime is not None \
+                else _finished - self._started
+            _started, _finished = self.span or (self._started, _finished)
+            self._write({"runtime": _runtime, "tests": self._count,
+                         "started": _started, "finished": _finished})
+        super(ResultFileWriter, self).stopTestRun()
+
+
+class JUnitXMLWriter(ResultWriter):
+    """ @abstract Write JUnit XML, one <testsuite> per class. Only the
+            testcases of the class in progress are held, each suite is
+            written out as soon as the next class starts.
+    """
+
+    def __init__(self, path: str, name: str="PrettyTextTestRunner"):
+        super(JUnitXMLWriter, self).__init__(path)
+        self.name = name
+        self._clsName = None
+        self._cases = []
+        self._counts = {}
+
+    def startTestRun(self):
+        super(JUnitXMLWriter, self).startTestRun()
+        self._fh.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self._fh.write("<testsuites name={}>\n".format(quoteattr(self.name)))
+
+    def _flushSuite(self):
+        if self._clsName is None:
+            return
+        self._fh.write('  <testsuite name={} tests="{}" failures="{}" errors="{}" '
+                       'skipped="{}" time="{:.3f}">\n'.format(
+                           quoteattr(self._clsName), len(self._cases),
+                           self._counts["failures"], self._counts["errors"],
+                           self._counts["skipped"], self._counts["time"]))
+        self._fh.writelines(self._cases)
+        self._fh.write("  </testsuite>\n")
+        self._clsName = None
+        self._cases = []
+
+    def writeRecord(self, clsName: str, record, statusText: str):
+        if clsName != self._clsName:
+            self._flushSuite()
+            self._clsName = clsName
+            self._counts = {"failures": 0, "errors": 0, "skipped": 0, "time": 0.0}
+
+        _duration = record.duration or 0.0
+        self._counts["time"] += _duration
+        _output = _XML_ILLEGAL.sub("", str(record.output or ""))
+        _message = _output.strip().splitlines()[-1] if _output.strip() else statusText
+
+        _body = ""
+        if record.status == "F" or record.status == "?":
+            self._counts["failures"] += 1
+            _body = "<failure message={}>{}</failure>".format(
+                quoteattr(_message), escape(_output))
+        elif record.status == "E" or record.status == "T":
+            if record.status == "T":
+                # The stacks follow the first line
+                _message = _output.splitlines()[0]
+            self._counts["errors"] += 1
+            _body = "<error message={}>{}</error>".format(
+                quoteattr(_message), escape(_output))
+        elif record.status == "S" or record.status == "C":
+            self._counts["skipped"] += 1
+            _body = "<skipped message={}/>".format(quoteattr(_message))
+        elif _output:
+            _body = "<system-out>{}</system-out>".format(escape(_output))
+
+        self._cases.append('    <testcase classname={} name={} time="{:.3f}">{}</testcase>\n'.format(
+            quoteattr(clsName), quoteattr(record.name), _duration, _body))
+
+    def stopTestRun(self):
+        if self._fh is not None:
+            self._flushSuite()
+            self._fh.write("</testsuites>\n")
+        super(JUnitXMLWriter, self).stopTestRun()
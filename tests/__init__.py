@@ -0,0 +1,33 @@
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from PrettyTextTestRunner import PrettyTextTestRunner
+
+__name__ = "tests"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+def loadCases(*classes) -> unittest.TestSuite:
+    """ @abstract Suite of the tests of `classes`, in loader order """
+    _loader = unittest.TestLoader()
+    return unittest.TestSuite([_loader.loadTestsFromTestCase(_cls) for _cls in classes])
+
+
+def runReport(suite, **props) -> tuple:
+    """ @abstract Run `suite` with a runner writing into a string, timing
+            off so reports of different runs compare equal. Full reports are
+            printed, stdout is captured too
+        @params suite [TestSuite] Tests to run
+        @params props [dict] Runner attributes to set, e.g. workers=2
+        @returns [tuple] (report text, PrettyTestResult)
+    """
+    _stream = StringIO()
+    runner = PrettyTextTestRunner(stream=_stream)
+    runner.timing = False
+    for _name, _value in props.items():
+        setattr(runner, _name, _value)
+    with redirect_stdout(_stream):
+        result = runner.run(suite)
+    return _stream.getvalue(), result
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import time
+import unittest
+
+__name__ = "tests.sampleCases"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class AsyncSweep(unittest.IsolatedAsyncioTestCase):
+    concurrentAsync = True
+
+    async def test_sweep(self):
+        for _i in range(4):
+            with self.subTest(i=_i):
+                await asyncio.sleep(0.01)
+                self.assertLess(_i, 2)
+
+    async def test_plain(self):
+        print("output-from-plain")
+        await asyncio.sleep(0.02)
+
+
+class Mixed(unittest.TestCase):
+
+    def test_passes(self):
+        pass
+
+    def test_fails(self):
+        self.assertEqual(1, 2)
+
+    def test_errors(self):
+        raise RuntimeError("boom")
+
+    @unittest.skip("not here")
+    def test_skipped(self):
+        pass
+
+
+class Passing(unittest.TestCase):
+
+    def test_one(self):
+        pass
+
+    def test_two(self):
+        pass
+
+
+class Stubborn(unittest.TestCase):
+
+    def test_hangs(self):
+        # Swallows the watchdog's timeout, only killing the worker ends it
+        _end = time.monotonic() + 30
+        while time.monotonic() < _end:
+            try:
+                time.sleep(0.05)
+            except BaseException:
+                pass
+
+
+class Crashing(unittest.TestCase):
+
+    def test_exits(self):
+        os._exit(3)
@@ -0,0 +1,18 @@
+import unittest
+
+from . import loadCases, runReport
+from . import sampleCases
+
+__name__ = "tests.test_asyncSuite"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class ConcurrentAsyncSuiteTest(unittest.TestCase):
+
+    def test_matchesSerialReport(self):
+        _serial, _ = runReport(loadCases(sampleCases.AsyncSweep))
+        _concurrent, result = runReport(loadCases(sampleCases.AsyncSweep), asyncConcurrency=4)
+        self.assertEqual(_serial, _concurrent)
+        self.assertEqual(result.getSubTestTally(), ["4", "2"])
+        self.assertIn("output-from-plain", _concurrent)
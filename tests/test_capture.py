@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from PrettyTextTestRunner.capture import BoundedCapture
+
+__name__ = "tests.test_capture"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class BoundedCaptureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.capture = BoundedCapture(limit=100, directory=self.directory,
+                                      headLines=3, tailLines=3)
+
+    def tearDown(self):
+        self.capture.close()
+        shutil.rmtree(self.directory)
+
+    def test_underLimitStaysInMemory(self):
+        self.capture.write("hello\n")
+        self.assertFalse(self.capture.spilled)
+        self.assertEqual(self.capture.getvalue(), "hello\n")
+
+    def test_spillKeepsHeadAndTailLines(self):
+        for _idx in range(50):
+            self.capture.write("line {}\n".format(_idx))
+        _value = self.capture.getvalue()
+        self.assertTrue(self.capture.spilled)
+        self.assertTrue(_value.startswith("line 0\nline 1\nline 2\n... "))
+        self.assertTrue(_value.endswith("line 47\nline 48\nline 49\n"))
+        with open(self.capture.spillPath) as _fh:
+            self.assertEqual(len(_fh.read().splitlines()), 50)
+
+    def test_largeWritesAreBoundedInMemory(self):
+        self.capture.write("x" * 10 ** 6)
+        self.capture.write("y" * 10 ** 6)
+        self.assertLessEqual(len(self.capture._head), self.capture._headChars)
+        self.assertLessEqual(len(self.capture._tail), self.capture._tailChars)
+        self.assertLess(len(self.capture.getvalue()), 2 * 10 ** 4)
+        self.assertEqual(os.path.getsize(self.capture.spillPath), 2 * 10 ** 6)
+
+    def test_truncateStartsOver(self):
+        self.capture.write("z" * 500)
+        _path = self.capture.spillPath
+        self.capture.truncate()
+        self.capture.write("next\n")
+        self.assertEqual(self.capture.getvalue(), "next\n")
+        self.assertTrue(os.path.exists(_path))
@@ -0,0 +1,34 @@
+import time
+import unittest
+from unittest import mock
+
+from PrettyTextTestRunner import parallel
+
+from . import loadCases, runReport
+from . import sampleCases
+
+__name__ = "tests.test_distributed"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class CoordinatorTest(unittest.TestCase):
+
+    def test_matchesSerialTally(self):
+        _classes = (sampleCases.Mixed, sampleCases.Passing, sampleCases.Mixed)
+        _, _serial = runReport(loadCases(*_classes))
+        _, result = runReport(loadCases(*_classes), coordinator="127.0.0.1:0",
+                              localWorkers=2)
+        self.assertEqual(result.getResultTally(), _serial.getResultTally())
+        self.assertEqual(result.testsRun, _serial.testsRun)
+        self.assertFalse(result.wasSuccessful())
+
+    def test_hungWorkerIsDropped(self):
+        _started = time.monotonic()
+        with mock.patch.object(parallel, "KILL_GRACE", 0.5):
+            _, result = runReport(loadCases(sampleCases.Stubborn, sampleCases.Passing),
+                                  coordinator="127.0.0.1:0", localWorkers=1,
+                                  testTimeout=0.5)
+        self.assertLess(time.monotonic() - _started, 15)
+        self.assertEqual(result.getTimeoutTally(), ["1"])
+        self.assertEqual(result.getResultTally()[1], "2")
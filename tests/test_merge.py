@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from PrettyTextTestRunner import PrettyTextTestRunner
+from PrettyTextTestRunner.merge import mergeResultFiles
+from PrettyTextTestRunner.writers import ResultFileWriter
+
+from . import loadCases, runReport
+from . import sampleCases
+
+__name__ = "tests.test_merge"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class MergeRoundTripTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+
+    def _write(self, name: str, cls) -> str:
+        _path = os.path.join(self.dir.name, name)
+        runReport(loadCases(cls), writers=[ResultFileWriter(_path)])
+        return _path
+
+    def _merge(self, paths: list):
+        _stream = StringIO()
+        runner = PrettyTextTestRunner(stream=_stream)
+        runner.timing = False
+        with redirect_stdout(_stream):
+            return mergeResultFiles(paths, runner)
+
+    def test_keepsTallyAndOutcome(self):
+        _paths = [self._write("mixed.json", sampleCases.Mixed),
+                  self._write("passing.json.gz", sampleCases.Passing)]
+        result = self._merge(_paths)
+        self.assertEqual(result.testsRun, 6)
+        self.assertEqual(result.getResultTally(), ["6", "3", "1", "1", "1", "0", "0"])
+        self.assertEqual(len(result.failures), 1)
+        self.assertEqual(len(result.errors), 1)
+        self.assertEqual(len(result.skipped), 1)
+        self.assertFalse(result.wasSuccessful())
+        self.assertTrue(self._merge(_paths[1:]).wasSuccessful())
+
+    def test_runtimeIsWallClockSpan(self):
+        _paths = []
+        for _idx, (_start, _end) in enumerate([(100.0, 110.0), (102.0, 111.0)]):
+            _path = self._write("part{}.json".format(_idx), sampleCases.Passing)
+            with open(_path) as _fh:
+                _lines = _fh.read().splitlines()
+            _lines[-1] = json.dumps({"runtime": _end - _start, "tests": 2,
+                                     "started": _start, "finished": _end})
+            with open(_path, "w") as _fh:
+                _fh.write("\n".join(_lines) + "\n")
+            _paths.append(_path)
+        _combined = os.path.join(self.dir.name, "combined.json")
+        _stream = StringIO()
+        runner = PrettyTextTestRunner(stream=_stream)
+        runner.writers = [ResultFileWriter(_combined)]
+        with redirect_stdout(_stream):
+            mergeResultFiles(_paths, runner)
+        with open(_combined) as _fh:
+            _footer = json.loads(_fh.read().splitlines()[-1])
+        self.assertEqual(_footer["runtime"], 11.0)
+        self.assertEqual((_footer["started"], _footer["finished"]), (100.0, 111.0))
@@ -0,0 +1,41 @@
+import time
+import unittest
+from unittest import mock
+
+from PrettyTextTestRunner import parallel
+
+from . import loadCases, runReport
+from . import sampleCases
+
+__name__ = "tests.test_parallel"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class ParallelRunTest(unittest.TestCase):
+    classes = (sampleCases.Mixed, sampleCases.Passing, sampleCases.AsyncSweep)
+
+    def test_matchesSerialReport(self):
+        _serial, _expected = runReport(loadCases(*self.classes))
+        for _props in ({"workers": 2}, {"threads": 2}):
+            with self.subTest(**_props):
+                _text, result = runReport(loadCases(*self.classes), **_props)
+                self.assertEqual(_text, _serial)
+                self.assertEqual(result.getResultTally(), _expected.getResultTally())
+                self.assertEqual(result.getSubTestTally(), _expected.getSubTestTally())
+
+    def test_blamesCrashedWorker(self):
+        _, result = runReport(loadCases(sampleCases.Crashing, *self.classes), workers=2)
+        _tally = result.tally["tests.sampleCases"]
+        self.assertEqual(len(result.errors), 2)
+        self.assertIn("Worker died", str(result.errors[0][1]))
+        self.assertEqual(_tally["success"], 4)
+
+    def test_killsHungWorker(self):
+        _started = time.monotonic()
+        with mock.patch.object(parallel, "KILL_GRACE", 0.5):
+            _, result = runReport(loadCases(sampleCases.Stubborn, sampleCases.Passing),
+                                  workers=2, testTimeout=0.5)
+        self.assertLess(time.monotonic() - _started, 15)
+        self.assertEqual(result.getTimeoutTally(), ["1"])
+        self.assertEqual(result.getResultTally()[1], "2")
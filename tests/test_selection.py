@@ -0,0 +1,85 @@
+import importlib
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from PrettyTextTestRunner.selection import FingerprintCache
+
+__name__ = "tests.test_selection"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+_FILES = {
+    "fpkg/__init__.py": "",
+    "fpkg/lib_one.py": "def one():\n    return 1\n",
+    "fpkg/lib_two.py": "def two():\n    return 2\n",
+    "fcase_one.py": "import unittest\nfrom fpkg.lib_one import one\n\n"
+                    "class One(unittest.TestCase):\n"
+                    "    def test_it(self):\n        self.assertEqual(one(), 1)\n",
+    "fcase_two.py": "import unittest\nimport fpkg.lib_two\n\n"
+                    "class Two(unittest.TestCase):\n"
+                    "    def test_it(self):\n        self.assertEqual(fpkg.lib_two.two(), 2)\n",
+}
+
+
+class FingerprintCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for _path, _text in _FILES.items():
+            os.makedirs(os.path.join(self.root, os.path.dirname(_path)), exist_ok=True)
+            with open(os.path.join(self.root, _path), "w") as _fh:
+                _fh.write(_text)
+        sys.path.insert(0, self.root)
+        self.one = importlib.import_module("fcase_one").One
+        self.two = importlib.import_module("fcase_two").Two
+        self.cachePath = os.path.join(self.root, "fp.json")
+
+    def tearDown(self):
+        sys.path.remove(self.root)
+        for _name in ("fcase_one", "fcase_two", "fpkg", "fpkg.lib_one", "fpkg.lib_two"):
+            sys.modules.pop(_name, None)
+        shutil.rmtree(self.root)
+
+    def _record(self):
+        _cache = FingerprintCache(self.cachePath, self.root)
+        _cache.update({"one": {self.one}, "two": {self.two}}, {"one": True, "two": True})
+        _cache.save()
+
+    def _fresh(self) -> dict:
+        _cache = FingerprintCache(self.cachePath, self.root)
+        return {_name: _cache.isFresh(_name) for _name in ("one", "two")}
+
+    def _edit(self, path: str):
+        with open(os.path.join(self.root, path), "a") as _fh:
+            _fh.write("# edited\n")
+
+    def test_unchangedClassesAreFresh(self):
+        self._record()
+        self.assertEqual(self._fresh(), {"one": True, "two": True})
+
+    def test_siblingSubmoduleIsNotADependency(self):
+        self._record()
+        self._edit("fpkg/lib_two.py")
+        self.assertEqual(self._fresh(), {"one": True, "two": False})
+
+    def test_packageInitInvalidatesItsSubmodules(self):
+        self._record()
+        self._edit("fpkg/__init__.py")
+        self.assertEqual(self._fresh(), {"one": False, "two": False})
+
+    def test_touchWithoutChangeStaysFresh(self):
+        self._record()
+        _path = os.path.join(self.root, "fpkg", "lib_one.py")
+        _stat = os.stat(_path)
+        os.utime(_path, ns=(_stat.st_atime_ns, _stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self._fresh(), {"one": True, "two": True})
+
+    def test_sharedNameUnitesDependencies(self):
+        _cache = FingerprintCache(self.cachePath, self.root)
+        _cache.update({"both": {self.one, self.two}}, {"both": True})
+        _deps = {os.path.basename(_path) for _path in _cache.classes["both"]["deps"]}
+        self.assertEqual(_deps, {"__init__.py", "lib_one.py", "lib_two.py",
+                                 "fcase_one.py", "fcase_two.py"})
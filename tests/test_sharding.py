@@ -0,0 +1,68 @@
+import unittest
+
+from PrettyTextTestRunner.parallel import iterTests
+from PrettyTextTestRunner.sharding import assignShards, classKey, classWeights, shardSuite
+
+__name__ = "tests.test_sharding"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+def _nestedClass(module: str, name: str, count: int) -> type:
+    """ @abstract TestCase class as if defined in a nested package module """
+    _methods = {"test_{}".format(_idx): lambda self: None for _idx in range(count)}
+    _cls = type(name, (unittest.TestCase,), _methods)
+    _cls.__module__ = module
+    _cls.__qualname__ = name
+    return _cls
+
+
+class ShardSuiteTest(unittest.TestCase):
+
+    def setUp(self):
+        # Report class names of these all collapse to "tests.unit"
+        self.classes = [_nestedClass("tests.unit.test_{}".format(_name.lower()), _name, _count)
+                        for _name, _count in (("A", 4), ("B", 3), ("C", 2), ("D", 1))]
+        _loader = unittest.TestLoader()
+        self.suite = unittest.TestSuite([_loader.loadTestsFromTestCase(_cls)
+                                         for _cls in self.classes])
+
+    def _shards(self, total: int, durations: dict=None) -> list:
+        return [[_test.id() for _test in iterTests(shardSuite(self.suite, _idx, total,
+                                                                durations))]
+                for _idx in range(total)]
+
+    def test_nestedPackageClassesAreSeparateUnits(self):
+        _shards = self._shards(2)
+        self.assertEqual(sorted(len(_shard) for _shard in _shards), [5, 5])
+
+    def test_everyTestRunsExactlyOnce(self):
+        for _total in (1, 2, 3, 4, 7):
+            _ids = [_id for _shard in self._shards(_total) for _id in _shard]
+            self.assertEqual(sorted(_ids), sorted(_test.id() for _test in iterTests(self.suite)))
+
+    def test_classesStayTogether(self):
+        _classes = [{_id.rpartition(".")[0] for _id in _shard} for _shard in self._shards(3)]
+        self.assertEqual(sum(map(len, _classes)), len(set().union(*_classes)))
+
+    def test_durationsBalanceByTime(self):
+        _durations = {_test.id(): 10.0 if classKey(_test).endswith(".D") else 1.0
+                      for _test in iterTests(self.suite)}
+        _shards = self._shards(2, _durations)
+        _slow = [_shard for _shard in _shards
+                 if any(".D." in _id for _id in _shard)][0]
+        self.assertEqual(len(_slow), 1)
+
+    def test_invalidShard(self):
+        with self.assertRaises(ValueError):
+            shardSuite(self.suite, 2, 2)
+
+    def test_assignShardsIsDeterministic(self):
+        _weights = {"x": 1, "y": 1, "z": 1, "w": 1}
+        self.assertEqual(assignShards(_weights, 2), assignShards(dict(reversed(
+            list(_weights.items()))), 2))
+
+    def test_unknownDurationsUseTheKnownMean(self):
+        _classes = {"a": [self.classes[0]("test_0")], "b": [self.classes[1]("test_0")]}
+        _weights = classWeights(_classes, {self.classes[0]("test_0").id(): 4.0})
+        self.assertEqual(_weights, {"a": 4.0, "b": 4.0})
@@ -0,0 +1,22 @@
+import unittest
+
+from . import loadCases, runReport
+from . import sampleCases
+
+__name__ = "tests.test_subtests"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class SubTestSummaryTest(unittest.TestCase):
+
+    def test_keepsMessagePerParameters(self):
+        _, result = runReport(loadCases(sampleCases.AsyncSweep))
+        _records = [_rec for _rows in result.results.values() for _rec in _rows
+                    if _rec.subTests is not None]
+        _groups = list(_records[0].subTests.groups.values())
+        # Both failures share one line, each keeps its own message
+        self.assertEqual(len(_groups), 1)
+        self.assertEqual(_groups[0].params, [
+            "(i=2): AssertionError: 2 not less than 2",
+            "(i=3): AssertionError: 3 not less than 2"])
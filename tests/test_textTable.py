@@ -0,0 +1,78 @@
+import random
+import unittest
+from io import StringIO
+from textwrap import wrap
+
+from PrettyTextTestRunner.textTable import TextTable, _wrapCell
+
+__name__ = "tests.test_textTable"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+# Rendered by the single pass layout the two pass one replaced
+SOLID = (
+    "  --------------------------------------------\n"
+    "  | Name       | Detail             | Status |\n"
+    "  --------------------------------------------\n"
+    "  | test_one   | short              |   PASS |\n"
+    "  | test_two_w | Traceback:   line  | FAILED |\n"
+    "  | ith_a_long | one wraps across   |        |\n"
+    "  | _name      | several lines of   |        |\n"
+    "  |            | the cell           |        |\n"
+    "  | ünïcode    | héllo wörld        |   SKIP |\n"
+    "  --------------------------------------------")
+DELIMITED = (
+    "   Suite     Count  \n"
+    " ---------- -------\n"
+    "    a.b       12    \n"
+    "               3    \n"
+    "    much       1    \n"
+    "   longer           \n"
+    "    name            ")
+
+
+def solidTable() -> TextTable:
+    _table = TextTable({"titles": ["Name", "Detail", "Status"], "colWidths": [12, 20, 8],
+                        "colJustify": ["left", "left", "right"], "padding": 1,
+                        "indent": 2, "border": "solid"})
+    _table.appendRow(["test_one", "short", "PASS"])
+    _table.appendRow(["test_two_with_a_long_name",
+                      "Traceback:\n  line\tone wraps across several lines of the cell",
+                      "FAILED"])
+    _table.appendRow(["ünïcode", "héllo wörld", "SKIP"])
+    return _table
+
+
+class TextTableTest(unittest.TestCase):
+
+    def test_matchesPreviousLayout(self):
+        self.assertEqual("\n".join(solidTable().generate()), SOLID)
+        _table = TextTable({"titles": ["Suite", "Count"], "colWidths": [10, 7],
+                            "padding": 0, "border": "columnDelimit"})
+        for _row in (["a.b", "12"], ["", "3"], ["much longer name", "1"]):
+            _table.appendRow(_row)
+        self.assertEqual("\n".join(_table.generate()), DELIMITED)
+
+    def test_writeMatchesGenerate(self):
+        for _chunkLines in (1, 3, 4096):
+            with self.subTest(chunkLines=_chunkLines):
+                _stream = StringIO()
+                solidTable().write(_stream, _chunkLines)
+                self.assertEqual(_stream.getvalue(), SOLID + "\n")
+
+    def test_wrapFastPathMatchesTextwrap(self):
+        _random = random.Random(5)
+        _alphabet = "ab  -\t\né"
+        for _ in range(2000):
+            _content = "".join(_random.choice(_alphabet)
+                               for _ in range(_random.randrange(0, 30)))
+            _width = _random.randrange(1, 25)
+            self.assertEqual(_wrapCell(_content, _width), wrap(_content, _width),
+                             (_content, _width))
+
+    def test_descriptorNotModified(self):
+        _props = {"colWidths": [4, 4]}
+        _table = TextTable(_props)
+        _table.appendRow(["a much wider cell", "b"])
+        _table.generate()
+        self.assertEqual(_props["colWidths"], [4, 4])
@@ -0,0 +1,17 @@
+import unittest
+
+from . import loadCases, runReport
+from . import sampleCases
+
+__name__ = "tests.test_threaded"
+__author__ = "Rob MacKinnon <rome@villagertechnolgies.com>"
+__license__ = "MIT"
+
+
+class ThreadedRunTest(unittest.TestCase):
+
+    def test_warnsAboutBlockingTimeouts(self):
+        with self.assertWarnsRegex(RuntimeWarning, "blocking call"):
+            _, result = runReport(loadCases(sampleCases.Passing), threads=2,
+                                  testTimeout=5)
+        self.assertTrue(result.wasSuccessful())